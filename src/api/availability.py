@@ -0,0 +1,123 @@
+"""Cached domain availability answers for the public `available` API view.
+
+The domain request form calls that view as the user types, often for the same names,
+and every call used to send a CheckDomain through the shared EPP pool. Inside
+`cached_availability()`, which the view opens, check_domain_available answers:
+
+1. from the database, for names that already are a (non-deleted) Domain,
+2. from the shared "registry" cache, for names checked in the last
+   AVAILABILITY_CACHE_TTL seconds,
+3. otherwise from the registry. Concurrent checks of the same name in a worker
+   share that one CheckDomain (single-flight).
+
+Registry errors aren't cached. Form validation and the bulk endpoint don't use this:
+they always ask the registry. Setting AVAILABILITY_CACHE_TTL to 0 turns off the cache
+(the database check and single-flight still apply inside the block).
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# shared with registrar/models/utility/registry_cache.py
+CACHE_ALIAS = "registry"
+
+# how long a check waits for the same name's in-flight check before asking the registry itself
+IN_FLIGHT_WAIT_SECONDS = 10
+
+_enabled: ContextVar[bool] = ContextVar("cached_availability", default=False)
+
+
+class _Call:
+    """A registry check in progress, and its outcome once done is set."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: bool | None = None
+        self.error: Exception | None = None
+
+
+_lock = threading.Lock()
+_in_flight: dict[str, _Call] = {}
+
+
+@contextmanager
+def cached_availability():
+    """Availability checks inside the block may be answered as described above."""
+    token = _enabled.set(True)
+    try:
+        yield
+    finally:
+        _enabled.reset(token)
+
+
+def is_active() -> bool:
+    return _enabled.get()
+
+
+def available(domain_name: str) -> bool:
+    """Availability of a full domain name (e.g. "city.gov"). Raises what Domain.available raises."""
+    Domain = apps.get_model("registrar.Domain")
+    domain_name = domain_name.lower()
+
+    if Domain.objects.filter(name=domain_name).exclude(state=Domain.State.DELETED).exists():
+        return False
+
+    key = f"available:{domain_name}"
+    ttl = settings.AVAILABILITY_CACHE_TTL
+    if ttl > 0:
+        try:
+            # a savepoint, so a failed cache query doesn't break the request's transaction
+            with transaction.atomic():
+                cached = caches[CACHE_ALIAS].get(key)
+        except Exception:
+            logger.warning("Availability cache lookup failed for %s", domain_name, exc_info=True)
+            cached = None
+        if cached is not None:
+            return cached
+
+    result = _single_flight(domain_name, lambda: Domain.available(domain_name))
+    if ttl > 0:
+        try:
+            with transaction.atomic():
+                caches[CACHE_ALIAS].set(key, result, timeout=ttl)
+        except Exception:
+            logger.warning("Availability cache write failed for %s", domain_name, exc_info=True)
+    return result
+
+
+def _single_flight(domain_name: str, check) -> bool:
+    """Run check(), unless the same name is already being checked in this worker, in which case
+    wait for and share that result (or error)."""
+    with _lock:
+        call = _in_flight.get(domain_name)
+        leader = call is None
+        if leader:
+            call = _in_flight[domain_name] = _Call()
+
+    if not leader:
+        if call.done.wait(IN_FLIGHT_WAIT_SECONDS):
+            if call.error is not None:
+                raise call.error
+            return bool(call.result)
+        # the first check is stuck; don't wait on it any longer
+        return check()
+
+    try:
+        call.result = check()
+        return call.result
+    except Exception as err:
+        call.error = err
+        raise
+    finally:
+        with _lock:
+            del _in_flight[domain_name]
+        call.done.set()
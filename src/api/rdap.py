@@ -0,0 +1,73 @@
+"""RDAP lookups for the rdap API view, cached across requests and workers.
+
+Answers are keyed by the normalized domain name and kept in the "rdap" cache alias
+(settings.CACHES), which is database backed and bounded by RDAP_CACHE_MAX_ENTRIES.
+Found domains are kept for RDAP_CACHE_TTL seconds and not-found answers (404) for
+RDAP_NEGATIVE_CACHE_TTL. Other upstream errors aren't cached.
+
+Upstream requests share one keep-alive HTTP session per worker.
+Setting RDAP_CACHE_TTL to 0 turns the cache off.
+"""
+
+import logging
+
+import requests
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RDAP_URL = "https://rdap.cloudflareregistry.com/rdap/domain/{domain}"
+
+CACHE_ALIAS = "rdap"
+
+# connections kept open to the RDAP server, per worker
+SESSION_POOL_SIZE = 10
+
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=SESSION_POOL_SIZE))
+
+
+def normalize(domain: str) -> str:
+    """The name RDAP data is looked up and cached under: lowercase, .gov if there's no TLD."""
+    domain = domain.strip().lower().rstrip(".")
+    # If inputted domain doesn't have a TLD, append .gov to it
+    if "." not in domain:
+        domain = f"{domain}.gov"
+    return domain
+
+
+def is_enabled() -> bool:
+    return settings.RDAP_CACHE_TTL > 0
+
+
+def get_rdap_data(domain: str) -> dict:
+    """The RDAP JSON for a domain, from the cache or the RDAP server.
+    Raises requests.RequestException (or ValueError for a non-JSON body) if the lookup fails."""
+    domain = normalize(domain)
+    key = f"rdap:{domain}"
+    if is_enabled():
+        try:
+            # a savepoint, so a failed cache query doesn't break the request's transaction
+            with transaction.atomic():
+                cached = caches[CACHE_ALIAS].get(key)
+        except Exception:
+            # the cache is an optimization, never a reason to fail a lookup
+            logger.warning("RDAP cache lookup failed for %s", domain, exc_info=True)
+            cached = None
+        if cached is not None:
+            return cached
+
+    response = _session.get(RDAP_URL.format(domain=domain), timeout=5)
+    rdap_data = response.json()
+
+    ttl = {200: settings.RDAP_CACHE_TTL, 404: settings.RDAP_NEGATIVE_CACHE_TTL}.get(response.status_code)
+    if is_enabled() and ttl:
+        try:
+            with transaction.atomic():
+                caches[CACHE_ALIAS].set(key, rdap_data, timeout=ttl)
+        except Exception:
+            logger.warning("RDAP cache write failed for %s", domain, exc_info=True)
+    return rdap_data
@@ -1,21 +1,27 @@
 """Test the available domain API."""
 
 import json
+import threading
 
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.test import RequestFactory, override_settings
 
-from ..views import available, check_domain_available
+from .. import availability
+from ..views import available, available_bulk, check_domain_available, prefetch_domain_availability
 from .common import less_console_noise
+from registrar.models import Domain
 from registrar.tests.common import MockEppLib
 from registrar.utility.errors import GenericError, GenericErrorCodes
-from unittest.mock import call
+from unittest.mock import call, patch
 
 from epplibwrapper import (
     commands,
+    RegistryError,
 )
 
 API_BASE_PATH = "/api/v1/available/?domain="
+BULK_API_PATH = "/api/v1/available/bulk/"
 
 
 @override_settings(IS_LOCAL=False)
@@ -122,6 +128,161 @@ class AvailableViewTest(MockEppLib):
         )
 
 
+@override_settings(IS_LOCAL=False, EPP_CHECK_DOMAIN_BATCH_SIZE=2)
+class AvailableManyTest(MockEppLib):
+    """Test checking several domains at once."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create(username="username")
+        self.factory = RequestFactory()
+
+    def check_domain_calls(self):
+        return [c for c in self.mockedSendFunction.call_args_list if isinstance(c.args[0], commands.CheckDomain)]
+
+    def test_available_many_sends_registry_sized_chunks(self):
+        """Names are lowercased, deduplicated and split into chunks of EPP_CHECK_DOMAIN_BATCH_SIZE"""
+        result = Domain.available_many(["gsa.gov", "IGORVILLE.gov", "city.gov", "gsa.gov"])
+
+        self.assertEqual(result, {"gsa.gov": False, "igorville.gov": True, "city.gov": True})
+        self.mockedSendFunction.assert_has_calls(
+            [
+                call(commands.CheckDomain(["gsa.gov", "igorville.gov"]), cleaned=True),
+                call(commands.CheckDomain(["city.gov"]), cleaned=True),
+            ]
+        )
+        self.assertEqual(len(self.check_domain_calls()), 2)
+
+    def test_available_many_raises_registry_error(self):
+        """A failed check raises like Domain.available does"""
+        with less_console_noise():
+            with self.assertRaises(RegistryError):
+                Domain.available_many(["igorville.gov", "errordomain.gov"])
+
+    def test_prefetch_answers_checks_without_the_registry(self):
+        """Inside prefetch_domain_availability, checks for prefetched names send nothing more"""
+        with prefetch_domain_availability(["gsa", "igorville", "", "not valid!"]):
+            self.assertFalse(check_domain_available("gsa"))
+            self.assertTrue(check_domain_available("igorville.gov"))
+
+        self.assertEqual(len(self.check_domain_calls()), 1)
+
+    def test_prefetch_falls_back_when_batch_check_fails(self):
+        """If the batched check fails, each check goes to the registry on its own"""
+        with less_console_noise():
+            with prefetch_domain_availability(["igorville", "errordomain"]):
+                self.assertTrue(check_domain_available("igorville"))
+
+        # the failed batch, then the single check
+        self.assertEqual(len(self.check_domain_calls()), 2)
+
+    def test_bulk_view_returns_a_result_per_domain(self):
+        """The bulk endpoint answers each name like the single endpoint, in one round trip"""
+        request = self.factory.get(BULK_API_PATH, {"domain": ["gsa", "igorville", "blah!;"]})
+        request.user = self.user
+
+        response = available_bulk(request)
+
+        results = json.loads(response.content)["results"]
+        self.assertEqual([r["domain"] for r in results], ["gsa", "igorville", "blah!;"])
+        self.assertEqual([r["available"] for r in results], [False, True, False])
+        self.assertEqual(results[2]["code"], "invalid")
+        self.assertEqual(len(self.check_domain_calls()), 1)
+
+    def test_bulk_view_limits_number_of_domains(self):
+        """Asking for too many names at once is rejected"""
+        request = self.factory.get(BULK_API_PATH, {"domain": [f"city{i}" for i in range(21)]})
+        request.user = self.user
+
+        response = available_bulk(request)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(self.check_domain_calls()), 0)
+
+
+@override_settings(IS_LOCAL=False, AVAILABILITY_CACHE_TTL=30)
+class AvailabilityCacheTest(MockEppLib):
+    """Test the cache in front of the public available endpoint."""
+
+    def setUp(self):
+        super().setUp()
+        caches[availability.CACHE_ALIAS].clear()
+        self.user = get_user_model().objects.create(username="username")
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        Domain.objects.all().delete()
+        super().tearDown()
+
+    def check_domain_calls(self):
+        return [c for c in self.mockedSendFunction.call_args_list if isinstance(c.args[0], commands.CheckDomain)]
+
+    def get(self, domain):
+        request = self.factory.get(API_BASE_PATH + domain)
+        request.user = self.user
+        return json.loads(available(request).content)
+
+    def test_repeated_checks_use_the_cache(self):
+        """The same name asked for again within the TTL sends no second CheckDomain"""
+        self.assertTrue(self.get("igorville")["available"])
+        self.assertTrue(self.get("IGORVILLE.gov")["available"])
+        self.assertEqual(len(self.check_domain_calls()), 1)
+
+    def test_existing_domain_answered_locally(self):
+        """A name that is already a Domain is unavailable without asking the registry"""
+        Domain.objects.create(name="igorville.gov", state=Domain.State.READY)
+        self.assertFalse(self.get("igorville")["available"])
+        self.assertEqual(len(self.check_domain_calls()), 0)
+
+    def test_deleted_domain_goes_to_the_registry(self):
+        """A deleted Domain's name may be available again, so the registry is asked"""
+        Domain.objects.create(name="igorville.gov", state=Domain.State.DELETED)
+        self.assertTrue(self.get("igorville")["available"])
+        self.assertEqual(len(self.check_domain_calls()), 1)
+
+    def test_errors_are_not_cached(self):
+        """A failed check is retried on the next call"""
+        with less_console_noise():
+            self.get("errordomain")
+            self.get("errordomain")
+        self.assertEqual(len(self.check_domain_calls()), 2)
+
+    def test_form_validation_skips_the_cache(self):
+        """Outside the available view, checks always go to the registry"""
+        self.get("igorville")
+        check_domain_available("igorville")
+        self.assertEqual(len(self.check_domain_calls()), 2)
+
+    def test_concurrent_checks_share_one_registry_call(self):
+        """A check for a name that is already being checked waits for that result"""
+        in_flight = availability._Call()
+        results = []
+        with patch.dict(availability._in_flight, {"city.gov": in_flight}):
+            follower = threading.Thread(
+                target=lambda: results.append(availability._single_flight("city.gov", self.fail))
+            )
+            follower.start()
+            in_flight.result = True
+            in_flight.done.set()
+            follower.join(5)
+
+        self.assertEqual(results, [True])
+
+    def test_finished_check_leaves_nothing_in_flight(self):
+        """The first check of a name runs it and clears its in-flight entry"""
+        self.assertFalse(availability._single_flight("city.gov", lambda: False))
+        self.assertNotIn("city.gov", availability._in_flight)
+
+    def test_concurrent_checks_share_errors(self):
+        """Waiting checks get the in-flight check's error"""
+        call_ = availability._Call()
+        call_.error = RegistryError("boom")
+        call_.done.set()
+        with patch.dict(availability._in_flight, {"city.gov": call_}):
+            with self.assertRaises(RegistryError):
+                availability._single_flight("city.gov", lambda: True)
+
+
 class AvailableAPITest(MockEppLib):
     """Test that the API can be called as expected."""
 
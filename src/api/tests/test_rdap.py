@@ -1,11 +1,14 @@
 """Test the domain rdap lookup API."""
 
 import json
+from unittest.mock import MagicMock, patch
 
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.test import RequestFactory
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
+from .. import rdap as rdap_cache
 from ..views import rdap
 
 API_BASE_PATH = "/api/v1/rdap/?domain="
@@ -64,3 +67,50 @@ class RdapAPITest(TestCase):
         self.assertContains(response, "rdap")
         response_object = json.loads(response.content)
         self.assertIn("rdapConformance", response_object)
+
+
+@override_settings(RDAP_CACHE_TTL=600, RDAP_NEGATIVE_CACHE_TTL=60)
+class RdapCacheTest(TestCase):
+    """Test that RDAP answers are cached by normalized domain name"""
+
+    def setUp(self):
+        super().setUp()
+        caches[rdap_cache.CACHE_ALIAS].clear()
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.create(username="username")
+
+    def get(self, domain):
+        request = self.factory.get(API_BASE_PATH + domain)
+        request.user = self.user
+        return json.loads(rdap(request).content)
+
+    def upstream(self, status_code, body):
+        response = MagicMock(status_code=status_code, json=MagicMock(return_value=body))
+        return patch.object(rdap_cache._session, "get", return_value=response)
+
+    def test_same_domain_is_fetched_once(self):
+        """Differently written names for one domain share a cache entry"""
+        with self.upstream(200, {"rdapConformance": ["rdap_level_0"]}) as upstream_get:
+            self.get("WhiteHouse")
+            response_object = self.get("whitehouse.gov")
+
+        upstream_get.assert_called_once()
+        self.assertEqual(upstream_get.call_args.args[0], rdap_cache.RDAP_URL.format(domain="whitehouse.gov"))
+        self.assertIn("rdapConformance", response_object)
+
+    def test_not_found_is_cached(self):
+        """A 404 answer is cached too (for RDAP_NEGATIVE_CACHE_TTL)"""
+        with self.upstream(404, {"errorCode": 404}) as upstream_get:
+            self.get("nosuchdomain")
+            response_object = self.get("nosuchdomain")
+
+        upstream_get.assert_called_once()
+        self.assertEqual(response_object["errorCode"], 404)
+
+    def test_upstream_error_is_not_cached(self):
+        """Server errors are passed through but asked for again next time"""
+        with self.upstream(503, {"errorCode": 503}) as upstream_get:
+            self.get("whitehouse")
+            self.get("whitehouse")
+
+        self.assertEqual(upstream_get.call_count, 2)
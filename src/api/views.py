@@ -1,22 +1,30 @@
 """Internal API views"""
 
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.apps import apps
 from django.views.decorators.http import require_http_methods
 from django.http import HttpResponse, JsonResponse
 
 from registrar.utility.enums import ValidationReturnType
 from registrar.utility.errors import GenericError, GenericErrorCodes
+from registrar.utility import errors
+from epplibwrapper.errors import RegistryError
 from django.db import transaction
 
-import requests
-
 from login_required import login_not_required
 
-from cachetools.func import ttl_cache
-
+from api import availability
+from api.rdap import get_rdap_data
 from registrar.utility.s3_bucket import S3ClientError, S3ClientHelper
 
-RDAP_URL = "https://rdap.cloudflareregistry.com/rdap/domain/{domain}"
+# Most names one call to the bulk availability endpoint may check
+BULK_AVAILABLE_MAX_DOMAINS = 20
+
+# availability answers fetched ahead of time for the current request, see prefetch_domain_availability
+_prefetched_availability: ContextVar[dict | None] = ContextVar("prefetched_availability", default=None)
 
 
 DOMAIN_API_MESSAGES = {
@@ -44,11 +52,52 @@ def check_domain_available(domain):
     """
     Domain = apps.get_model("registrar.Domain")
 
-    if domain.endswith(".gov"):
-        return Domain.available(domain)
-    else:
+    if not domain.endswith(".gov"):
         # domain search string doesn't end with .gov, add it on here
-        return Domain.available(domain + ".gov")
+        domain = domain + ".gov"
+
+    prefetched = _prefetched_availability.get()
+    if prefetched is not None and domain.lower() in prefetched:
+        return prefetched[domain.lower()]
+    if availability.is_active():
+        return availability.available(domain)
+    return Domain.available(domain)
+
+
+@contextmanager
+def prefetch_domain_availability(domains):
+    """Check every domain in `domains` with one registry round trip, so that the
+    check_domain_available calls made inside this block (for example, by each form
+    of the domain request wizard) are answered without another CheckDomain.
+
+    Blank or malformed names are skipped - validation reports those on its own.
+    If the batched check fails, nothing is prefetched and each check goes to the
+    registry individually, exactly as it would without this block.
+    """
+    Domain = apps.get_model("registrar.Domain")
+
+    names = []
+    for domain in domains:
+        try:
+            sld = Domain._validate_domain_string(domain, blank_ok=True)
+        except ValueError:
+            # BlankValueError, ExtraDotsError, InvalidDomainError, InvalidSpacesError
+            continue
+        if sld:
+            names.append(f"{sld}.gov")
+
+    prefetched = None
+    if names:
+        try:
+            prefetched = Domain.available_many(names)
+        except (RegistryError, errors.InvalidDomainError):
+            prefetched = None
+
+    token = _prefetched_availability.set(prefetched)
+    try:
+        yield
+    finally:
+        _prefetched_availability.reset(token)
 
 
 @transaction.non_atomic_requests
@@ -58,33 +107,57 @@ def available(request, domain=""):
     """Is a given domain available or not.
 
     Response is a JSON dictionary with the key "available" and value true or
-    false.
+    false. Answers may come from the database or a short-lived cache, see api/availability.py.
     """
     Domain = apps.get_model("registrar.Domain")
     domain = request.GET.get("domain", "")
 
-    _, json_response = Domain.validate_and_handle_errors(
-        domain=domain,
-        return_type=ValidationReturnType.JSON_RESPONSE,
-    )
+    with availability.cached_availability():
+        _, json_response = Domain.validate_and_handle_errors(
+            domain=domain,
+            return_type=ValidationReturnType.JSON_RESPONSE,
+        )
     return json_response
 
 
+@transaction.non_atomic_requests
+@require_http_methods(["GET"])
+def available_bulk(request):
+    """Are several domains available or not, checked in one registry round trip.
+
+    Takes the names as repeated `domain` query parameters and returns a JSON dictionary
+    with a "results" list holding, in the same order, the response `available` gives
+    for each name. Unlike `available`, this requires a logged-in user.
+    """
+    Domain = apps.get_model("registrar.Domain")
+    domains = request.GET.getlist("domain")
+
+    if len(domains) > BULK_AVAILABLE_MAX_DOMAINS:
+        return JsonResponse(
+            {"error": f"Check at most {BULK_AVAILABLE_MAX_DOMAINS} domains at a time."},
+            status=400,
+        )
+
+    results = []
+    with prefetch_domain_availability(domains):
+        for domain in domains:
+            _, json_response = Domain.validate_and_handle_errors(
+                domain=domain,
+                return_type=ValidationReturnType.JSON_RESPONSE,
+            )
+            results.append({"domain": domain, **json.loads(json_response.content)})
+    return JsonResponse({"results": results})
+
+
 @transaction.non_atomic_requests
 @require_http_methods(["GET"])
 @login_not_required
-# Since we cache domain RDAP data, cache time may need to be re-evaluated this if we encounter any memory issues
-@ttl_cache(ttl=600)
 def rdap(request, domain=""):
-    """Returns JSON dictionary of a domain's RDAP data from Cloudflare API"""
+    """Returns JSON dictionary of a domain's RDAP data from Cloudflare API.
+    Answers are cached across workers, see api/rdap.py."""
     domain = request.GET.get("domain", "")
 
-    # If inputted domain doesn't have a TLD, append .gov to it
-    if "." not in domain:
-        domain = f"{domain}.gov"
-
-    rdap_data = requests.get(RDAP_URL.format(domain=domain), timeout=5).json()
-    return JsonResponse(rdap_data)
+    return JsonResponse(get_rdap_data(domain))
 
 
 @transaction.non_atomic_requests
@@ -0,0 +1,196 @@
+"""Optional EPP connection broker: one local process owns the logged-in registry sessions.
+
+Without the broker, every gunicorn worker builds its own EPPLibWrapper and pool, so
+registry sessions scale with workers x pool size, and every worker recycle
+(--max-requests) logs its sessions out and back in.
+
+With EPP_BROKER_SOCKET set:
+    - `manage.py run_epp_broker` (started by run.sh) builds the only EPPLibWrapper
+    and pool, and serves it on that Unix domain socket.
+    - each worker's CLIENT is a BrokerClient, which sends the command to the broker
+    and gets back the response (or the RegistryError).
+
+Messages are length-prefixed pickles. The socket is created 0600, so only processes
+running as the app's own user can reach it, and they already hold the registry credentials.
+"""
+
+import logging
+import os
+import pickle
+import socket
+import socketserver
+import struct
+import time
+
+from django.conf import settings
+
+from .errors import ErrorCode, RegistryError
+from .utility import metrics
+from .utility import deadline as request_deadline
+from .utility import lanes
+from .utility.fanout import fan_out
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("!I")
+
+
+def _send_frame(sock, message):
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exactly(sock, size) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise EOFError("EPP broker connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock):
+    (size,) = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+    return pickle.loads(_recv_exactly(sock, size))  # nosec B301 - peer is our own process (0600 socket)
+
+
+class BrokerClient:
+    """Stands in for EPPLibWrapper in the workers when broker mode is on. Same interface."""
+
+    # attempts to reach the broker, e.g. while it restarts
+    connect_attempts = 3
+
+    def __init__(self, socket_path, timeout=None):
+        self.socket_path = socket_path
+        self.timeout = timeout if timeout is not None else settings.EPP_BROKER_TIMEOUT
+
+    def send(self, command, *, cleaned=False):
+        """Have the broker send the command (with its usual retries). Raises RegistryError."""
+        if not cleaned:
+            raise ValueError("Please sanitize user input before sending it.")
+
+        # the broker applies what's left of this request's deadline, and its priority lane, to the command
+        reply = self._request(
+            {
+                "op": "send",
+                "command": command,
+                "deadline": request_deadline.remaining(),
+                "lane": lanes.current_lane(),
+            }
+        )
+        if reply["ok"]:
+            return reply["response"]
+        error = reply["error"]
+        raise RegistryError(error["message"], code=error["code"], note=error["note"], response=error["response"])
+
+    def send_many(self, commands, *, cleaned=False):
+        """See EPPLibWrapper.send_many."""
+        commands = list(commands)
+        max_workers = min(len(commands), self.fanout_limit())
+        return fan_out(lambda command: self.send(command, cleaned=cleaned), commands, max_workers)
+
+    def fanout_limit(self) -> int:
+        """See EPPLibWrapper.fanout_limit. Asks the broker, whose pool the commands share."""
+        return self._request({"op": "fanout_limit", "lane": lanes.current_lane()})["limit"]
+
+    def stats(self) -> dict:
+        """The broker's pool stats."""
+        return self._request({"op": "stats"})["stats"]
+
+    def render_metrics(self) -> str:
+        """The broker's EPP metrics: it is the process that talks to the registry."""
+        return self._request({"op": "metrics"})["metrics"]
+
+    def close_all(self):
+        """Nothing to log out: the sessions belong to the broker, and outlive this worker."""
+
+    def _request(self, request):
+        for attempt in range(1, self.connect_attempts + 1):
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.settimeout(max(request_deadline.clamp(self.timeout), 0.1))
+                    sock.connect(self.socket_path)
+                    _send_frame(sock, request)
+                    return _recv_frame(sock)
+            except (ConnectionRefusedError, FileNotFoundError) as err:
+                # broker isn't listening (yet): nothing was sent, safe to try again
+                if attempt == self.connect_attempts:
+                    message = "EPP broker is not reachable."
+                    logger.error(f"{message} socket={self.socket_path} Error: {err}")
+                    raise RegistryError(message, code=ErrorCode.TRANSPORT_ERROR) from err
+                time.sleep(attempt * 0.1)
+            except (OSError, EOFError) as err:
+                # the command may have reached the registry; let the caller decide
+                message = "Lost the connection to the EPP broker."
+                logger.error(f"{message} socket={self.socket_path} Error: {err}")
+                raise RegistryError(message, code=ErrorCode.TRANSPORT_ERROR) from err
+
+
+class _BrokerRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                message = _recv_frame(self.request)
+            except EOFError:
+                return
+            _send_frame(self.request, self.server.dispatch(message))
+
+
+class BrokerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves a wrapper (normally the broker's EPPLibWrapper) on a Unix domain socket.
+    One thread per worker connection; the wrapper's pool bounds the registry sessions."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, wrapper):
+        self.wrapper = wrapper
+        if os.path.exists(socket_path):
+            # left behind by a broker that didn't shut down cleanly
+            os.unlink(socket_path)
+        super().__init__(socket_path, _BrokerRequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+    def dispatch(self, message) -> dict:
+        op = message.get("op")
+        if op == "stats":
+            return {"ok": True, "stats": self.wrapper.stats()}
+        if op == "metrics":
+            return {"ok": True, "metrics": metrics.render(self.wrapper.stats())}
+        if op == "fanout_limit":
+            with lanes.priority_lane(message.get("lane", lanes.INTERACTIVE)):
+                return {"ok": True, "limit": self.wrapper.fanout_limit()}
+        if op != "send":
+            return self._error(RegistryError(f"Unknown EPP broker op {op!r}"))
+
+        try:
+            # workers only send commands they already sanitized
+            lane = message.get("lane", lanes.INTERACTIVE)
+            with request_deadline.request_deadline(message.get("deadline")), lanes.priority_lane(lane):
+                response = self.wrapper.send(message["command"], cleaned=True)
+            return {"ok": True, "response": response}
+        except RegistryError as err:
+            return self._error(err)
+        except Exception as err:
+            logger.error(f"EPP broker failed to send {message['command'].__class__.__name__}", exc_info=True)
+            return self._error(RegistryError(str(err)))
+
+    def _error(self, err: RegistryError) -> dict:
+        response = err.response
+        try:
+            pickle.dumps(response)
+        except Exception:
+            # keep the code and message even if the raw response can't travel
+            response = None
+        return {
+            "ok": False,
+            "error": {"message": str(err), "code": err.code, "note": err.note, "response": response},
+        }
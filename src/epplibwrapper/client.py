@@ -1,12 +1,21 @@
 """Provide a wrapper around epplib to handle authentication and errors."""
 
+import contextvars
 import logging
-from time import sleep
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from time import monotonic, sleep
 import os
 from django.conf import settings
 from .cert import Cert, Key
 from .errors import ErrorCode, LoginError, RegistryError
 from .utility.pool import PoolExhausted, EPPConnectionPool
+from .utility.session_budget import DatabaseSessionBudget
+from .utility import metrics
+from .utility import deadline as request_deadline
+from .utility import lanes
+from .utility.circuit_breaker import CircuitBreaker
+from .utility.fanout import fan_out
+from .utility.hedging import LatencyWindow
 
 try:
     from epplib.client import Client
@@ -37,6 +46,16 @@ except Exception:
     )
 
 
+# read-only commands: sending one twice is harmless, so a slow send may be hedged
+HEDGEABLE_COMMANDS = frozenset({"InfoDomain", "InfoHost", "InfoContact", "CheckDomain"})
+
+
+def _is_registry_outage(err: RegistryError) -> bool:
+    """Failures that mean the registry (or the network to it) is down or degraded."""
+    # OSError covers refused/timed out sockets while a new connection was being built
+    return err.is_transport_error() or err.is_server_error() or isinstance(err.__cause__, OSError)
+
+
 class EPPLibWrapper:
     """
     A wrapper over epplib's client.
@@ -65,7 +84,39 @@ class EPPLibWrapper:
             idle_ping_seconds=settings.EPP_POOL_IDLE_PING_SECONDS,
             heartbeat_interval=settings.EPP_POOL_HEARTBEAT_INTERVAL,
             prefill=not settings.IS_LOCAL,
+            prefill_in_background=settings.EPP_POOL_PREFILL_IN_BACKGROUND,
+            replenish_concurrency=settings.EPP_POOL_PREFILL_CONCURRENCY,
+            reserved_for_interactive=settings.EPP_POOL_INTERACTIVE_RESERVED,
+            lane_borrow_timeouts={lanes.BATCH: settings.EPP_POOL_BATCH_BORROW_TIMEOUT},
+            max_size=settings.EPP_POOL_MAX_SIZE,
+            grow_wait_seconds=settings.EPP_POOL_GROW_WAIT_SECONDS,
+            shrink_idle_seconds=settings.EPP_POOL_SHRINK_IDLE_SECONDS,
+            session_budget=self._make_session_budget(),
+        )
+        # fail fast instead of retrying into a registry that is down
+        self._breaker = CircuitBreaker(
+            failure_threshold=settings.EPP_BREAKER_FAILURE_THRESHOLD,
+            reset_seconds=settings.EPP_BREAKER_RESET_SECONDS,
+            probe=self._probe_registry,
         )
+        # recent response times per command type, to decide when a read is slow enough to hedge
+        self._latency = LatencyWindow()
+        # runs hedgeable reads and their hedges, so the caller can take whichever answers first.
+        # Shared by every send; its threads are only started as sends need them
+        self._hedge_executor = ThreadPoolExecutor(max_workers=2 * self._pool.max_size, thread_name_prefix="epp-hedge")
+
+    def _probe_registry(self):
+        """Half-open circuit breaker probe: one Hello over a pooled connection. Raises if it fails."""
+        with self._pool.connection() as clientConnection:
+            clientConnection.send(commands.Hello())
+
+    def _make_session_budget(self) -> DatabaseSessionBudget | None:
+        """Shared cap on connections opened above the pool's min size, if one is configured."""
+        if settings.EPP_POOL_BURST_SESSION_BUDGET <= 0:
+            return None
+        # leases outlive a few heartbeats so a live worker always refreshes them in time
+        lease_seconds = max(settings.EPP_POOL_HEARTBEAT_INTERVAL * 3, 60)
+        return DatabaseSessionBudget(settings.EPP_POOL_BURST_SESSION_BUDGET, lease_seconds)
 
     def _create_connection(self) -> "Client":
         """Initialize a client, assuming _login defined. Raises errors if initialization fails.
@@ -133,7 +184,10 @@ class EPPLibWrapper:
             # Grab a connection from the pool. Connection is automagically
             # put back into the Q once the with finishes
             with self._pool.connection() as clientConnection:
-                response = clientConnection.send(command)
+                with metrics.COMMAND_DURATION.time(command=cmd_type):
+                    started = monotonic()
+                    response = clientConnection.send(command)
+                    self._latency.record(cmd_type, monotonic() - started)
         except PoolExhausted as err:
 
             # Every connection stayed checked out for the whole wait.
@@ -173,6 +227,68 @@ class EPPLibWrapper:
             else:
                 return response
 
+    def _hedge_delay(self, cmd_type) -> float | None:
+        """Seconds to wait on a send of `cmd_type` before hedging it, or None to never hedge it."""
+        if settings.EPP_HEDGE_PERCENTILE <= 0 or cmd_type not in HEDGEABLE_COMMANDS or self._pool.size < 2:
+            return None
+        delay = self._latency.percentile(cmd_type, settings.EPP_HEDGE_PERCENTILE)
+        if delay is None:
+            return None
+        return max(delay, settings.EPP_HEDGE_MIN_DELAY_SECONDS)
+
+    def _send_hedged(self, command):
+        """`_send`, but for a read-only command that is slower than usual, send it again on
+        another pooled connection and return whichever answer arrives first.
+
+        Only hedges when a pooled connection is idle, so a hedge never waits on (or grows)
+        the pool, and when the request's deadline leaves time for it. A command that can't
+        be hedged is sent from the caller's thread; one that can is sent from the shared
+        hedge executor, so the caller can stop waiting on it once the hedge answers. The
+        slower send finishes in the background and returns its connection.
+        Raises RegistryError like `_send`.
+        """
+        cmd_type = command.__class__.__name__
+        delay = self._hedge_delay(cmd_type)
+        left = request_deadline.remaining()
+        if delay is None or (left is not None and left < delay):
+            return self._send(command)
+
+        # the deadline and lane contextvars follow the command into both sends
+        primary = self._hedge_executor.submit(contextvars.copy_context().run, self._send, command)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._pool.stats()["idle"]:
+            return primary.result()
+
+        hedge = self._hedge_executor.submit(contextvars.copy_context().run, self._send, command)
+        done, _ = wait([primary, hedge], return_when=FIRST_COMPLETED)
+        first = primary if primary in done else hedge
+        second = hedge if first is primary else primary
+        error = first.exception()
+        if error is not None and isinstance(error, RegistryError) and _is_registry_outage(error):
+            # the first to finish didn't get an answer; the other send still might
+            first, second = second, first
+        metrics.HEDGES.inc(command=cmd_type, winner="primary" if first is primary else "hedge")
+        logger.info(f"{_worker_tag()} {cmd_type} was slow (over {delay:.3f}s) and was hedged")
+        return first.result()
+
+    def stats(self) -> dict:
+        """Connection pool stats for this worker (see EPPConnectionPool.stats), plus the circuit breaker state."""
+        return {**self._pool.stats(), "circuit breaker": self._breaker.state}
+
+    def _record_outcome(self, err: RegistryError | None):
+        """Feed the circuit breaker. Outages count against the registry. Any answer from
+        the registry (even a rejection) counts for it. Anything else (busy pool, a bad
+        command) says nothing about the registry's health."""
+        if err is None or (err.code is not None and not _is_registry_outage(err)):
+            self._breaker.record_success()
+        elif _is_registry_outage(err) and self._breaker.record_failure():
+            metrics.BREAKER_TRIPS.inc()
+
+    def _time_for_an_attempt(self, backoff=0.0) -> bool:
+        """False if the current request (if any) will be cut off before another attempt could finish."""
+        left = request_deadline.remaining()
+        return left is None or left - backoff >= settings.EPP_MIN_ATTEMPT_SECONDS
+
     def send(self, command, *, cleaned=False):
         """Login, the send the command. Retry three times if an error is found."""
         # try to prevent use of this method without appropriate safeguards
@@ -182,18 +298,36 @@ class EPPLibWrapper:
 
         max_attempts = 4
         for attempt in range(1, max_attempts + 1):
+            if not self._time_for_an_attempt():
+                message = f"{cmd_type} not sent: not enough time left before the request deadline."
+                logger.info(f"{_worker_tag()} {message}")
+                raise RegistryError(message, note="request deadline")
+            if not self._breaker.allow_request():
+                metrics.BREAKER_REJECTIONS.inc(command=cmd_type)
+                message = f"{cmd_type} not sent: the registry is failing and the circuit breaker is open."
+                logger.info(f"{_worker_tag()} {message} Stats: {self.stats()}")
+                # no code -> is_connection_error(), so callers show "cannot contact registry"
+                raise RegistryError(message, note="circuit breaker open")
             try:
-                return self._send(command)
+                response = self._send_hedged(command)
+                self._record_outcome(None)
+                return response
             except RegistryError as err:
+                self._record_outcome(err)
                 if err.response:
                     logger.info(f"{_worker_tag()}  cltrid is {err.response.cl_tr_id} svtrid is {err.response.sv_tr_id}")
                 if (
-                    err.is_transport_error()
-                    or err.is_connection_error()
-                    or err.is_session_error()
-                    or err.is_server_error()
-                    or err.should_retry()
-                ) and attempt < max_attempts:
+                    (
+                        err.is_transport_error()
+                        or err.is_connection_error()
+                        or err.is_session_error()
+                        or err.is_server_error()
+                        or err.should_retry()
+                    )
+                    and attempt < max_attempts
+                    and self._time_for_an_attempt(backoff=(attempt * 50) / 1000)
+                ):
+                    metrics.RETRIES.inc(command=cmd_type)
                     message = f"{cmd_type} failed and will be retried"
                     logger.info(f"{_worker_tag()} {message} Error: {err}")
 
@@ -201,10 +335,44 @@ class EPPLibWrapper:
                 else:
                     raise err
 
+    def send_many(self, commands, *, cleaned=False):
+        """Send several independent commands, returning their responses in the same order.
+
+        Up to fanout_limit() commands are in flight at once, each on its own pooled
+        connection. Under gevent the worker threads are greenlets, so the wait is roughly
+        the slowest command instead of the sum.
+
+        Error semantics match a plain loop over `send`: each command gets the usual retries,
+        and the first failing command (in the given order) raises its RegistryError.
+        """
+        commands = list(commands)
+        max_workers = min(len(commands), self.fanout_limit())
+        return fan_out(lambda command: self.send(command, cleaned=cleaned), commands, max_workers)
+
+    def fanout_limit(self) -> int:
+        """How many commands to have in flight at once in the current priority lane:
+        settings.EPP_FANOUT_CONCURRENCY, but never more connections than the pool lets
+        the lane hold."""
+        return max(min(settings.EPP_FANOUT_CONCURRENCY, self._pool.lane_capacity(lanes.current_lane())), 1)
+
+    def render_metrics(self) -> str:
+        """This worker's EPP metrics in Prometheus text format (served by the /metrics view)."""
+        return metrics.render(self.stats())
+
+    def close_all(self):
+        """Log out every idle pooled connection. Called at worker shutdown."""
+        self._pool.close_all()
+
 
 try:
     # Initialize epplib
-    CLIENT = EPPLibWrapper()
+    if settings.EPP_BROKER_SOCKET:
+        # broker mode: the run_epp_broker process owns the logged-in sessions
+        from .broker import BrokerClient
+
+        CLIENT = BrokerClient(settings.EPP_BROKER_SOCKET)  # type: ignore[assignment]
+    else:
+        CLIENT = EPPLibWrapper()
     logger.info(f"{_worker_tag()}: registry client initialized")
 except Exception:
     CLIENT = None  # type: ignore[assignment]
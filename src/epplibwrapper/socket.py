@@ -1,10 +1,51 @@
+import socket
+from contextvars import ContextVar
+
 from django.conf import settings
 
+from .utility.deadline import clamp as clamp_to_deadline
+
+# set while a TimeoutSocketTransport.connect() is running: the TCP connect timeout to use
+_connect_timeout: ContextVar[float | None] = ContextVar("epp_connect_timeout", default=None)
+
+
+class _BoundedConnectSocketModule:
+    """Stands in for the `socket` module inside epplib.transport only (not globally).
+
+    epplib opens its TCP connection with socket.create_connection and no timeout.
+    Here create_connection gets the timeout of the TimeoutSocketTransport.connect() in
+    progress. Everything else is the real socket module (gevent-patched under gunicorn).
+    """
+
+    def __getattr__(self, name):
+        return getattr(socket, name)
+
+    @staticmethod
+    def create_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, *args, **kwargs):  # type: ignore
+        bound = _connect_timeout.get()
+        if bound is not None and timeout is socket._GLOBAL_DEFAULT_TIMEOUT:  # type: ignore
+            timeout = bound
+        return socket.create_connection(address, timeout, *args, **kwargs)
+
+
+def _bound_connects_in(transport_module):
+    """Route epplib's create_connection through _BoundedConnectSocketModule."""
+    if getattr(transport_module, "socket", None) is socket:
+        transport_module.socket = _BoundedConnectSocketModule()
+    elif getattr(transport_module, "create_connection", None) is socket.create_connection:
+        # in case epplib imports the function itself
+        transport_module.create_connection = _BoundedConnectSocketModule.create_connection
+
+
 try:
+    from epplib import transport as epplib_transport
+    from epplib.exceptions import TransportError
     from epplib.transport import SocketTransport
 
+    _bound_connects_in(epplib_transport)
+
     class TimeoutSocketTransport(SocketTransport):
-        """SocketTransport that applies a socket timeout after connecting.
+        """SocketTransport with bounded connects, reads and sends.
 
         The stock SocketTransport sets no socket timeout, so a slow or dead
         registry makes a subsequent recv()/send() block indefinitely while
@@ -13,15 +54,42 @@ try:
         (which epplib surfaces as a TransportError that our send()/retry path
         already handles) instead of hanging.
 
-        Note: this only bounds reads/sends after the connection is established;
-        the initial TCP connect() in the parent class is not bounded here.
+        The TCP connect (and the TLS handshake on that socket) is bounded by
+        settings.EPP_CONNECT_TIMEOUT, so a black-holed registry fails a connection
+        attempt in seconds instead of hanging worker startup or a borrow.
+
+        Inside a request, connects, reads and sends are also bounded by the request deadline.
 
         This needs to be in a try/except block because epplib is not installed in local dev.
         """
 
         def connect(self) -> None:
-            super().connect()
+            token = _connect_timeout.set(max(clamp_to_deadline(settings.EPP_CONNECT_TIMEOUT), 0.1))
+            try:
+                super().connect()
+            except TransportError:
+                raise
+            except OSError as err:
+                # refused / timed out: same handling as a connection that drops later
+                raise TransportError(f"Could not connect to the registry: {err}") from err
+            finally:
+                _connect_timeout.reset(token)
             self.socket.settimeout(settings.EPP_CONNECTION_TIMEOUT)  # type: ignore
 
+        def send(self, message: bytes) -> None:
+            self._apply_request_deadline()
+            super().send(message)
+
+        def receive(self) -> bytes:
+            self._apply_request_deadline()
+            return super().receive()
+
+        def _apply_request_deadline(self) -> None:
+            """Shorten the socket timeout to what's left of the current request's deadline
+            (see utility/deadline.py). A read cut short this way raises a TransportError,
+            and the pool discards the connection, so a half-read response is never reused."""
+            # floor: a 0 timeout would switch the socket to non-blocking mode
+            self.socket.settimeout(max(clamp_to_deadline(settings.EPP_CONNECTION_TIMEOUT), 0.1))  # type: ignore
+
 except ImportError:
     pass
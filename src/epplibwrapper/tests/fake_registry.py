@@ -0,0 +1,601 @@
+"""A local stand-in for the registry's EPP server, for tests and benchmarks (development only).
+
+MockEppLib (registrar/tests/common.py) replaces EPPLibWrapper.send, so nothing below it
+runs. FakeRegistry is a real TCP server that speaks enough EPP (RFC 5730-5733) for the
+whole stack to run against it: TimeoutSocketTransport, epplib's XML serialization and
+parsing, login, the pool's health checks and the retry path.
+
+    registry = FakeRegistry(latency=0.02, drop_rate=0.01, ssl_context=registry_ssl_context(tmpdir))
+    registry.start()
+    wrapper = FakeRegistryWrapper(registry.port)  # EPPLibWrapper, pool and all
+    ...
+    registry.stop()
+
+TLS is optional on both ends: a FakeRegistry without an ssl_context serves plain TCP,
+and FakeRegistryWrapper(port, tls=False) connects to it without TLS. The registrar's
+own connections (EPPLibWrapper._create_connection) always use TLS.
+
+Answers greeting, login, logout, hello, and check/info/create/update/delete for domain,
+host and contact objects, kept in memory. It can add latency to every answer, answer
+a share of commands with 2400 "Command failed" (error_rate), and drop the connection
+without answering a share of them (drop_rate).
+
+Not a registry: no authorization, no validation beyond what these answers need.
+"""
+
+import datetime
+import logging
+import random
+import socket
+import socketserver
+import ssl
+import struct
+import threading
+import time
+from itertools import count
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+from defusedxml import ElementTree
+from django.conf import settings
+
+from epplibwrapper.client import EPPLibWrapper
+from epplibwrapper.errors import ErrorCode, RegistryError
+
+try:
+    from epplib.client import Client
+    from epplib.exceptions import TransportError
+    from epplibwrapper.socket import TimeoutSocketTransport
+
+    class PlainSocketTransport(TimeoutSocketTransport):
+        """TimeoutSocketTransport without TLS, for a FakeRegistry serving plain TCP."""
+
+        def __init__(self, hostname, port):
+            super().__init__(hostname, port=port, verify=False)
+            self._address = (hostname, port)
+
+        def connect(self) -> None:
+            try:
+                self.socket = socket.create_connection(self._address, timeout=settings.EPP_CONNECT_TIMEOUT)
+            except OSError as err:
+                raise TransportError(f"Could not connect to the fake registry: {err}") from err
+            self.socket.settimeout(settings.EPP_CONNECTION_TIMEOUT)  # type: ignore
+
+except ImportError:
+    pass
+
+logger = logging.getLogger(__name__)
+
+# EPP frames: a 4 byte big-endian length (counting the header itself), then the XML
+_HEADER = struct.Struct("!I")
+
+EPP_NS = "urn:ietf:params:xml:ns:epp-1.0"
+OBJECT_NS = {
+    "domain": "urn:ietf:params:xml:ns:domain-1.0",
+    "host": "urn:ietf:params:xml:ns:host-1.0",
+    "contact": "urn:ietf:params:xml:ns:contact-1.0",
+}
+_KIND_BY_NS = {uri: kind for kind, uri in OBJECT_NS.items()}
+
+MESSAGES = {
+    ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY: "Command completed successfully",
+    ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY_ENDING_SESSION: "Command completed successfully; ending session",
+    ErrorCode.UNKNOWN_COMMAND: "Unknown command",
+    ErrorCode.COMMAND_USE_ERROR: "Command use error",
+    ErrorCode.OBJECT_EXISTS: "Object exists",
+    ErrorCode.OBJECT_DOES_NOT_EXIST: "Object does not exist",
+    ErrorCode.COMMAND_FAILED: "Command failed",
+}
+
+
+def _local_name(element) -> str:
+    return element.tag.rsplit("}", 1)[-1]
+
+
+def _texts(element, path) -> list[str]:
+    return [(child.text or "").strip() for child in element.iterfind(path)]
+
+
+def _text(element, path, default="") -> str:
+    found = _texts(element, path)
+    return found[0] if found else default
+
+
+def _contacts(element, path) -> list[tuple[str, str]]:
+    """(type, id) pairs of the domain:contact elements at path."""
+    return [(contact.get("type", ""), (contact.text or "").strip()) for contact in element.iterfind(path)]
+
+
+def _timestamp(moment: datetime.datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.0Z")
+
+
+def registry_ssl_context(directory) -> ssl.SSLContext:
+    """A server-side TLS context with a fresh self-signed certificate for localhost,
+    written to `directory`. Clients have to skip certificate verification."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_file = Path(directory) / "fake-registry.crt"
+    key_file = Path(directory) / "fake-registry.key"
+    cert_file.write_bytes(certificate.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(
+        key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_file, key_file)
+    return context
+
+
+class _Dropped(Exception):
+    """The fake registry hangs up instead of answering."""
+
+
+class FakeRegistry(socketserver.ThreadingTCPServer):
+    """Serves EPP on 127.0.0.1 (an ephemeral port unless one is given). See the module docstring.
+
+    latency:    seconds added before every answer (greeting and login included)
+    error_rate: share of commands (after login) answered with 2400 "Command failed"
+    drop_rate:  share of commands (after login) where the connection is closed without an answer
+    ssl_context: serve TLS with this context (see registry_ssl_context). None serves plain TCP.
+    seed:       seeds the error/drop choices, for repeatable runs
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0, *, latency=0.0, error_rate=0.0, drop_rate=0.0, ssl_context=None, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.ssl_context = ssl_context
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sv_tr_ids = count(1)
+        self._roids = count(1)
+        self._thread: threading.Thread | None = None
+        # name/id -> object details, shared by every session
+        self.objects: dict[str, dict[str, dict]] = {"domain": {}, "host": {}, "contact": {}}
+        # commands answered (or dropped) so far, by command name, e.g. "info domain"
+        self.command_counts: dict[str, int] = {}
+        self.sessions_opened = 0
+        super().__init__(("127.0.0.1", port), _EPPSessionHandler)
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self):
+        """Serve in a daemon thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # -- objects
+
+    def add_domain(self, name, *, hosts=(), registrant="", contacts=(), statuses=("ok",)):
+        """Seed a domain. contacts: (type, id) pairs."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        with self._lock:
+            self.objects["domain"][name] = {
+                "roid": self._roid("DOMAIN"),
+                "registrant": registrant,
+                "contacts": list(contacts),
+                "hosts": list(hosts),
+                "statuses": list(statuses),
+                "cr_date": now,
+                "up_date": now,
+                "ex_date": now + datetime.timedelta(days=365),
+            }
+
+    def add_host(self, name, *, addrs=()):
+        """Seed a host. addrs: (ip, "v4" or "v6") pairs."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        with self._lock:
+            self.objects["host"][name] = {
+                "roid": self._roid("HOST"),
+                "addrs": list(addrs),
+                "statuses": ["ok"],
+                "cr_date": now,
+                "up_date": now,
+            }
+
+    def add_contact(self, contact_id, *, name="Fake Contact", email="fake@example.gov"):
+        """Seed a contact."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        with self._lock:
+            self.objects["contact"][contact_id] = {
+                "roid": self._roid("CONTACT"),
+                "name": name,
+                "org": "",
+                "street": ["4200 Wilson Blvd."],
+                "city": "Arlington",
+                "sp": "VA",
+                "pc": "22201",
+                "cc": "US",
+                "voice": "+1.8882820870",
+                "email": email,
+                "statuses": ["ok"],
+                "cr_date": now,
+                "up_date": now,
+            }
+
+    def _roid(self, suffix) -> str:
+        return f"FAKE{next(self._roids)}-{suffix}"
+
+    # -- answering
+
+    def greeting(self) -> bytes:
+        uris = "".join(f"<objURI>{uri}</objURI>" for uri in OBJECT_NS.values())
+        now = _timestamp(datetime.datetime.now(datetime.timezone.utc))
+        return (
+            f'<?xml version="1.0" encoding="UTF-8"?><epp xmlns="{EPP_NS}"><greeting>'
+            f"<svID>Fake EPP registry</svID><svDate>{now}</svDate>"
+            f"<svcMenu><version>1.0</version><lang>en</lang>{uris}</svcMenu>"
+            "<dcp><access><all/></access><statement><purpose><admin/><prov/></purpose>"
+            "<recipient><ours/><public/></recipient><retention><stated/></retention></statement></dcp>"
+            "</greeting></epp>"
+        ).encode()
+
+    def respond(self, session, message: bytes) -> bytes:
+        """The answer to one EPP message. Raises _Dropped to hang up instead."""
+        if self.latency:
+            time.sleep(self.latency)
+
+        root = ElementTree.fromstring(message)
+        if root.find(f"{{{EPP_NS}}}hello") is not None:
+            return self.greeting()
+
+        command = root.find(f"{{{EPP_NS}}}command")
+        if command is None:
+            return self._response(ErrorCode.UNKNOWN_COMMAND)
+        cl_tr_id = _text(command, f"{{{EPP_NS}}}clTRID")
+        verb = next((child for child in command if _local_name(child) not in ("clTRID", "extension")), None)
+        if verb is None:
+            return self._response(ErrorCode.UNKNOWN_COMMAND, cl_tr_id=cl_tr_id)
+
+        action = _local_name(verb)
+        obj = next(iter(verb), None)
+        # "domain", "host" or "contact", from the object's namespace ("" for login/logout)
+        kind = _KIND_BY_NS.get(obj.tag[1:].split("}", 1)[0], "") if obj is not None else ""
+        self._count(f"{action} {kind}".strip())
+        code, res_data = self._answer(session, action, kind, obj)
+        return self._response(code, res_data, cl_tr_id=cl_tr_id)
+
+    def _answer(self, session, action, kind, obj):
+        """(result code, resData XML) for one command."""
+        if action == "login":
+            session.logged_in = True
+            return ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY, ""
+        if action == "logout":
+            session.logged_in = False
+            session.closing = True
+            return ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY_ENDING_SESSION, ""
+        if not session.logged_in:
+            return ErrorCode.COMMAND_USE_ERROR, ""
+
+        roll = self._random.random()
+        if roll < self.drop_rate:
+            raise _Dropped(action)
+        if roll < self.drop_rate + self.error_rate:
+            return ErrorCode.COMMAND_FAILED, ""
+
+        handler = getattr(self, f"_{action}_{kind}", None)
+        if handler is None:
+            return ErrorCode.UNKNOWN_COMMAND, ""
+        with self._lock:
+            return handler(obj)
+
+    def _count(self, name):
+        with self._lock:
+            self.command_counts[name] = self.command_counts.get(name, 0) + 1
+
+    def _response(self, code, res_data="", *, cl_tr_id="") -> bytes:
+        message = escape(MESSAGES.get(code, "Command failed"))
+        res_data = f"<resData>{res_data}</resData>" if res_data else ""
+        return (
+            f'<?xml version="1.0" encoding="UTF-8"?><epp xmlns="{EPP_NS}"><response>'
+            f'<result code="{int(code)}"><msg>{message}</msg></result>{res_data}'
+            f"<trID><clTRID>{escape(cl_tr_id)}</clTRID><svTRID>FAKE-{next(self._sv_tr_ids)}</svTRID></trID>"
+            "</response></epp>"
+        ).encode()
+
+    # -- object commands. Called with self._lock held; return (code, resData XML).
+
+    def _check(self, kind, obj, key):
+        ns = OBJECT_NS[kind]
+        items = "".join(
+            f"<{kind}:cd><{kind}:{key} avail={quoteattr('0' if value in self.objects[kind] else '1')}>"
+            f"{escape(value)}</{kind}:{key}></{kind}:cd>"
+            for value in _texts(obj, f"{{{ns}}}{key}")
+        )
+        return ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY, f'<{kind}:chkData xmlns:{kind}="{ns}">{items}</{kind}:chkData>'
+
+    def _check_domain(self, obj):
+        return self._check("domain", obj, "name")
+
+    def _check_host(self, obj):
+        return self._check("host", obj, "name")
+
+    def _check_contact(self, obj):
+        return self._check("contact", obj, "id")
+
+    def _info_domain(self, obj):
+        ns = OBJECT_NS["domain"]
+        name = _text(obj, f"{{{ns}}}name")
+        domain = self.objects["domain"].get(name)
+        if domain is None:
+            return ErrorCode.OBJECT_DOES_NOT_EXIST, ""
+        parts = [f"<domain:name>{escape(name)}</domain:name>", f"<domain:roid>{domain['roid']}</domain:roid>"]
+        parts += [f"<domain:status s={quoteattr(status)}/>" for status in domain["statuses"]]
+        if domain["registrant"]:
+            parts.append(f"<domain:registrant>{escape(domain['registrant'])}</domain:registrant>")
+        parts += [
+            f"<domain:contact type={quoteattr(kind)}>{escape(contact)}</domain:contact>"
+            for kind, contact in domain["contacts"]
+        ]
+        if domain["hosts"]:
+            hosts = "".join(f"<domain:hostObj>{escape(host)}</domain:hostObj>" for host in domain["hosts"])
+            parts.append(f"<domain:ns>{hosts}</domain:ns>")
+        parts += [
+            "<domain:clID>fake-registrar</domain:clID><domain:crID>fake-registrar</domain:crID>",
+            f"<domain:crDate>{_timestamp(domain['cr_date'])}</domain:crDate>",
+            f"<domain:upDate>{_timestamp(domain['up_date'])}</domain:upDate>",
+            f"<domain:exDate>{_timestamp(domain['ex_date'])}</domain:exDate>",
+            "<domain:authInfo><domain:pw>2fooBAR</domain:pw></domain:authInfo>",
+        ]
+        return (
+            ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY,
+            f'<domain:infData xmlns:domain="{ns}">{"".join(parts)}</domain:infData>',
+        )
+
+    def _info_host(self, obj):
+        ns = OBJECT_NS["host"]
+        name = _text(obj, f"{{{ns}}}name")
+        host = self.objects["host"].get(name)
+        if host is None:
+            return ErrorCode.OBJECT_DOES_NOT_EXIST, ""
+        parts = [f"<host:name>{escape(name)}</host:name>", f"<host:roid>{host['roid']}</host:roid>"]
+        parts += [f"<host:status s={quoteattr(status)}/>" for status in host["statuses"]]
+        parts += [f"<host:addr ip={quoteattr(version)}>{escape(ip)}</host:addr>" for ip, version in host["addrs"]]
+        parts += [
+            "<host:clID>fake-registrar</host:clID><host:crID>fake-registrar</host:crID>",
+            f"<host:crDate>{_timestamp(host['cr_date'])}</host:crDate>",
+            f"<host:upDate>{_timestamp(host['up_date'])}</host:upDate>",
+        ]
+        return (
+            ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY,
+            f'<host:infData xmlns:host="{ns}">{"".join(parts)}</host:infData>',
+        )
+
+    def _info_contact(self, obj):
+        ns = OBJECT_NS["contact"]
+        contact_id = _text(obj, f"{{{ns}}}id")
+        contact = self.objects["contact"].get(contact_id)
+        if contact is None:
+            return ErrorCode.OBJECT_DOES_NOT_EXIST, ""
+        streets = "".join(f"<contact:street>{escape(street)}</contact:street>" for street in contact["street"])
+        parts = [f"<contact:id>{escape(contact_id)}</contact:id>", f"<contact:roid>{contact['roid']}</contact:roid>"]
+        parts += [f"<contact:status s={quoteattr(status)}/>" for status in contact["statuses"]]
+        parts += [
+            f'<contact:postalInfo type="loc"><contact:name>{escape(contact["name"])}</contact:name>',
+            f"<contact:org>{escape(contact['org'])}</contact:org>" if contact["org"] else "",
+            f"<contact:addr>{streets}<contact:city>{escape(contact['city'])}</contact:city>",
+            f"<contact:sp>{escape(contact['sp'])}</contact:sp><contact:pc>{escape(contact['pc'])}</contact:pc>",
+            f"<contact:cc>{escape(contact['cc'])}</contact:cc></contact:addr></contact:postalInfo>",
+            f"<contact:voice>{escape(contact['voice'])}</contact:voice>",
+            f"<contact:email>{escape(contact['email'])}</contact:email>",
+            "<contact:clID>fake-registrar</contact:clID><contact:crID>fake-registrar</contact:crID>",
+            f"<contact:crDate>{_timestamp(contact['cr_date'])}</contact:crDate>",
+            f"<contact:upDate>{_timestamp(contact['up_date'])}</contact:upDate>",
+            "<contact:authInfo><contact:pw>2fooBAR</contact:pw></contact:authInfo>",
+        ]
+        return (
+            ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY,
+            f'<contact:infData xmlns:contact="{ns}">{"".join(parts)}</contact:infData>',
+        )
+
+    def _create(self, kind, key, value, details):
+        if value in self.objects[kind]:
+            return ErrorCode.OBJECT_EXISTS, ""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self.objects[kind][value] = {
+            "roid": self._roid(kind.upper()),
+            "statuses": ["ok"],
+            "cr_date": now,
+            "up_date": now,
+            **details,
+        }
+        ns = OBJECT_NS[kind]
+        ex_date = f"<{kind}:exDate>{_timestamp(details['ex_date'])}</{kind}:exDate>" if "ex_date" in details else ""
+        return (
+            ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY,
+            f'<{kind}:creData xmlns:{kind}="{ns}"><{kind}:{key}>{escape(value)}</{kind}:{key}>'
+            f"<{kind}:crDate>{_timestamp(now)}</{kind}:crDate>{ex_date}</{kind}:creData>",
+        )
+
+    def _create_domain(self, obj):
+        ns = OBJECT_NS["domain"]
+        years = int(_text(obj, f"{{{ns}}}period", "1") or 1)
+        details = {
+            "registrant": _text(obj, f"{{{ns}}}registrant"),
+            "contacts": _contacts(obj, f"{{{ns}}}contact"),
+            "hosts": _texts(obj, f"{{{ns}}}ns/{{{ns}}}hostObj"),
+            "ex_date": datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=365 * years),
+        }
+        return self._create("domain", "name", _text(obj, f"{{{ns}}}name"), details)
+
+    def _create_host(self, obj):
+        ns = OBJECT_NS["host"]
+        addrs = [((addr.text or "").strip(), addr.get("ip", "v4")) for addr in obj.iterfind(f"{{{ns}}}addr")]
+        return self._create("host", "name", _text(obj, f"{{{ns}}}name"), {"addrs": addrs})
+
+    def _create_contact(self, obj):
+        ns = OBJECT_NS["contact"]
+        info = f"{{{ns}}}postalInfo"
+        addr = f"{info}/{{{ns}}}addr"
+        details = {
+            "name": _text(obj, f"{info}/{{{ns}}}name"),
+            "org": _text(obj, f"{info}/{{{ns}}}org"),
+            "street": _texts(obj, f"{addr}/{{{ns}}}street"),
+            "city": _text(obj, f"{addr}/{{{ns}}}city"),
+            "sp": _text(obj, f"{addr}/{{{ns}}}sp"),
+            "pc": _text(obj, f"{addr}/{{{ns}}}pc"),
+            "cc": _text(obj, f"{addr}/{{{ns}}}cc"),
+            "voice": _text(obj, f"{{{ns}}}voice"),
+            "email": _text(obj, f"{{{ns}}}email"),
+        }
+        return self._create("contact", "id", _text(obj, f"{{{ns}}}id"), details)
+
+    def _update(self, kind, key, obj, apply_changes):
+        ns = OBJECT_NS[kind]
+        current = self.objects[kind].get(_text(obj, f"{{{ns}}}{key}"))
+        if current is None:
+            return ErrorCode.OBJECT_DOES_NOT_EXIST, ""
+        # statuses are the same shape for every object type
+        for status in obj.iterfind(f"{{{ns}}}rem/{{{ns}}}status"):
+            if status.get("s") in current["statuses"]:
+                current["statuses"].remove(status.get("s"))
+        current["statuses"] += [status.get("s") for status in obj.iterfind(f"{{{ns}}}add/{{{ns}}}status")]
+        apply_changes(current, ns)
+        current["up_date"] = datetime.datetime.now(datetime.timezone.utc)
+        return ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY, ""
+
+    def _update_domain(self, obj):
+        def apply_changes(domain, ns):
+            removed_hosts = set(_texts(obj, f"{{{ns}}}rem/{{{ns}}}ns/{{{ns}}}hostObj"))
+            domain["hosts"] = [host for host in domain["hosts"] if host not in removed_hosts]
+            domain["hosts"] += _texts(obj, f"{{{ns}}}add/{{{ns}}}ns/{{{ns}}}hostObj")
+            removed = set(_contacts(obj, f"{{{ns}}}rem/{{{ns}}}contact"))
+            domain["contacts"] = [contact for contact in domain["contacts"] if contact not in removed]
+            domain["contacts"] += _contacts(obj, f"{{{ns}}}add/{{{ns}}}contact")
+            domain["registrant"] = _text(obj, f"{{{ns}}}chg/{{{ns}}}registrant", domain["registrant"])
+
+        return self._update("domain", "name", obj, apply_changes)
+
+    def _update_host(self, obj):
+        def apply_changes(host, ns):
+            removed = set(_texts(obj, f"{{{ns}}}rem/{{{ns}}}addr"))
+            host["addrs"] = [addr for addr in host["addrs"] if addr[0] not in removed]
+            host["addrs"] += [
+                ((addr.text or "").strip(), addr.get("ip", "v4")) for addr in obj.iterfind(f"{{{ns}}}add/{{{ns}}}addr")
+            ]
+
+        return self._update("host", "name", obj, apply_changes)
+
+    def _update_contact(self, obj):
+        def apply_changes(contact, ns):
+            email = _text(obj, f"{{{ns}}}chg/{{{ns}}}email")
+            if email:
+                contact["email"] = email
+
+        return self._update("contact", "id", obj, apply_changes)
+
+    def _delete(self, kind, key, obj):
+        if self.objects[kind].pop(_text(obj, f"{{{OBJECT_NS[kind]}}}{key}"), None) is None:
+            return ErrorCode.OBJECT_DOES_NOT_EXIST, ""
+        return ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY, ""
+
+    def _delete_domain(self, obj):
+        return self._delete("domain", "name", obj)
+
+    def _delete_host(self, obj):
+        return self._delete("host", "name", obj)
+
+    def _delete_contact(self, obj):
+        return self._delete("contact", "id", obj)
+
+
+class _EPPSessionHandler(socketserver.BaseRequestHandler):
+    """One EPP session: greeting, then one answer per command until logout or hang-up."""
+
+    server: FakeRegistry
+
+    def setup(self):
+        self.logged_in = False
+        self.closing = False
+        if self.server.ssl_context is not None:
+            self.request = self.server.ssl_context.wrap_socket(self.request, server_side=True)
+        with self.server._lock:
+            self.server.sessions_opened += 1
+
+    def handle(self):
+        try:
+            if self.server.latency:
+                time.sleep(self.server.latency)
+            self._send(self.server.greeting())
+            while not self.closing:
+                message = self._receive()
+                if message is None:
+                    return
+                self._send(self.server.respond(self, message))
+        except _Dropped as dropped:
+            logger.debug(f"Fake registry dropped the connection instead of answering {dropped}")
+        except (OSError, ssl.SSLError):
+            # the client hung up (or timed out) mid-message
+            pass
+
+    def _send(self, message: bytes):
+        self.request.sendall(_HEADER.pack(len(message) + _HEADER.size) + message)
+
+    def _receive(self) -> bytes | None:
+        header = self._receive_exactly(_HEADER.size)
+        if header is None:
+            return None
+        (size,) = _HEADER.unpack(header)
+        return self._receive_exactly(size - _HEADER.size)
+
+    def _receive_exactly(self, size) -> bytes | None:
+        chunks = []
+        while size:
+            chunk = self.request.recv(size)
+            if not chunk:
+                return None
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+
+class FakeRegistryWrapper(EPPLibWrapper):
+    """EPPLibWrapper whose pooled connections go to a FakeRegistry on localhost,
+    over TLS unless tls is False (for a FakeRegistry without an ssl_context)."""
+
+    def __init__(self, port, tls=True):
+        self._port = port
+        self._tls = tls
+        super().__init__()
+
+    def _create_connection(self) -> "Client":
+        if self._tls:
+            # the fake registry's certificate is self-signed
+            transport = TimeoutSocketTransport("localhost", port=self._port, verify=False)  # type: ignore
+        else:
+            transport = PlainSocketTransport("localhost", self._port)  # type: ignore
+        client = Client(transport)  # type: ignore
+        try:
+            self._connect(client=client)
+        except TransportError as err:
+            raise RegistryError("Could not connect to the fake registry", code=ErrorCode.TRANSPORT_ERROR) from err
+        return client
@@ -0,0 +1,99 @@
+"""Tests for broker mode: BrokerClient in the worker talking to a BrokerServer over a
+real Unix domain socket. The server wraps a stand-in for EPPLibWrapper, so no registry
+connection is made."""
+
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+
+from django.test import SimpleTestCase, override_settings
+from api.tests.common import less_console_noise_decorator
+
+from epplibwrapper.broker import BrokerClient, BrokerServer
+from epplibwrapper.errors import ErrorCode, RegistryError
+from epplibwrapper.utility import lanes
+
+
+@dataclass
+class InfoThing:
+    """Picklable stand-in for an epplib command."""
+
+    name: str
+
+
+class FakeWrapper:
+    """Stand-in for the broker's EPPLibWrapper."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, command, *, cleaned=False):
+        self.sent.append((command, cleaned))
+        if command.name == "missing.gov":
+            raise RegistryError("Object does not exist", code=ErrorCode.OBJECT_DOES_NOT_EXIST)
+        return {"name": command.name, "avail": True}
+
+    def stats(self):
+        return {"size": 2, "connections created": 2, "idle": 2, "in use": 0}
+
+    def fanout_limit(self):
+        return 1 if lanes.current_lane() == lanes.BATCH else 2
+
+
+class TestEPPBroker(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmpdir.name, "epp.sock")
+        self.wrapper = FakeWrapper()
+        self.server = BrokerServer(self.socket_path, self.wrapper)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = BrokerClient(self.socket_path, timeout=5)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+        super().tearDown()
+
+    def test_send_returns_the_broker_response(self):
+        response = self.client.send(InfoThing("igorville.gov"), cleaned=True)
+        self.assertEqual(response, {"name": "igorville.gov", "avail": True})
+        self.assertEqual(self.wrapper.sent, [(InfoThing("igorville.gov"), True)])
+
+    def test_send_raises_registry_error_with_code(self):
+        with self.assertRaises(RegistryError) as err:
+            self.client.send(InfoThing("missing.gov"), cleaned=True)
+        self.assertEqual(err.exception.code, ErrorCode.OBJECT_DOES_NOT_EXIST)
+        self.assertIn("Object does not exist", str(err.exception))
+
+    def test_send_requires_cleaned_input(self):
+        with self.assertRaises(ValueError):
+            self.client.send(InfoThing("igorville.gov"))
+        self.assertEqual(self.wrapper.sent, [])
+
+    @override_settings(EPP_FANOUT_CONCURRENCY=3)
+    def test_send_many_keeps_command_order(self):
+        names = ["a.gov", "b.gov", "c.gov", "d.gov"]
+        responses = self.client.send_many([InfoThing(name) for name in names], cleaned=True)
+        self.assertEqual([response["name"] for response in responses], names)
+
+    def test_fanout_limit_comes_from_the_broker_pool_for_the_callers_lane(self):
+        self.assertEqual(self.client.fanout_limit(), 2)
+        with lanes.batch_priority():
+            self.assertEqual(self.client.fanout_limit(), 1)
+
+    def test_stats_come_from_the_broker_pool(self):
+        self.assertEqual(self.client.stats(), self.wrapper.stats())
+
+    def test_socket_is_private_to_the_app_user(self):
+        self.assertEqual(os.stat(self.socket_path).st_mode & 0o777, 0o600)
+
+    @less_console_noise_decorator
+    def test_unreachable_broker_is_a_transport_error(self):
+        client = BrokerClient(os.path.join(self.tmpdir.name, "nobody-home.sock"), timeout=1)
+        client.connect_attempts = 1
+        with self.assertRaises(RegistryError) as err:
+            client.send(InfoThing("igorville.gov"), cleaned=True)
+        self.assertTrue(err.exception.is_transport_error())
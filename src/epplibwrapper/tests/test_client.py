@@ -6,6 +6,8 @@ heartbeat pass are covered in test_pool.py.
 """
 
 import datetime
+import threading
+import time
 from dateutil.tz import tzlocal  # type: ignore
 from unittest.mock import MagicMock, patch
 from pathlib import Path
@@ -14,6 +16,8 @@ from django.test import TestCase, override_settings
 from api.tests.common import less_console_noise_decorator
 from epplibwrapper.client import EPPLibWrapper
 from epplibwrapper.errors import ErrorCode, RegistryError, LoginError
+from epplibwrapper.utility.deadline import request_deadline
+from epplibwrapper.utility import lanes
 import logging
 
 try:
@@ -336,6 +340,262 @@ class TestClient(TestCase):
         self.assertIn("syntax error", str(command_response.exception))
         self.assertEqual(wrapper._pool.stats(), {"size": 1, "connections created": 1, "idle": 1, "in use": 0})
 
+    @less_console_noise_decorator
+    @override_settings(EPP_CONNECTION_POOL_SIZE=3, EPP_FANOUT_CONCURRENCY=3)
+    @patch("epplibwrapper.client.Client")
+    def test_send_many_returns_responses_in_command_order(self, mock_client):
+        """send_many fans commands out over several pooled connections and
+        returns the responses in the order the commands were given."""
+        responses = {}
+
+        def send_side_effect(command):
+            if isinstance(command, commands.Login):
+                return self.fake_success_result()
+            return responses.setdefault(command.name, self.fake_success_result())
+
+        mock_client.return_value.send = MagicMock(side_effect=send_side_effect)
+        wrapper = EPPLibWrapper()
+        names = ["ns1.test.gov", "ns2.test.gov", "ns3.test.gov", "ns4.test.gov"]
+
+        result = wrapper.send_many([commands.InfoHost(name=name) for name in names], cleaned=True)
+
+        self.assertEqual(result, [responses[name] for name in names])
+        # every borrowed connection was checked back in
+        self.assertEqual(wrapper._pool.stats()["in use"], 0)
+
+    @less_console_noise_decorator
+    @override_settings(EPP_CONNECTION_POOL_SIZE=3, EPP_FANOUT_CONCURRENCY=3)
+    @patch("epplibwrapper.client.Client")
+    def test_send_many_raises_first_failing_command(self, mock_client):
+        """A rejected command in a fan-out raises its RegistryError, just like a loop over send."""
+
+        def send_side_effect(command):
+            if isinstance(command, commands.Login):
+                return self.fake_success_result()
+            if command.name == "ns2.test.gov":
+                return self.fake_result(2303, "Object does not exist")
+            return self.fake_success_result()
+
+        mock_client.return_value.send = MagicMock(side_effect=send_side_effect)
+        wrapper = EPPLibWrapper()
+        names = ["ns1.test.gov", "ns2.test.gov", "ns3.test.gov"]
+
+        with self.assertRaises(RegistryError) as command_response:
+            wrapper.send_many([commands.InfoHost(name=name) for name in names], cleaned=True)
+
+        self.assertEqual(command_response.exception.code, 2303)
+
+    @override_settings(
+        EPP_CONNECTION_POOL_SIZE=2, EPP_POOL_MAX_SIZE=4, EPP_POOL_INTERACTIVE_RESERVED=1, EPP_FANOUT_CONCURRENCY=10
+    )
+    def test_fanout_limit_follows_the_pool(self):
+        """send_many fans out to what the pool lets the current lane hold, not the static pool size."""
+        with patch("epplibwrapper.client.Client"):
+            wrapper = EPPLibWrapper()
+        self.assertEqual(wrapper.fanout_limit(), 4)
+        with lanes.batch_priority():
+            self.assertEqual(wrapper.fanout_limit(), 1)
+
+    def test_send_many_requires_cleaned_input(self):
+        """send_many keeps send's guard against unsanitized input."""
+        with patch("epplibwrapper.client.Client"):
+            wrapper = EPPLibWrapper()
+        with self.assertRaises(ValueError):
+            wrapper.send_many([self.fake_command()])
+
+    @less_console_noise_decorator
+    @override_settings(EPP_BREAKER_FAILURE_THRESHOLD=2, EPP_BREAKER_RESET_SECONDS=60)
+    @patch("epplibwrapper.client.sleep", MagicMock())
+    @patch("epplibwrapper.client.Client")
+    def test_circuit_breaker_opens_and_fails_fast(self, mock_client):
+        """After the threshold of consecutive transport errors, send stops retrying and
+        later sends fail fast as connection errors without touching the registry."""
+
+        def send_side_effect(command):
+            if isinstance(command, commands.Login):
+                return self.fake_success_result()
+            raise TransportError("connection dropped")
+
+        mock_client.return_value.send = MagicMock(side_effect=send_side_effect)
+        wrapper = EPPLibWrapper()
+
+        with self.assertRaises(RegistryError) as command_response:
+            wrapper.send(self.fake_command(), cleaned=True)
+        # two failed attempts tripped the breaker, the third attempt failed fast
+        self.assertEqual(command_response.exception.note, "circuit breaker open")
+        self.assertTrue(command_response.exception.is_connection_error())
+        self.assertEqual(wrapper.stats()["circuit breaker"], "open")
+
+        sends_before = mock_client.return_value.send.call_count
+        with self.assertRaises(RegistryError):
+            wrapper.send(self.fake_command(), cleaned=True)
+        self.assertEqual(mock_client.return_value.send.call_count, sends_before)
+
+    @less_console_noise_decorator
+    @override_settings(EPP_BREAKER_FAILURE_THRESHOLD=1, EPP_BREAKER_RESET_SECONDS=60)
+    @patch("epplibwrapper.client.sleep", MagicMock())
+    @patch("epplibwrapper.client.Client")
+    def test_circuit_breaker_half_open_probe_closes_it(self, mock_client):
+        """Once the reset time passes, a successful Hello probe closes the breaker and the command goes out."""
+        registry_down = {"value": True}
+
+        def send_side_effect(command):
+            if isinstance(command, commands.Login):
+                return self.fake_success_result()
+            if registry_down["value"]:
+                raise TransportError("connection dropped")
+            return self.fake_success_result()
+
+        mock_client.return_value.send = MagicMock(side_effect=send_side_effect)
+        wrapper = EPPLibWrapper()
+        with self.assertRaises(RegistryError):
+            wrapper.send(self.fake_command(), cleaned=True)
+        self.assertEqual(wrapper.stats()["circuit breaker"], "open")
+
+        registry_down["value"] = False
+        wrapper._breaker._opened_at -= 120
+
+        wrapper.send(self.fake_command(), cleaned=True)
+
+        sent = [call.args[0] for call in mock_client.return_value.send.call_args_list]
+        self.assertIsInstance(sent[-2], commands.Hello)
+        self.assertEqual(wrapper.stats()["circuit breaker"], "closed")
+
+    @less_console_noise_decorator
+    @override_settings(EPP_BREAKER_FAILURE_THRESHOLD=1)
+    @patch("epplibwrapper.client.Client")
+    def test_circuit_breaker_ignores_rejected_commands(self, mock_client):
+        """A registry rejection (2303) means the registry answered, so it never trips the breaker."""
+
+        def send_side_effect(command):
+            if isinstance(command, commands.Login):
+                return self.fake_success_result()
+            return self.fake_result(2303, "Object does not exist")
+
+        mock_client.return_value.send = MagicMock(side_effect=send_side_effect)
+        wrapper = EPPLibWrapper()
+
+        with self.assertRaises(RegistryError):
+            wrapper.send(self.fake_command(), cleaned=True)
+        self.assertEqual(wrapper.stats()["circuit breaker"], "closed")
+
+    @less_console_noise_decorator
+    @patch("epplibwrapper.client.Client")
+    def test_send_past_request_deadline_is_not_sent(self, mock_client):
+        """With the request's deadline already spent, send raises without using a connection."""
+        mock_client.return_value.send = MagicMock(return_value=self.fake_success_result())
+        wrapper = EPPLibWrapper()
+        sends_before = mock_client.return_value.send.call_count
+
+        with request_deadline(0):
+            with self.assertRaises(RegistryError) as command_response:
+                wrapper.send(self.fake_command(), cleaned=True)
+
+        self.assertEqual(command_response.exception.note, "request deadline")
+        self.assertEqual(mock_client.return_value.send.call_count, sends_before)
+
+    @less_console_noise_decorator
+    @override_settings(EPP_MIN_ATTEMPT_SECONDS=0.5)
+    @patch("epplibwrapper.client.sleep", MagicMock())
+    @patch("epplibwrapper.client.Client")
+    def test_send_stops_retrying_near_request_deadline(self, mock_client):
+        """When the remaining request time can't cover another attempt, the error raises without a retry."""
+
+        def send_side_effect(command):
+            if isinstance(command, commands.Login):
+                return self.fake_success_result()
+            raise TransportError("connection dropped")
+
+        mock_client.return_value.send = MagicMock(side_effect=send_side_effect)
+        wrapper = EPPLibWrapper()
+
+        with request_deadline(0.52):
+            with self.assertRaises(RegistryError) as command_response:
+                wrapper.send(self.fake_command(), cleaned=True)
+
+        self.assertEqual(command_response.exception.code, ErrorCode.TRANSPORT_ERROR)
+        sent = [call.args[0] for call in mock_client.return_value.send.call_args_list]
+        self.assertEqual(len([command for command in sent if isinstance(command, commands.InfoDomain)]), 1)
+
+    def slow_first_send(self, command_type, release):
+        """send side effect: the first `command_type` sent blocks until `release` is set,
+        every other command answers right away."""
+        answered = []
+
+        def send_side_effect(command):
+            if isinstance(command, command_type):
+                answered.append(command)
+                if len(answered) == 1:
+                    release.wait(timeout=5)
+                    return self.fake_result(1000, "slow")
+                return self.fake_result(1000, "fast")
+            return self.fake_success_result()
+
+        return send_side_effect, answered
+
+    @less_console_noise_decorator
+    @override_settings(EPP_CONNECTION_POOL_SIZE=2, EPP_HEDGE_PERCENTILE=95, EPP_HEDGE_MIN_DELAY_SECONDS=0.05)
+    @patch("epplibwrapper.client.Client")
+    def test_slow_read_is_hedged_on_another_connection(self, mock_client):
+        """A read that outlasts its usual response time is sent again on an idle connection,
+        and the first answer wins."""
+        release = threading.Event()
+        self.addCleanup(release.set)
+        send_side_effect, answered = self.slow_first_send(commands.InfoDomain, release)
+        mock_client.return_value.send = MagicMock(side_effect=send_side_effect)
+        wrapper = EPPLibWrapper()
+        for _ in range(wrapper._latency.min_samples):
+            wrapper._latency.record("InfoDomain", 0.01)
+
+        started = time.monotonic()
+        response = wrapper.send(self.fake_command(), cleaned=True)
+
+        self.assertEqual(response.msg, "fast")
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(len(answered), 2)
+
+    @less_console_noise_decorator
+    @override_settings(
+        EPP_CONNECTION_POOL_SIZE=2,
+        EPP_HEDGE_PERCENTILE=95,
+        EPP_HEDGE_MIN_DELAY_SECONDS=1,
+        EPP_MIN_ATTEMPT_SECONDS=0,
+    )
+    @patch("epplibwrapper.client.Client")
+    def test_read_is_not_hedged_past_request_deadline(self, mock_client):
+        """A read whose request deadline comes before the hedge delay is sent exactly once."""
+        release = threading.Event()
+        threading.Timer(0.6, release.set).start()
+        send_side_effect, answered = self.slow_first_send(commands.InfoDomain, release)
+        mock_client.return_value.send = MagicMock(side_effect=send_side_effect)
+        wrapper = EPPLibWrapper()
+        for _ in range(wrapper._latency.min_samples):
+            wrapper._latency.record("InfoDomain", 0.01)
+
+        with request_deadline(0.4):
+            response = wrapper.send(self.fake_command(), cleaned=True)
+
+        self.assertEqual(response.msg, "slow")
+        self.assertEqual(len(answered), 1)
+
+    @less_console_noise_decorator
+    @override_settings(EPP_CONNECTION_POOL_SIZE=2, EPP_HEDGE_PERCENTILE=95, EPP_HEDGE_MIN_DELAY_SECONDS=0.05)
+    @patch("epplibwrapper.client.Client")
+    def test_write_commands_are_never_hedged(self, mock_client):
+        """A slow write command is sent exactly once, however slow it is."""
+        release = threading.Event()
+        threading.Timer(0.3, release.set).start()
+        send_side_effect, answered = self.slow_first_send(commands.UpdateDomain, release)
+        mock_client.return_value.send = MagicMock(side_effect=send_side_effect)
+        wrapper = EPPLibWrapper()
+        for _ in range(wrapper._latency.min_samples):
+            wrapper._latency.record("UpdateDomain", 0.01)
+
+        response = wrapper.send(commands.UpdateDomain(name="test.gov"), cleaned=True)
+
+        self.assertEqual(response.msg, "slow")
+        self.assertEqual(len(answered), 1)
+
     def fake_failure_send_unexpected_error(self, command=None):
         """
         Raises an error type the wrapper has no specific handler for,
@@ -453,3 +713,31 @@ class TestClient(TestCase):
             transport.connect()
 
         transport.socket.settimeout.assert_called_once_with(settings.EPP_CONNECTION_TIMEOUT)
+
+    def test_timeout_socket_transport_bounds_tcp_connect(self):
+        """While TimeoutSocketTransport connects, epplib's create_connection gets EPP_CONNECT_TIMEOUT."""
+        from epplibwrapper.socket import _BoundedConnectSocketModule
+
+        transport = TimeoutSocketTransport("localhost")
+        seen = {}
+
+        def fake_socket_transport_parent(inner_self):
+            # what the real parent does first: open the TCP connection without a timeout
+            with patch("epplibwrapper.socket.socket.create_connection") as create_connection:
+                _BoundedConnectSocketModule().create_connection(("localhost", 700))
+            seen["timeout"] = create_connection.call_args.args[1]
+            inner_self.socket = MagicMock()
+
+        with patch.object(SocketTransport, "connect", fake_socket_transport_parent):
+            transport.connect()
+
+        self.assertEqual(seen["timeout"], settings.EPP_CONNECT_TIMEOUT)
+
+    def test_timeout_socket_transport_connect_timeout_is_a_transport_error(self):
+        """A connect that times out surfaces as a TransportError, like any other dead connection."""
+        import socket
+
+        transport = TimeoutSocketTransport("localhost")
+        with patch.object(SocketTransport, "connect", MagicMock(side_effect=socket.timeout("timed out"))):
+            with self.assertRaises(TransportError):
+                transport.connect()
@@ -0,0 +1,129 @@
+"""Tests that run the real EPP stack (EPPLibWrapper, the pool, TimeoutSocketTransport,
+epplib's XML) against FakeRegistry on localhost, and the benchmark command built on it."""
+
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from api.tests.common import less_console_noise_decorator
+
+from epplibwrapper.errors import ErrorCode, RegistryError
+from epplibwrapper.tests.fake_registry import FakeRegistry, FakeRegistryWrapper, registry_ssl_context
+
+try:
+    from epplib import commands
+except ImportError:
+    pass
+
+
+@override_settings(
+    EPP_CONNECTION_POOL_SIZE=1,
+    EPP_POOL_BORROW_TIMEOUT=5,
+    EPP_POOL_HEARTBEAT_INTERVAL=0,
+    IS_LOCAL=False,
+)
+class TestFakeRegistry(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.registry = FakeRegistry(ssl_context=registry_ssl_context(directory.name), seed=0)
+        self.registry.add_contact("fakeadmin")
+        self.registry.add_host("ns1.fake.gov", addrs=[("1.2.3.4", "v4")])
+        self.registry.add_domain(
+            "fake.gov", hosts=["ns1.fake.gov"], registrant="fakeadmin", contacts=[("admin", "fakeadmin")]
+        )
+        self.registry.start()
+        self.addCleanup(self.registry.stop)
+
+    def make_wrapper(self):
+        wrapper = FakeRegistryWrapper(self.registry.port)
+        self.addCleanup(wrapper.close_all)
+        return wrapper
+
+    @less_console_noise_decorator
+    def test_info_domain_over_the_full_stack(self):
+        """The pool logs in over TLS and InfoDomain comes back parsed by epplib."""
+        wrapper = self.make_wrapper()
+
+        response = wrapper.send(commands.InfoDomain(name="fake.gov"), cleaned=True)
+
+        self.assertEqual(response.res_data[0].name, "fake.gov")
+        self.assertEqual(self.registry.command_counts["login"], 1)
+
+    @less_console_noise_decorator
+    def test_info_domain_over_plain_tcp(self):
+        """Without TLS on either end the same stack logs in and gets answers."""
+        registry = FakeRegistry(seed=0)
+        registry.add_domain("plain.gov")
+        registry.start()
+        self.addCleanup(registry.stop)
+        wrapper = FakeRegistryWrapper(registry.port, tls=False)
+        self.addCleanup(wrapper.close_all)
+
+        response = wrapper.send(commands.InfoDomain(name="plain.gov"), cleaned=True)
+
+        self.assertEqual(response.res_data[0].name, "plain.gov")
+        self.assertEqual(registry.command_counts["login"], 1)
+
+    @less_console_noise_decorator
+    def test_missing_object_is_a_registry_error(self):
+        wrapper = self.make_wrapper()
+
+        with self.assertRaises(RegistryError) as command_response:
+            wrapper.send(commands.InfoHost(name="ns9.fake.gov"), cleaned=True)
+
+        self.assertEqual(command_response.exception.code, ErrorCode.OBJECT_DOES_NOT_EXIST)
+
+    @less_console_noise_decorator
+    def test_dropped_connection_is_replaced_and_retried(self):
+        """A connection the registry drops mid-command is discarded, and the retry logs in again."""
+        wrapper = self.make_wrapper()
+        self.registry.drop_rate = 1.0
+        with self.assertRaises(RegistryError) as command_response:
+            wrapper.send(commands.InfoDomain(name="fake.gov"), cleaned=True)
+        self.assertEqual(command_response.exception.code, ErrorCode.TRANSPORT_ERROR)
+
+        self.registry.drop_rate = 0.0
+        response = wrapper.send(commands.InfoDomain(name="fake.gov"), cleaned=True)
+        self.assertEqual(response.code, ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY)
+        # every dropped attempt cost a session
+        self.assertGreaterEqual(self.registry.sessions_opened, 4)
+
+    @less_console_noise_decorator
+    def test_injected_errors_are_retried(self):
+        """2400 "Command failed" answers go through send's retries."""
+        wrapper = self.make_wrapper()
+        self.registry.error_rate = 1.0
+
+        with self.assertRaises(RegistryError) as command_response:
+            wrapper.send(commands.InfoDomain(name="fake.gov"), cleaned=True)
+
+        self.assertEqual(command_response.exception.code, ErrorCode.COMMAND_FAILED)
+        self.assertEqual(self.registry.command_counts["info domain"], 4)
+
+
+class TestBenchmarkEPPPool(SimpleTestCase):
+    @less_console_noise_decorator
+    def test_benchmark_reports_each_size_and_concurrency(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark_epp_pool",
+            "--threads",
+            "--sizes",
+            "1",
+            "2",
+            "--concurrency",
+            "2",
+            "--commands",
+            "20",
+            "--latency",
+            "0",
+            stdout=out,
+        )
+
+        rows = out.getvalue().splitlines()
+        self.assertIn("commands/s", rows[0])
+        self.assertEqual([row.split()[:2] for row in rows[1:]], [["1", "2"], ["2", "2"]])
+        self.assertTrue(all(row.split()[-1] == "0" for row in rows[1:]))
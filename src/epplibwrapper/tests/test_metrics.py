@@ -0,0 +1,49 @@
+"""Tests for the in-process EPP metrics and their Prometheus text rendering."""
+
+from django.test import SimpleTestCase
+
+from epplibwrapper.utility.metrics import Counter, Histogram, render
+
+
+class TestEPPMetrics(SimpleTestCase):
+    """Counters and histograms record per label set and render in the exposition format."""
+
+    def test_counter_counts_per_label(self):
+        counter = Counter("test_retries_total", "Retries.", label_names=("command",))
+        counter.inc(command="InfoDomain")
+        counter.inc(command="InfoDomain")
+        counter.inc(command="CheckDomain")
+        self.assertEqual(counter.value(command="InfoDomain"), 2)
+        self.assertEqual(counter.value(command="CheckDomain"), 1)
+        self.assertEqual(counter.value(command="UpdateDomain"), 0)
+
+    def test_counter_rejects_wrong_labels(self):
+        counter = Counter("test_retries_total", "Retries.", label_names=("command",))
+        with self.assertRaises(ValueError):
+            counter.inc(cmd="InfoDomain")
+
+    def test_histogram_renders_cumulative_buckets(self):
+        histogram = Histogram("test_seconds", "Latency.", label_names=("command",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, command="InfoDomain")
+        histogram.observe(0.5, command="InfoDomain")
+        histogram.observe(5, command="InfoDomain")
+
+        lines = histogram.render({})
+        self.assertIn('test_seconds_bucket{command="InfoDomain",le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{command="InfoDomain",le="1.0"} 2', lines)
+        self.assertIn('test_seconds_bucket{command="InfoDomain",le="+Inf"} 3', lines)
+        self.assertIn('test_seconds_count{command="InfoDomain"} 3', lines)
+        self.assertIn('test_seconds_sum{command="InfoDomain"} 5.55', lines)
+
+    def test_histogram_time_observes_when_block_raises(self):
+        histogram = Histogram("test_seconds", "Latency.", label_names=("command",))
+        with self.assertRaises(RuntimeError):
+            with histogram.time(command="InfoDomain"):
+                raise RuntimeError("registry hung up")
+        self.assertEqual(histogram.count(command="InfoDomain"), 1)
+
+    def test_render_includes_pool_stats_as_gauges(self):
+        text = render({"size": 2, "connections created": 2, "idle": 1, "in use": 1})
+        self.assertIn("# TYPE epp_pool_in_use gauge", text)
+        self.assertRegex(text, r'epp_pool_connections_created\{instance="[^"]+",pid="\d+"\} 2')
+        self.assertTrue(text.endswith("\n"))
@@ -6,13 +6,18 @@ starts — the heartbeat tests call _maintain_idle_connections() directly instea
 of waiting on the background thread.
 """
 
+import threading
 import time
 from unittest.mock import MagicMock
 
-from django.test import TestCase
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
 from api.tests.common import less_console_noise_decorator
 
+from epplibwrapper.utility.deadline import request_deadline
+from epplibwrapper.utility.lanes import INTERACTIVE, batch_priority, priority_lane
 from epplibwrapper.utility.pool import EPPConnectionPool, PoolExhausted
+from epplibwrapper.utility.session_budget import DatabaseSessionBudget
 
 try:
     from epplib.commands import Hello, Logout
@@ -35,7 +40,7 @@ class TestEPPConnectionPool(TestCase):
         self.created_clients.append(client)
         return client
 
-    def make_pool(self, size=1, borrow_timeout=0.05, idle_ping_seconds=60, factory=None):
+    def make_pool(self, size=1, borrow_timeout=0.05, idle_ping_seconds=60, factory=None, **kwargs):
         """Build a pool with the maintenance thread disabled."""
         return EPPConnectionPool(
             connection_factory=factory if factory is not None else self.factory,
@@ -44,6 +49,7 @@ class TestEPPConnectionPool(TestCase):
             idle_ping_seconds=idle_ping_seconds,
             heartbeat_interval=0,
             prefill=True,
+            **kwargs,
         )
 
     @less_console_noise_decorator
@@ -53,6 +59,30 @@ class TestEPPConnectionPool(TestCase):
         self.assertEqual(len(self.created_clients), 3)
         self.assertEqual(pool.stats(), {"size": 3, "connections created": 3, "idle": 3, "in use": 0})
 
+    @less_console_noise_decorator
+    def test_concurrent_replenish_fills_pool(self):
+        """With replenish_concurrency > 1 the pool still builds exactly `size` connections."""
+        pool = self.make_pool(size=5, replenish_concurrency=3)
+        self.assertEqual(len(self.created_clients), 5)
+        self.assertEqual(pool.stats(), {"size": 5, "connections created": 5, "idle": 5, "in use": 0})
+
+    @less_console_noise_decorator
+    def test_background_prefill_does_not_block_creation(self):
+        """With prefill_in_background the constructor returns before the registry answers,
+        and a borrow waits for the connection being built."""
+        registry_answers = threading.Event()
+
+        def slow_factory():
+            registry_answers.wait(5)
+            return self.factory()
+
+        pool = self.make_pool(size=1, borrow_timeout=5, factory=slow_factory, prefill_in_background=True)
+        self.assertEqual(self.created_clients, [])
+
+        registry_answers.set()
+        with pool.connection() as client:
+            self.assertIs(client, self.created_clients[0])
+
     @less_console_noise_decorator
     def test_init_survives_factory_failure(self):
         """If the registry is down at startup, the pool constructs empty instead of raising."""
@@ -174,6 +204,52 @@ class TestEPPConnectionPool(TestCase):
         pool._return_connection(held)
         self.assertIs(pool._borrow(), held)
 
+    @less_console_noise_decorator
+    def test_borrow_wait_is_cut_short_by_request_deadline(self):
+        """A borrow never waits past the current request's deadline, even with a longer borrow_timeout."""
+        pool = self.make_pool(size=1, borrow_timeout=5)
+        pool._borrow()
+        started = time.monotonic()
+        with request_deadline(0.05):
+            with self.assertRaises(PoolExhausted):
+                pool._borrow()
+        self.assertLess(time.monotonic() - started, 1)
+
+    @less_console_noise_decorator
+    def test_batch_lane_leaves_reserved_connections_for_interactive(self):
+        """The batch lane can't take the connections reserved for interactive traffic,
+        and gives up after its own borrow timeout."""
+        pool = self.make_pool(
+            size=2, borrow_timeout=0.05, reserved_for_interactive=1, lane_borrow_timeouts={"batch": 0.05}
+        )
+        with batch_priority():
+            with pool.connection():
+                self.assertEqual(pool.stats()["batch in use"], 1)
+                # a second batch command has to wait for the first
+                with self.assertRaises(PoolExhausted):
+                    with pool.connection():
+                        pass
+                # interactive traffic still gets the reserved connection
+                with priority_lane(INTERACTIVE), pool.connection() as client:
+                    self.assertIsNotNone(client)
+        self.assertEqual(pool.stats()["batch in use"], 0)
+
+    @less_console_noise_decorator
+    def test_batch_lane_always_gets_one_connection(self):
+        """Reserving the whole pool still leaves batch work one connection."""
+        pool = self.make_pool(size=1, reserved_for_interactive=1)
+        with batch_priority():
+            with pool.connection() as client:
+                self.assertIs(client, self.created_clients[0])
+
+    @less_console_noise_decorator
+    def test_lane_capacity(self):
+        """Interactive traffic can use the pool up to its max size, other lanes what's left after the reserve."""
+        pool = self.make_pool(size=3, max_size=5, reserved_for_interactive=1)
+        self.assertEqual(pool.lane_capacity(INTERACTIVE), 5)
+        self.assertEqual(pool.lane_capacity("batch"), 2)
+        self.assertEqual(self.make_pool(size=2).lane_capacity("batch"), 2)
+
     @less_console_noise_decorator
     def test_factory_failure_during_borrow_releases_the_slot(self):
         """A failed creation gives its slot back so a later attempt can retry."""
@@ -305,3 +381,146 @@ class TestEPPConnectionPool(TestCase):
 
         self.created_clients[0].send.assert_not_called()
         self.assertEqual(pool.stats(), {"size": 1, "connections created": 1, "idle": 1, "in use": 0})
+
+    def make_adaptive_pool(self, size=1, max_size=3, **kwargs):
+        """Build an adaptive pool (max_size > size) that grows after a short wait."""
+        kwargs.setdefault("borrow_timeout", 0.2)
+        kwargs.setdefault("grow_wait_seconds", 0.01)
+        return self.make_pool(size=size, max_size=max_size, **kwargs)
+
+    @less_console_noise_decorator
+    def test_fixed_pool_stats_are_unchanged(self):
+        """Without max_size the pool reports the same stats as before."""
+        pool = self.make_pool(size=2)
+        self.assertFalse(pool.is_adaptive)
+        self.assertEqual(pool.stats(), {"size": 2, "connections created": 2, "idle": 2, "in use": 0})
+
+    @less_console_noise_decorator
+    def test_adaptive_pool_starts_at_min_size(self):
+        """Only min_size connections are built up front."""
+        pool = self.make_adaptive_pool(size=1, max_size=3)
+        self.assertEqual(len(self.created_clients), 1)
+        self.assertEqual(
+            pool.stats(),
+            {"size": 1, "connections created": 1, "idle": 1, "in use": 0, "min size": 1, "max size": 3},
+        )
+
+    @less_console_noise_decorator
+    def test_grows_when_borrow_waits(self):
+        """A borrow that waits grow_wait_seconds with no connection free adds one."""
+        pool = self.make_adaptive_pool(size=1, max_size=3)
+        first = pool._borrow()
+        second = pool._borrow()
+        self.assertIsNot(first, second)
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(pool.stats()["in use"], 2)
+
+    @less_console_noise_decorator
+    def test_growth_stops_at_max_size(self):
+        """Once at max_size, borrows wait out the timeout and raise PoolExhausted."""
+        pool = self.make_adaptive_pool(size=1, max_size=2, borrow_timeout=0.05)
+        pool._borrow()
+        pool._borrow()
+        with self.assertRaises(PoolExhausted):
+            pool._borrow()
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(len(self.created_clients), 2)
+
+    @less_console_noise_decorator
+    def test_failed_growth_gives_back_capacity(self):
+        """If the extra connection can't be built, size and the slot count go back down."""
+        pool = self.make_adaptive_pool(size=1, max_size=2)
+        pool._borrow()
+        self.created_clients.clear()
+
+        def bad_factory():
+            raise TransportError("registry unreachable")
+
+        pool._connection_factory = bad_factory
+        with self.assertRaises(TransportError):
+            pool._borrow()
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(pool.stats()["connections created"], 1)
+
+    @less_console_noise_decorator
+    def test_session_budget_denial_prevents_growth(self):
+        """When the shared budget has no slot left the pool stays at its size."""
+        budget = MagicMock()
+        budget.acquire.return_value = None
+        pool = self.make_adaptive_pool(size=1, max_size=3, borrow_timeout=0.05, session_budget=budget)
+        pool._borrow()
+        with self.assertRaises(PoolExhausted):
+            pool._borrow()
+        budget.acquire.assert_called()
+        self.assertEqual(pool.size, 1)
+
+    @less_console_noise_decorator
+    def test_shrinks_unused_extra_connection_after_cooldown(self):
+        """Maintenance retires an extra connection idle past shrink_idle_seconds and gives its lease back."""
+        budget = MagicMock()
+        budget.acquire.return_value = "epp-burst-session:0"
+        pool = self.make_adaptive_pool(size=1, max_size=2, shrink_idle_seconds=60, session_budget=budget)
+        first = pool._borrow()
+        second = pool._borrow()
+        for conn in (first, second):
+            conn.last_used = time.monotonic() - 120
+            pool._put_back(conn)
+        pool._last_grow = time.monotonic() - 120
+
+        pool._maintain_idle_connections()
+
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(pool.stats()["connections created"], 1)
+        self.assertEqual(pool.stats()["idle"], 1)
+        budget.release.assert_called_once_with("epp-burst-session:0")
+
+    @less_console_noise_decorator
+    def test_no_shrink_during_cooldown(self):
+        """Right after growing, idle extras are kept even if they look unused."""
+        pool = self.make_adaptive_pool(size=1, max_size=2, shrink_idle_seconds=60)
+        first = pool._borrow()
+        second = pool._borrow()
+        for conn in (first, second):
+            conn.last_used = time.monotonic() - 120
+            pool._put_back(conn)
+
+        pool._maintain_idle_connections()
+
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(pool.stats()["connections created"], 2)
+
+
+class TestDatabaseSessionBudget(TransactionTestCase):
+    """The shared budget leases slots from EppSessionLease rows, on its own connection."""
+
+    def make_budget(self, limit):
+        budget = DatabaseSessionBudget(limit, lease_seconds=60)
+        # the budget's thread holds its own connection; close it before the test database is flushed
+        self.addCleanup(lambda: budget._executor.submit(connections.close_all).result())
+        return budget
+
+    def test_leases_up_to_the_limit(self):
+        """Each slot is leased once; a released slot can be leased again."""
+        budget = self.make_budget(limit=2)
+        first = budget.acquire()
+        second = budget.acquire()
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertNotEqual(first, second)
+        self.assertIsNone(budget.acquire())
+
+        budget.refresh([first, second])
+        budget.release(first)
+        self.assertEqual(budget.acquire(), first)
+
+    def test_workers_share_the_slots(self):
+        """Another worker's leases count against the same limit, and can't be released by this one."""
+        budget = self.make_budget(limit=1)
+        other_worker = self.make_budget(limit=1)
+        other_worker._owner = "other-host:1"
+        lease = other_worker.acquire()
+        self.assertIsNotNone(lease)
+
+        self.assertIsNone(budget.acquire())
+        budget.release(lease)
+        self.assertIsNone(budget.acquire())
@@ -0,0 +1,88 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Stops sending commands to a registry that keeps failing.
+
+    closed:    commands go through. failure_threshold consecutive failures -> open.
+    open:      commands fail fast without touching the pool. After reset_seconds,
+               the next caller runs `probe` (half-open).
+    half_open: one probe in flight; everyone else still fails fast.
+               Probe succeeds -> closed. Probe fails -> open for another reset_seconds.
+
+    Only infrastructure failures (transport, connection, registry server errors) should
+    be recorded as failures. Any answer from the registry, even a rejection, is a success.
+
+    failure_threshold=0 disables the breaker: allow_request() is always True.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold, reset_seconds, probe):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._probe = probe
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow_request(self) -> bool:
+        """True if a command may be sent now. May run the half-open probe first."""
+        if self.failure_threshold <= 0:
+            return True
+
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN or time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            # this caller probes, everyone else keeps failing fast until it's done
+            self._state = self.HALF_OPEN
+
+        try:
+            self._probe()
+        except Exception:
+            logger.warning("Registry circuit breaker probe failed; staying open for %ss", self.reset_seconds)
+            self._open()
+            return False
+
+        logger.info("Registry circuit breaker probe succeeded; closing")
+        self.record_success()
+        return True
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+            self._state = self.CLOSED
+
+    def record_failure(self) -> bool:
+        """Count an infrastructure failure. Returns True if this one tripped the breaker."""
+        if self.failure_threshold <= 0:
+            return False
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state != self.CLOSED or self._consecutive_failures < self.failure_threshold:
+                return False
+        logger.error(
+            "Registry circuit breaker opened after %s consecutive failures; failing fast for %ss",
+            self.failure_threshold,
+            self.reset_seconds,
+        )
+        self._open()
+        return True
+
+    def _open(self):
+        with self._lock:
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
@@ -0,0 +1,50 @@
+"""The current request's deadline, for registry calls made on its behalf.
+
+RequestDeadlineMiddleware opens a deadline for every request (a little under the
+gunicorn worker timeout). The pool borrow, the retry loop in EPPLibWrapper.send and
+the socket reads/sends all shrink their own timeouts to what is left of it, so we
+don't spend registry capacity on a response gunicorn will kill the request before seeing.
+
+Stored in a contextvar, so it follows the request into send_many's fan-out threads.
+Outside a request (management commands, the heartbeat) there is no deadline and
+every timeout keeps its configured value.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_deadline: ContextVar[float | None] = ContextVar("epp_request_deadline", default=None)
+
+
+@contextmanager
+def request_deadline(seconds):
+    """Registry calls inside the block must finish within `seconds` from now (0 or less:
+    already out of time). None means no deadline. A deadline already in effect is never extended."""
+    if seconds is None:
+        yield
+        return
+
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the deadline (may be negative), or None without a deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def clamp(timeout: float) -> float:
+    """`timeout`, shortened to the time left before the deadline (never below 0)."""
+    left = remaining()
+    if left is None:
+        return timeout
+    return max(min(timeout, left), 0)
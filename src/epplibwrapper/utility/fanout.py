@@ -0,0 +1,25 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fan_out(send_one, commands: list, max_workers: int) -> list:
+    """Call send_one for every command, up to max_workers at a time, and return the
+    results in command order.
+
+    Error semantics match a plain loop: the first failing command (in the given order)
+    raises, and commands that haven't started yet are cancelled.
+    """
+    if max_workers <= 1:
+        return [send_one(command) for command in commands]
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="epp-fanout") as executor:
+        # copy the caller's context into each worker so log context (and anything
+        # else stored in contextvars) follows the command
+        futures = [executor.submit(contextvars.copy_context().run, send_one, command) for command in commands]
+        try:
+            return [future.result() for future in futures]
+        except Exception:
+            # a loop over send() would have stopped here, so don't start what hasn't started yet
+            for future in futures:
+                future.cancel()
+            raise
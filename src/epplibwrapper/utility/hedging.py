@@ -0,0 +1,30 @@
+import math
+import threading
+from collections import deque
+
+
+class LatencyWindow:
+    """Recent registry response times per command type, for picking a hedge delay.
+
+    Keeps the last `size` samples of each command type. percentile() returns None until
+    `min_samples` have been seen, so a fresh worker never hedges on a guess.
+    """
+
+    def __init__(self, size=200, min_samples=20):
+        self.size = size
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque] = {}
+
+    def record(self, key: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.size)).append(seconds)
+
+    def percentile(self, key: str, pct: float) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return None
+        # nearest-rank percentile
+        rank = max(math.ceil(pct / 100 * len(samples)), 1)
+        return samples[rank - 1]
@@ -0,0 +1,48 @@
+"""Priority lanes for EPP traffic.
+
+Every registry command is sent in a lane. Web requests use the default, "interactive".
+Batch work (management commands, background jobs) marks itself "batch":
+
+    with batch_priority():
+        for domain in domains:
+            domain.renew_domain()
+
+or, for a whole management command:
+
+    @batch_priority()
+    def handle(self, **options):
+        ...
+
+The pool keeps reserved_for_interactive connections for interactive traffic (setting
+EPP_POOL_INTERACTIVE_RESERVED); other lanes share the rest. lane_borrow_timeouts gives a
+lane its own borrow timeout (EPP_POOL_BATCH_BORROW_TIMEOUT for batch). See EPPConnectionPool.
+
+Stored in a contextvar, so the lane follows send_many's fan-out threads.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+_lane: ContextVar[str] = ContextVar("epp_priority_lane", default=INTERACTIVE)
+
+
+@contextmanager
+def priority_lane(name: str):
+    """Send the registry commands inside the block in lane `name`."""
+    token = _lane.set(name)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def batch_priority():
+    """Mark the registry commands inside the block (or decorated function) as low priority."""
+    return priority_lane(BATCH)
+
+
+def current_lane() -> str:
+    return _lane.get()
@@ -0,0 +1,207 @@
+"""In-process EPP metrics, rendered in the Prometheus text exposition format.
+
+Recorded by the pool (borrow waits, discards, heartbeat replacements, PoolExhausted)
+and by EPPLibWrapper (per command type latency, retries). Exposed by the staff-only
+/metrics view.
+
+Every value lives in the memory of one worker process, so each series carries
+`instance` and `pid` labels. A scrape is answered by whichever worker picks up
+the request; sum over those labels to see the whole app.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# seconds. EPP commands usually answer in tens of milliseconds; the top buckets
+# catch a slow registry before it reaches the 30s request timeout.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: dict = {}
+
+    def _label_key(self, labels) -> tuple:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    def reset(self):
+        """Forget every recorded value. For tests."""
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._label_key(labels), 0)
+
+    def render(self, const_labels: dict) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        lines = self._header()
+        for key, value in sorted(values.items()):
+            labels = {**const_labels, **dict(zip(self.label_names, key))}
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._label_key(labels)
+        with self._lock:
+            # [per-bucket counts..., sum, count]; bucket counts are not cumulative until rendered
+            series = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe how long the block took, whether or not it raised."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, **labels)
+
+    def count(self, **labels):
+        with self._lock:
+            series = self._values.get(self._label_key(labels))
+            return series[-1] if series else 0
+
+    def render(self, const_labels: dict) -> list[str]:
+        with self._lock:
+            values = {key: list(series) for key, series in self._values.items()}
+        lines = self._header()
+        for key, series in sorted(values.items()):
+            labels = {**const_labels, **dict(zip(self.label_names, key))}
+            cumulative = 0
+            for upper, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                bucket_labels = _format_labels({**labels, "le": _format_value(float(upper))})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {series[-1]}")
+        return lines
+
+
+COMMAND_DURATION = Histogram(
+    "epp_command_duration_seconds",
+    "Time the registry took to answer one EPP command, by command type (excludes the borrow wait).",
+    label_names=("command",),
+)
+BORROW_WAIT = Histogram(
+    "epp_pool_borrow_wait_seconds",
+    "Time spent waiting for a pooled EPP connection, including health checks and replacements.",
+)
+RETRIES = Counter(
+    "epp_command_retries_total",
+    "EPP commands that failed and were retried, by command type.",
+    label_names=("command",),
+)
+DISCARDS = Counter(
+    "epp_pool_discards_total",
+    "Pooled EPP connections closed as dead (transport error or failed health check).",
+)
+HEARTBEAT_REPLACEMENTS = Counter(
+    "epp_pool_heartbeat_replacements_total",
+    "Idle EPP connections the heartbeat found dead and replaced.",
+)
+POOL_EXHAUSTED = Counter(
+    "epp_pool_exhausted_total",
+    "Borrows that gave up because every pooled EPP connection stayed busy (PoolExhausted).",
+)
+BREAKER_TRIPS = Counter(
+    "epp_breaker_trips_total",
+    "Times the registry circuit breaker opened after consecutive registry failures.",
+)
+BREAKER_REJECTIONS = Counter(
+    "epp_breaker_rejections_total",
+    "EPP commands failed fast because the registry circuit breaker was open, by command type.",
+    label_names=("command",),
+)
+HEDGES = Counter(
+    "epp_command_hedges_total",
+    "Read-only EPP commands sent a second time because the first send was slow, by command type and "
+    "by which send answered first (primary or hedge).",
+    label_names=("command", "winner"),
+)
+
+ALL_METRICS = [
+    COMMAND_DURATION,
+    BORROW_WAIT,
+    RETRIES,
+    DISCARDS,
+    HEARTBEAT_REPLACEMENTS,
+    POOL_EXHAUSTED,
+    BREAKER_TRIPS,
+    BREAKER_REJECTIONS,
+    HEDGES,
+]
+
+
+def render(pool_stats: dict | None = None) -> str:
+    """Every metric in the Prometheus text format, plus gauges for the given pool stats."""
+    const_labels = {"instance": os.environ.get("CF_INSTANCE_INDEX", "local"), "pid": os.getpid()}
+    lines = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render(const_labels))
+
+    for stat, value in (pool_stats or {}).items():
+        # "connections created" -> epp_pool_connections_created
+        name = "epp_pool_" + stat.replace(" ", "_")
+        lines.append(f"# HELP {name} EPP connection pool stat '{stat}' (see EPPConnectionPool.stats).")
+        lines.append(f"# TYPE {name} gauge")
+        if isinstance(value, str):
+            # e.g. "circuit breaker": "open" -> epp_pool_circuit_breaker{state="open"} 1
+            lines.append(f"{name}{_format_labels({**const_labels, 'state': value})} 1")
+        else:
+            lines.append(f"{name}{_format_labels(const_labels)} {_format_value(value)}")
+
+    return "\n".join(lines) + "\n"
@@ -4,6 +4,10 @@ import threading
 import time
 from contextlib import contextmanager
 
+from . import metrics
+from .deadline import clamp as clamp_to_deadline
+from .lanes import INTERACTIVE, current_lane
+
 try:
     from epplib.commands import Hello, Logout
     from epplib.exceptions import TransportError
@@ -34,21 +38,75 @@ class PooledConnection:
     def __init__(self, client):
         self.client = client
         self.last_ping = time.monotonic()
+        # refreshed on checkin only (not by heartbeat pings), so now - last_used
+        # is how long the connection has gone without serving a command
+        self.last_used = self.last_ping
 
 
 class EPPConnectionPool:
-    def __init__(self, connection_factory, size, borrow_timeout, idle_ping_seconds, heartbeat_interval, prefill=False):
+    def __init__(
+        self,
+        connection_factory,
+        size,
+        borrow_timeout,
+        idle_ping_seconds,
+        heartbeat_interval,
+        prefill=False,
+        prefill_in_background=False,
+        replenish_concurrency=1,
+        reserved_for_interactive=0,
+        lane_borrow_timeouts=None,
+        max_size=None,
+        grow_wait_seconds=0.5,
+        shrink_idle_seconds=300,
+        session_budget=None,
+    ):
+        """
+        prefill: build the connections up front. With prefill_in_background that happens
+        on a background thread, so creating the pool (at import) never waits on the registry;
+        early borrows simply wait for the first connection to land.
+        replenish_concurrency: how many connections (re)building may log in at once.
+
+        Priority lanes (see lanes.py): reserved_for_interactive connections are kept for the
+        interactive lane. Commands in any other lane (e.g. batch) share what's left, and
+        always at least one. lane_borrow_timeouts overrides borrow_timeout per lane.
+
+        Fixed mode (default): exactly `size` connections.
+
+        Adaptive mode (max_size > size): `size` is the floor (min_size). When a borrow has
+        waited grow_wait_seconds for a connection, the pool adds one, up to max_size,
+        provided session_budget (shared by all workers, see session_budget.py) grants it.
+        The maintenance pass retires extra connections once they have gone unused for
+        shrink_idle_seconds and the pool hasn't grown for that long either.
+        """
         self._connection_factory = connection_factory
+        # current capacity. Only moves in adaptive mode, between min_size and max_size
         self.size = size
+        self.min_size = size
+        self.max_size = max(size, max_size or size)
         self.borrow_timeout = borrow_timeout
         self.idle_ping_seconds = idle_ping_seconds
         self.heartbeat_interval = heartbeat_interval
+        self.grow_wait_seconds = grow_wait_seconds
+        self.shrink_idle_seconds = shrink_idle_seconds
+        self._session_budget = session_budget
+        self.replenish_concurrency = max(replenish_concurrency, 1)
+        self.reserved_for_interactive = reserved_for_interactive
+        self.lane_borrow_timeouts = lane_borrow_timeouts or {}
+
+        # connections held by non-interactive lanes, guarded by _lane_condition
+        self._background_in_use = 0
+        self._lane_condition = threading.Condition()
+
+        # budget leases held for the connections above min_size, one per extra slot
+        self._budget_leases: list = []
+        self._last_grow = 0.0
 
         # LIFO stack of idle connections: the most recently returned
         # connection is handed out first. The oldest connections
         # settle at the bottom and eventually age past idle_ping_seconds,
-        # where the heartbeat pings them.
-        self._idle: queue.LifoQueue = queue.LifoQueue(maxsize=size)
+        # where the heartbeat pings them (or, in adaptive mode, retires them).
+        self._idle: queue.LifoQueue = queue.LifoQueue(maxsize=self.max_size)
 
         # counts connections that exist, including ones in use (checked out)
         # and ones in the idle stack. This is used to enforce the pool size limit.
@@ -61,7 +119,9 @@ class EPPConnectionPool:
         self._creation_lock = threading.Lock()
 
         # Fill the Queue of connections to begin with
-        if prefill:
+        if prefill and prefill_in_background:
+            threading.Thread(target=self._replenish, daemon=True, name="epp-pool-prefill").start()
+        elif prefill:
             self._replenish()
 
         # Background maintenance thread. daemon=True means it never blocks process shutdown.
@@ -95,23 +155,72 @@ class EPPConnectionPool:
         In these cases, look for credential or command logic errors.
         """
 
-        conn = self._borrow()
-        try:
-            yield conn.client
-        except TransportError:
-            # the socket is likely dead. Discard it and let the pool create a new one.
-            self._discard(conn)
+        lane = current_lane()
+        borrow_timeout = self.lane_borrow_timeouts.get(lane, self.borrow_timeout)
+        with self._lane_slot(lane, borrow_timeout) as remaining_timeout:
+            conn = self._borrow(remaining_timeout)
+            try:
+                yield conn.client
+            except TransportError:
+                # the socket is likely dead. Discard it and let the pool create a new one.
+                self._discard(conn)
 
-            # Raise error to enforce a retry
-            raise
+                # Raise error to enforce a retry
+                raise
 
-        except Exception:
-            # the transport is presumed fine. Return it to the pool for reuse.
-            self._return_connection(conn)
-            raise
-        else:
-            # no exception, return it to the pool for reuse.
-            self._return_connection(conn)
+            except Exception:
+                # the transport is presumed fine. Return it to the pool for reuse.
+                conn.last_used = time.monotonic()
+                self._return_connection(conn)
+                raise
+            else:
+                # no exception, return it to the pool for reuse.
+                conn.last_used = time.monotonic()
+                self._return_connection(conn)
+
+    @contextmanager
+    def _lane_slot(self, lane, borrow_timeout):
+        """Hold one of the connections a non-interactive lane may use while the block runs.
+        Yields what's left of borrow_timeout for the borrow itself.
+
+        Raises:
+            PoolExhausted: if the lane stays at its share for the whole borrow_timeout.
+        """
+        if lane == INTERACTIVE or not self.reserved_for_interactive:
+            yield borrow_timeout
+            return
+
+        started = time.monotonic()
+        with self._lane_condition:
+            has_room = self._lane_condition.wait_for(
+                lambda: self._background_in_use < self._background_capacity(),
+                timeout=clamp_to_deadline(borrow_timeout),
+            )
+            if not has_room:
+                metrics.POOL_EXHAUSTED.inc()
+                raise PoolExhausted(
+                    f"No EPP connection available in the {lane} lane after {borrow_timeout}s. {self.stats()}"
+                )
+            self._background_in_use += 1
+
+        try:
+            yield borrow_timeout - (time.monotonic() - started)
+        finally:
+            with self._lane_condition:
+                self._background_in_use -= 1
+                self._lane_condition.notify()
+
+    def _background_capacity(self) -> int:
+        """How many connections non-interactive lanes may hold at once."""
+        return max(self.size - self.reserved_for_interactive, 1)
+
+    def lane_capacity(self, lane) -> int:
+        """How many connections commands in this lane can hold at once: up to max_size
+        for interactive traffic (an adaptive pool grows under load), what's left after
+        the interactive reserve for any other lane."""
+        if lane == INTERACTIVE or not self.reserved_for_interactive:
+            return self.max_size
+        return self._background_capacity()
 
     def close_all(self):
         """Close all idle connections cleanly
@@ -133,14 +242,26 @@ class EPPConnectionPool:
         idle    = connections currently waiting (idle) in the queue
         in use  = connections currently in use
         """
-        return {
+        stats = {
             "size": self.size,
             "connections created": self._connections_created,
             "idle": self._idle.qsize(),
             "in use": self._connections_created - self._idle.qsize(),
         }
-
-    def _borrow(self) -> PooledConnection:
+        if self.reserved_for_interactive:
+            # connections held by batch (non-interactive) lanes right now
+            stats["batch in use"] = self._background_in_use
+        if self.is_adaptive:
+            # min size / max size = the bounds size moves between
+            stats["min size"] = self.min_size
+            stats["max size"] = self.max_size
+        return stats
+
+    @property
+    def is_adaptive(self) -> bool:
+        return self.max_size > self.min_size
+
+    def _borrow(self, borrow_timeout=None) -> PooledConnection:
         """
         Borrow a connection from the pool, replace stale ones if needed.
 
@@ -150,11 +271,15 @@ class EPPConnectionPool:
             PoolExhausted: if no connection becomes available within the borrow timeout.
         """
         # Deadline is time when borrow expires, if can't borrow within this time,
-        # raise PoolExhausted.
-        deadline = time.monotonic() + self.borrow_timeout
+        # raise PoolExhausted. Never waits past the current request's deadline.
+        if borrow_timeout is None:
+            borrow_timeout = self.borrow_timeout
+        started = time.monotonic()
+        deadline = started + clamp_to_deadline(borrow_timeout)
         while True:
             conn = self._get_or_create(deadline)
             if self._is_healthy(conn):
+                metrics.BORROW_WAIT.observe(time.monotonic() - started)
                 return conn
 
             # Health check failed. Discard it + try again.
@@ -197,12 +322,20 @@ class EPPConnectionPool:
                 self._release_slot()
                 raise
 
-        # Step 3: Pool is at max size, wait for a connection to be returned to the pool
+        # Step 3 (adaptive mode only): wait a little for a returned connection. If none
+        # comes back in grow_wait_seconds, this worker needs more capacity - add a connection.
+        if self.is_adaptive and self.size < self.max_size:
+            conn = self._wait_or_grow(deadline)
+            if conn is not None:
+                return conn
+
+        # Step 4: Pool is at max size, wait for a connection to be returned to the pool
         # only wait for the remaining time until the deadline.
         remaining = deadline - time.monotonic()
         try:
             return self._idle.get(timeout=max(remaining, 0))
         except queue.Empty:
+            metrics.POOL_EXHAUSTED.inc()
             logger.debug("No EPP connection available after %s. %s", self.borrow_timeout, self.stats())
             raise PoolExhausted(f"No EPP connection available after {self.borrow_timeout}s. {self.stats()}")
 
@@ -259,13 +392,20 @@ class EPPConnectionPool:
             except queue.Empty:
                 break
 
-        # for each conn. 1.) return it to the Q if it recently proved it was alive
+        # for each conn. 0.) in adaptive mode, retire it if it's an extra connection nobody needed lately
+        # 1.) return it to the Q if it recently proved it was alive
         # 2.) if it's been unpinged too long ping it & return it to Q if it's healthy,
         # 3.) if the ping fails, discard it.
 
         now = time.monotonic()
 
         for conn in snapshot:
+            if self._should_shrink(conn, now):
+                logger.info("Retiring an extra EPP connection that went unused. %s", self.stats())
+                self._retire(conn)
+                self._shrink_capacity()
+                continue
+
             last_ping_idle_time = now - conn.last_ping
 
             # if the time since the last ping is greater than the ping threshold,
@@ -275,6 +415,7 @@ class EPPConnectionPool:
                 if is_healthy:
                     self._return_connection(conn)
                 else:
+                    metrics.HEARTBEAT_REPLACEMENTS.inc()
                     logger.info("Heartbeat replaced a dead idle EPP connection. %s", self.stats())
                     self._discard(conn)
             else:
@@ -283,6 +424,9 @@ class EPPConnectionPool:
 
         self._replenish()
 
+        if self._session_budget is not None:
+            self._session_budget.refresh(list(self._budget_leases))
+
     def _replenish(self):
         """Refills queue if 1 or more connections were discarded/retired
         otherwise does nothing
@@ -291,12 +435,12 @@ class EPPConnectionPool:
         relying on the next .send or heartbeat to result in _replenish being called
         """
 
+        if self.replenish_concurrency > 1:
+            self._replenish_concurrently()
+            return
+
         while self._connections_created < self.size and self._can_create():
-            try:
-                self._put_back(PooledConnection(self._connection_factory()))
-            except Exception:
-                self._release_slot()
-                logger.error("Replenish hit an error & failed to build a connection. Stats: %s", self.stats())
+            if not self._build_into_reserved_slot():
                 # Exit the loop if we can't form a connection
                 # log in creds could be invalid
                 # or the registry system is down
@@ -304,6 +448,40 @@ class EPPConnectionPool:
                 # At the next heartbeat _replenish will be called
                 break
 
+    def _replenish_concurrently(self):
+        """_replenish, with up to replenish_concurrency connections handshaking and logging in
+        at once, so filling the pool takes about one connection's time instead of `size` of them.
+        Stops after the first round with a failure, like the sequential loop."""
+        while True:
+            reserved = 0
+            while reserved < self.replenish_concurrency and self._can_create():
+                reserved += 1
+            if not reserved:
+                return
+
+            builders = [
+                threading.Thread(target=self._build_into_reserved_slot, daemon=True, name="epp-pool-replenish")
+                for _ in range(reserved)
+            ]
+            for builder in builders:
+                builder.start()
+            for builder in builders:
+                builder.join()
+
+            # a failed build gave its slot back; don't hammer a registry that's refusing us
+            if self._connections_created < self.size:
+                return
+
+    def _build_into_reserved_slot(self) -> bool:
+        """Build one connection into a slot already reserved with _can_create. False if it failed."""
+        try:
+            self._put_back(PooledConnection(self._connection_factory()))
+            return True
+        except Exception:
+            self._release_slot()
+            logger.error("Replenish hit an error & failed to build a connection. Stats: %s", self.stats())
+            return False
+
     def _can_create(self) -> bool:
         """True if able to create one more connection. False if at capacity.
         updates the _connections_created counter"""
@@ -314,6 +492,77 @@ class EPPConnectionPool:
             else:
                 return False
 
+    def _wait_or_grow(self, deadline) -> PooledConnection | None:
+        """Adaptive mode: wait up to grow_wait_seconds for a returned connection, then try
+        to grow the pool by one. None if neither worked (caller keeps waiting)."""
+        remaining = deadline - time.monotonic()
+        try:
+            return self._idle.get(timeout=max(min(self.grow_wait_seconds, remaining), 0))
+        except queue.Empty:
+            pass
+
+        if not self._grow():
+            return None
+        try:
+            return PooledConnection(self._connection_factory())
+        except Exception:
+            logger.debug("Failed to create a connection after growing. Pool stats: %s", self.stats())
+            self._release_slot()
+            self._shrink_capacity()
+            raise
+
+    def _grow(self) -> bool:
+        """Adaptive mode: raise capacity by one and reserve the new slot for the caller.
+        Returns False when already at max_size or the session budget says no."""
+        with self._creation_lock:
+            if self.size >= self.max_size:
+                return False
+
+        lease = None
+        if self._session_budget is not None:
+            # outside the lock: this talks to the database
+            lease = self._session_budget.acquire()
+            if lease is None:
+                logger.info("EPP pool wanted to grow but the session budget is used up. %s", self.stats())
+                return False
+
+        with self._creation_lock:
+            if self.size >= self.max_size:
+                # someone else grew us to max while the lease was being acquired
+                grown = False
+            else:
+                self.size += 1
+                self._connections_created += 1
+                self._budget_leases.append(lease)
+                self._last_grow = time.monotonic()
+                grown = True
+
+        if not grown and lease is not None:
+            self._session_budget.release(lease)
+        if grown:
+            logger.info("EPP pool grew after a slow borrow. %s", self.stats())
+        return grown
+
+    def _shrink_capacity(self):
+        """Adaptive mode: lower capacity by one and give back its budget lease."""
+        with self._creation_lock:
+            if self.size <= self.min_size:
+                return
+            self.size -= 1
+            lease = self._budget_leases.pop() if self._budget_leases else None
+        if lease is not None and self._session_budget is not None:
+            self._session_budget.release(lease)
+
+    def _should_shrink(self, conn: PooledConnection, now: float) -> bool:
+        """True for an idle connection above min_size that nobody has needed for shrink_idle_seconds,
+        as long as the pool itself hasn't had to grow in that time (the cool-down)."""
+        return (
+            self.is_adaptive
+            and self.size > self.min_size
+            and now - conn.last_used > self.shrink_idle_seconds
+            and now - self._last_grow > self.shrink_idle_seconds
+        )
+
     def _return_connection(self, conn: PooledConnection):
         """Return after the connection proved itself alive (real command or ping)."""
         conn.last_ping = time.monotonic()
@@ -329,6 +578,7 @@ class EPPConnectionPool:
 
     def _discard(self, conn: PooledConnection):
         """Dispose of a connection presumed dead."""
+        metrics.DISCARDS.inc()
 
         try:
             conn.client.close()
@@ -0,0 +1,97 @@
+import logging
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseSessionBudget:
+    """A cap on how many *extra* EPP sessions all workers may hold at once.
+
+    Adaptive pools (see EPPConnectionPool) always keep their min_size connections.
+    Every connection they add on top of that must first lease one of `limit` slots here.
+    The slots are EppSessionLease rows, so every worker and instance pointed at the same
+    database competes for the same slots.
+
+    Leasing, refreshing and releasing are one UPDATE each: a lease takes the first expired
+    slot that no other worker is taking at the same moment (FOR UPDATE SKIP LOCKED).
+    Leases expire after lease_seconds unless refreshed, and are released when the pool
+    shrinks. A worker that dies without releasing its slots only holds them until the
+    lease expires.
+
+    Queries run on one long-lived thread per budget, with its own DB connection. Growth
+    is triggered from inside a request, and a lease written inside that request's
+    transaction would not be visible to (and could block) other workers until the
+    request commits.
+    """
+
+    def __init__(self, limit, lease_seconds):
+        self.limit = limit
+        self.lease_seconds = lease_seconds
+        self._owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="epp-session-budget")
+        self._slots_created = False
+
+    @property
+    def _table(self):
+        return connection.ops.quote_name(apps.get_model("registrar", "EppSessionLease")._meta.db_table)
+
+    def acquire(self) -> str | None:
+        """Lease a free slot. Returns its key, or None if every slot is taken (or the database failed)."""
+
+        def lease(cursor):
+            if not self._slots_created:
+                # Slots past the limit are left alone, so lowering the limit only stops new leases there
+                cursor.execute(
+                    f"INSERT INTO {self._table} (slot, owner, expires_at) "
+                    "SELECT slot, '', now() FROM generate_series(0, %s - 1) AS slot ON CONFLICT DO NOTHING",
+                    [self.limit],
+                )
+                self._slots_created = True
+            cursor.execute(
+                f"UPDATE {self._table} SET owner = %s, expires_at = now() + make_interval(secs => %s) "
+                f"WHERE slot = (SELECT slot FROM {self._table} WHERE slot < %s AND expires_at <= now() "
+                "ORDER BY slot LIMIT 1 FOR UPDATE SKIP LOCKED) RETURNING slot",
+                [self._owner, self.lease_seconds, self.limit],
+            )
+            row = cursor.fetchone()
+            return str(row[0]) if row else None
+
+        return self._run_outside_request(lease, default=None)
+
+    def release(self, key: str):
+        self._run_outside_request(
+            lambda cursor: cursor.execute(
+                f"UPDATE {self._table} SET owner = '', expires_at = now() WHERE slot = %s AND owner = %s",
+                [int(key), self._owner],
+            )
+        )
+
+    def refresh(self, keys: list[str]):
+        """Extend the leases this worker still holds. Called from the pool's maintenance pass."""
+        if keys:
+            self._run_outside_request(
+                lambda cursor: cursor.execute(
+                    f"UPDATE {self._table} SET expires_at = now() + make_interval(secs => %s) "
+                    "WHERE slot = ANY(%s) AND owner = %s",
+                    [self.lease_seconds, [int(key) for key in keys], self._owner],
+                )
+            )
+
+    def _run_outside_request(self, fn, default=None):
+        def target():
+            # drops the thread's connection if it has gone stale or past CONN_MAX_AGE
+            close_old_connections()
+            with connection.cursor() as cursor:
+                return fn(cursor)
+
+        try:
+            return self._executor.submit(target).result()
+        except Exception:
+            # fail closed: no lease means the pool just doesn't grow
+            logger.warning("EPP session budget call failed", exc_info=True)
+            return default
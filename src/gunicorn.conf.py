@@ -38,5 +38,5 @@ def worker_exit(server, worker):
 
     if CLIENT is not None:
         worker.log.info("Closing all Registrar to Registry connections")
-        CLIENT._pool.close_all()
+        CLIENT.close_all()
         worker.log.info("Successfully closed all connections")
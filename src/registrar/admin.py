@@ -3,7 +3,6 @@ import logging
 import copy
 from typing import Optional
 from django import forms
-from django.db import transaction
 from django.db.models import (
     Case,
     CharField,
@@ -47,12 +46,12 @@ from registrar.models import (
     StateTribe,
     FederalTribe,
 )
+from registrar.models.utility import domain_deletion
 from registrar.models.utility.portfolio_helper import UserPortfolioPermissionChoices, UserPortfolioRoleChoices
 from registrar.utility.email_invitations import (
     send_domain_invitation_email,
     send_portfolio_admin_addition_emails,
     send_portfolio_invitation_email,
-    send_domain_deleted_email_to_managers_and_admins,
     send_domain_on_hold_admin_email_to_managers_and_admins,
 )
 from registrar.views.utility.invitation_helper import (
@@ -5458,6 +5457,7 @@ class DomainAdmin(ListHeaderAdmin, ImportExportRegistrarModelAdmin):
                 domain.expiration_date if domain.expiration_date is not None else self._get_current_date()
             )
             extra_context["dns_hosting_enabled"] = flag_is_active(request, "dns_hosting")
+            extra_context["deletion_job"] = domain_deletion.latest_job(domain)
 
         return super().changeform_view(request, object_id, form_url, extra_context)
 
@@ -5538,9 +5538,8 @@ class DomainAdmin(ListHeaderAdmin, ImportExportRegistrarModelAdmin):
             return
 
         try:
-            with transaction.atomic():
-                obj.deleteInEpp()
-                obj.save(optimistic_lock=True)
+            # the registry steps run outside this request; the change form shows their progress
+            domain_deletion.enqueue(obj, requested_by=request.user, notify_managers=True, optimistic_lock=True)
         except RegistryError as err:
             # Using variables to get past the linter
             message1 = f"Cannot delete Domain when in state {obj.state}"
@@ -5585,11 +5584,11 @@ class DomainAdmin(ListHeaderAdmin, ImportExportRegistrarModelAdmin):
                 messages.ERROR,
             )
         else:
+            # domain managers and portfolio admins are emailed once the job has deleted the domain
             self.message_user(
                 request,
-                "Domain %s has been deleted. Thanks!" % obj.name,
+                "Removal of %s from the registry has started. Its progress is shown on this page." % obj.name,
             )
-            send_domain_deleted_email_to_managers_and_admins(domain=obj)
 
         return HttpResponseRedirect(".")
 
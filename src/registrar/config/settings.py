@@ -181,6 +181,8 @@ INSTALLED_APPS = [
 # Adding them here turns them "on"; Django will perform the
 # specified routines on each incoming request and outgoing response.
 MIDDLEWARE = [
+    # start the request's registry deadline first, so it covers every middleware below
+    "registrar.registrar_middleware.RequestDeadlineMiddleware",
     # provide security enhancements to the request/response cycle
     "django.middleware.security.SecurityMiddleware",
     # django-allow-cidr: enable use of CIDR IP ranges in ALLOWED_HOSTS
@@ -232,11 +234,70 @@ WSGI_APPLICATION = "registrar.config.wsgi.application"
 # https://docs.djangoproject.com/en/4.0/howto/static-files/
 
 
+# Seconds registry data about a domain (InfoDomain plus hosts/contacts) is shared
+# across requests and workers before it is fetched again. 0 disables the shared tier.
+# Entries are always dropped as soon as the domain is updated through the registrar.
+REGISTRY_CACHE_TTL = env.int("REGISTRY_CACHE_TTL", default=60) if not RUNNING_TESTS else 0
+
+# Seconds a contact's InfoContact data is shared before it is fetched again. Contacts
+# rarely change, and every update made through the registrar drops the entry. 0 disables it.
+REGISTRY_CONTACT_CACHE_TTL = env.int("REGISTRY_CONTACT_CACHE_TTL", default=3600) if not RUNNING_TESTS else 0
+
+# Max number of entries in the shared registry cache; past this the oldest are culled.
+REGISTRY_CACHE_MAX_ENTRIES = env.int("REGISTRY_CACHE_MAX_ENTRIES", default=5000)
+
+# Domain pages render registry data from the domain's last fetched copy (a snapshot
+# in the database) and refresh it in the background once it is older than this many
+# seconds. Updates made through the registrar drop the snapshot right away. 0 disables it.
+REGISTRY_SNAPSHOT_STALE_SECONDS = env.int("REGISTRY_SNAPSHOT_STALE_SECONDS", default=300) if not RUNNING_TESTS else 0
+REGISTRY_SNAPSHOT_REFRESH_IN_BACKGROUND = not RUNNING_TESTS
+
+# Domain deletions started from the admin or the domain delete page run their registry
+# steps in a background thread (see registrar/models/utility/domain_deletion.py).
+DOMAIN_DELETION_IN_BACKGROUND = not RUNNING_TESTS
+
+# Seconds an answer of the public availability API is reused for the same name.
+# Kept short: a name can be registered at any time. 0 disables the cache.
+AVAILABILITY_CACHE_TTL = env.int("AVAILABILITY_CACHE_TTL", default=30) if not RUNNING_TESTS else 0
+
+# Seconds RDAP answers for the public rdap API are shared across workers: found domains
+# for RDAP_CACHE_TTL, not-found ones for RDAP_NEGATIVE_CACHE_TTL. 0 disables the cache.
+RDAP_CACHE_TTL = env.int("RDAP_CACHE_TTL", default=600) if not RUNNING_TESTS else 0
+RDAP_NEGATIVE_CACHE_TTL = env.int("RDAP_NEGATIVE_CACHE_TTL", default=60)
+
+# Max number of cached RDAP answers; past this the oldest are culled.
+RDAP_CACHE_MAX_ENTRIES = env.int("RDAP_CACHE_MAX_ENTRIES", default=5000)
+
+# Seconds the current-full and current-federal reports reuse their rendered rows after a
+# full build, so a run only re-renders rows that changed and skips the report if none
+# did (see registrar/utility/current_reports.py). 0 rebuilds the reports in full every run.
+CURRENT_REPORT_CACHE_TTL = env.int("CURRENT_REPORT_CACHE_TTL", default=604800) if not RUNNING_TESTS else 0
+
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.db.DatabaseCache",
         "LOCATION": "cache_table",
-    }
+    },
+    # see registrar/models/utility/registry_cache.py
+    "registry": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "registry_cache_table",
+        "TIMEOUT": REGISTRY_CACHE_TTL,
+        "OPTIONS": {"MAX_ENTRIES": REGISTRY_CACHE_MAX_ENTRIES},
+    },
+    # see api/rdap.py
+    "rdap": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "rdap_cache_table",
+        "TIMEOUT": RDAP_CACHE_TTL,
+        "OPTIONS": {"MAX_ENTRIES": RDAP_CACHE_MAX_ENTRIES},
+    },
+    # see registrar/utility/current_reports.py
+    "reports": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "reports_cache_table",
+        "TIMEOUT": CURRENT_REPORT_CACHE_TTL,
+    },
 }
 
 # Absolute path to the directory where `collectstatic`
@@ -832,12 +893,89 @@ EPP_POOL_HEARTBEAT_INTERVAL = (
     env.int("EPP_POOL_HEARTBEAT_INTERVAL", default=30) if not (RUNNING_TESTS or IS_LOCAL) else 0
 )
 
-# Max seconds an established EPP socket may block on a read/send before raising
-# (does not bound the initial TCP connect). The registry normally responds in
-# milliseconds; this is a backstop so an unresponsive registry cannot hang a
-# request (and hold the connection lock) indefinitely.
+# Adaptive pool sizing. When EPP_POOL_MAX_SIZE is above EPP_CONNECTION_POOL_SIZE, each
+# worker starts with EPP_CONNECTION_POOL_SIZE connections and adds one (up to the max)
+# whenever a borrow has waited EPP_POOL_GROW_WAIT_SECONDS. Extra connections unused for
+# EPP_POOL_SHRINK_IDLE_SECONDS are logged out again. 0 keeps the pool a fixed size.
+EPP_POOL_MAX_SIZE = env.int("EPP_POOL_MAX_SIZE", default=0)
+EPP_POOL_GROW_WAIT_SECONDS = env.float("EPP_POOL_GROW_WAIT_SECONDS", default=0.5)
+EPP_POOL_SHRINK_IDLE_SECONDS = env.int("EPP_POOL_SHRINK_IDLE_SECONDS", default=300)
+
+# Max extra (above EPP_CONNECTION_POOL_SIZE) connections all workers together may open,
+# so bursts can't exceed the registry's session allowance. Shared through EppSessionLease
+# rows. 0 means no shared limit (each worker is only capped by EPP_POOL_MAX_SIZE).
+EPP_POOL_BURST_SESSION_BUDGET = env.int("EPP_POOL_BURST_SESSION_BUDGET", default=0)
+
+# Priority lanes: connections kept for interactive (web) traffic. Batch work marked with
+# epplibwrapper.utility.lanes.batch_priority (management commands, background jobs)
+# shares the rest of the pool, and always gets at least one connection. With a pool of 1
+# there is nothing to reserve. Batch borrows may wait longer than interactive ones.
+EPP_POOL_INTERACTIVE_RESERVED = env.int("EPP_POOL_INTERACTIVE_RESERVED", default=1) if not RUNNING_TESTS else 0
+EPP_POOL_BATCH_BORROW_TIMEOUT = env.int("EPP_POOL_BATCH_BORROW_TIMEOUT", default=60)
+
+# Circuit breaker in EPPLibWrapper.send: after this many consecutive transport,
+# connection or registry server errors, commands fail fast (a RegistryError that
+# reads as "cannot contact registry") instead of retrying into a dead registry.
+# After EPP_BREAKER_RESET_SECONDS one request probes with a Hello; success closes
+# the breaker again. 0 disables it.
+EPP_BREAKER_FAILURE_THRESHOLD = env.int("EPP_BREAKER_FAILURE_THRESHOLD", default=5) if not RUNNING_TESTS else 0
+EPP_BREAKER_RESET_SECONDS = env.int("EPP_BREAKER_RESET_SECONDS", default=15)
+
+# Seconds of a request's time that registry calls may use, counted from when the
+# request enters Django. Keep it under the gunicorn worker timeout (-t 30 in run.sh):
+# the pool borrow, send's retries and socket reads all stop at this deadline instead
+# of working on a response gunicorn would kill. 0 disables it.
+REQUEST_DEADLINE_SECONDS = env.int("REQUEST_DEADLINE_SECONDS", default=25)
+
+# send won't start an attempt (or a retry) with less than this many seconds left
+# before the request deadline.
+EPP_MIN_ATTEMPT_SECONDS = 0.5
+
+# Broker mode. When set, one `manage.py run_epp_broker` process (started by run.sh)
+# owns the logged-in EPP sessions and pool, and the gunicorn workers send their
+# commands to it over this Unix domain socket. Sessions then no longer scale with the
+# worker count, and worker recycling doesn't force re-logins. Empty = each worker
+# has its own pool.
+EPP_BROKER_SOCKET = env.str("EPP_BROKER_SOCKET", default="")
+
+# Max seconds a worker waits on the broker for one command, including the broker's
+# pool borrow and retries. Keep it under the gunicorn request timeout (30s).
+EPP_BROKER_TIMEOUT = env.int("EPP_BROKER_TIMEOUT", default=25)
+
+# Max seconds an established EPP socket may block on a read/send before raising.
+# The registry normally responds in milliseconds; this is a backstop so an
+# unresponsive registry cannot hang a request (and hold the connection lock) indefinitely.
 EPP_CONNECTION_TIMEOUT = 5
 
+# Max seconds for the TCP connect and TLS handshake of a new EPP connection, so a
+# black-holed registry can't hang worker startup or a borrow that builds a connection.
+EPP_CONNECT_TIMEOUT = 5
+
+# Connections the pool builds (connect + TLS + login) at once when filling up.
+# Workers prefill in the background, so importing the app never waits on the registry.
+EPP_POOL_PREFILL_CONCURRENCY = env.int("EPP_POOL_PREFILL_CONCURRENCY", default=4) if not RUNNING_TESTS else 1
+EPP_POOL_PREFILL_IN_BACKGROUND = not RUNNING_TESTS
+
+# Max independent commands a single domain lookup (InfoHost, InfoContact) or nameserver
+# update (CreateHost, UpdateHost, DeleteHost) sends to the registry at once. Each one
+# borrows its own pooled connection, so the effective limit is also capped by what the
+# pool lets the caller's priority lane hold (EPP_POOL_MAX_SIZE, less EPP_POOL_INTERACTIVE_RESERVED
+# outside the interactive lane). 1 sends them one after another.
+EPP_FANOUT_CONCURRENCY = env.int("EPP_FANOUT_CONCURRENCY", default=4) if not RUNNING_TESTS else 1
+
+# Max domain names sent in one CheckDomain command (Domain.available_many).
+# Larger lists are split into several commands of this size.
+EPP_CHECK_DOMAIN_BATCH_SIZE = env.int("EPP_CHECK_DOMAIN_BATCH_SIZE", default=5)
+
+# Hedged reads: when a read-only command (InfoDomain, InfoHost, InfoContact, CheckDomain)
+# has had no answer after this percentile of its recent response times, send the same
+# command again on another idle pooled connection and use whichever answers first.
+# Write commands are never hedged. 0 disables it.
+EPP_HEDGE_PERCENTILE = env.int("EPP_HEDGE_PERCENTILE", default=95) if not RUNNING_TESTS else 0
+
+# Never hedge sooner than this many seconds, however fast the registry has been.
+EPP_HEDGE_MIN_DELAY_SECONDS = 0.05
+
 # endregion
 
 # region: DNS----------------------------------------------------------###
@@ -0,0 +1,164 @@
+"""Benchmarks EPPLibWrapper and its connection pool against a local fake registry.
+
+Every size x concurrency combination gets a fresh wrapper and pool, logged in to a
+FakeRegistry (epplibwrapper/tests/fake_registry.py) over TLS (plain TCP with --no-tls),
+and sends --commands commands
+from --concurrency workers. Reports commands/sec and p50/p95/p99 latency of `send`
+(borrow wait and retries included).
+
+Runs under gevent, like the gunicorn workers: the command re-runs itself under
+`python -m gevent.monkey`. --threads uses OS threads instead.
+
+    ./manage.py benchmark_epp_pool --sizes 1 3 5 --concurrency 1 10 50 --latency 0.02
+"""
+
+import logging
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from epplibwrapper.errors import RegistryError
+from epplibwrapper.tests.fake_registry import FakeRegistry, FakeRegistryWrapper, registry_ssl_context
+
+try:
+    from epplib import commands
+except ImportError:
+    pass
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DOMAIN = "benchmark.gov"
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(math.ceil(pct / 100 * len(sorted_values)), 1) - 1]
+
+
+class Command(BaseCommand):
+    help = "Measure EPP connection pool throughput and latency against a local fake registry"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", type=int, default=[1, 3, 5], help="Pool sizes to test")
+        parser.add_argument(
+            "--concurrency", nargs="+", type=int, default=[1, 10, 50], help="Concurrent senders to test"
+        )
+        parser.add_argument("--commands", type=int, default=500, help="Commands sent per size/concurrency run")
+        parser.add_argument("--command", choices=["info", "check"], default="info", help="InfoDomain or CheckDomain")
+        parser.add_argument("--latency", type=float, default=0.01, help="Seconds the fake registry takes to answer")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Share of commands answered with 2400")
+        parser.add_argument("--drop-rate", type=float, default=0.0, help="Share of commands that drop the connection")
+        parser.add_argument("--threads", action="store_true", help="Use OS threads instead of gevent")
+        parser.add_argument("--no-tls", action="store_true", help="Serve and connect over plain TCP")
+
+    def handle(self, *args, **options):
+        if not options["threads"]:
+            self._ensure_gevent()
+
+        with tempfile.TemporaryDirectory() as directory:
+            registry = FakeRegistry(
+                latency=options["latency"],
+                error_rate=options["error_rate"],
+                drop_rate=options["drop_rate"],
+                ssl_context=None if options["no_tls"] else registry_ssl_context(directory),
+                seed=0,
+            )
+            registry.add_domain(BENCHMARK_DOMAIN)
+            registry.start()
+            try:
+                results = [
+                    self._run(registry, size, concurrency, options)
+                    for size in options["sizes"]
+                    for concurrency in options["concurrency"]
+                ]
+            finally:
+                registry.stop()
+
+        header = ("size", "concurrency", "commands/s", "p50 ms", "p95 ms", "p99 ms", "errors")
+        self.stdout.write(" ".join(f"{column:>{width}}" for column, width in zip(header, (5, 12, 11, 8, 8, 8, 7))))
+        for result in results:
+            self.stdout.write(
+                f"{result['size']:>5} {result['concurrency']:>12} {result['throughput']:>11.1f} "
+                f"{result['p50'] * 1000:>8.1f} {result['p95'] * 1000:>8.1f} {result['p99'] * 1000:>8.1f} "
+                f"{result['errors']:>7}"
+            )
+
+    def _ensure_gevent(self):
+        """Re-run this command under gevent's monkey patching, like the gunicorn workers."""
+        from gevent import monkey
+
+        if monkey.is_module_patched("socket"):
+            return
+        if Path(sys.argv[0]).name != "manage.py":
+            raise CommandError("Run with `python -m gevent.monkey manage.py benchmark_epp_pool`, or pass --threads.")
+        os.execv(sys.executable, [sys.executable, "-m", "gevent.monkey", *sys.argv])  # nosec B606
+
+    def _command(self, name):
+        if name == "check":
+            return commands.CheckDomain([BENCHMARK_DOMAIN])
+        return commands.InfoDomain(name=BENCHMARK_DOMAIN)
+
+    def _run(self, registry, size, concurrency, options) -> dict:
+        """Send options["commands"] commands from `concurrency` senders over a pool of `size`."""
+        # a fixed pool, filled before the clock starts, with nothing else sharing it
+        # (hedged duplicates included: each command is sent exactly once)
+        with override_settings(
+            EPP_CONNECTION_POOL_SIZE=size,
+            EPP_POOL_MAX_SIZE=0,
+            EPP_POOL_HEARTBEAT_INTERVAL=0,
+            EPP_POOL_PREFILL_IN_BACKGROUND=False,
+            EPP_POOL_INTERACTIVE_RESERVED=0,
+            EPP_BREAKER_FAILURE_THRESHOLD=0,
+            EPP_HEDGE_PERCENTILE=0,
+            IS_LOCAL=False,
+        ):
+            wrapper = FakeRegistryWrapper(registry.port, tls=not options["no_tls"])
+            try:
+                return self._measure(wrapper, size, concurrency, options)
+            finally:
+                wrapper.close_all()
+
+    def _measure(self, wrapper, size, concurrency, options) -> dict:
+        command = self._command(options["command"])
+        remaining = iter(range(options["commands"]))
+        latencies: list[float] = []
+        errors: list[RegistryError] = []
+
+        def sender():
+            # the senders share one iterator, so together they send exactly options["commands"]
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    wrapper.send(command, cleaned=True)
+                except RegistryError as err:
+                    errors.append(err)
+                latencies.append(time.perf_counter() - started)
+
+        senders = [threading.Thread(target=sender, name=f"epp-benchmark-{i}") for i in range(concurrency)]
+        started = time.perf_counter()
+        for thread in senders:
+            thread.start()
+        for thread in senders:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        logger.info(f"Benchmark run done: size={size} concurrency={concurrency} pool stats: {wrapper.stats()}")
+        return {
+            "size": size,
+            "concurrency": concurrency,
+            "throughput": len(latencies) / elapsed if elapsed else 0.0,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "errors": len(errors),
+        }
@@ -0,0 +1,41 @@
+"""Saves the analytics page's sliced counts for past days (see registrar/utility/analytics.py).
+
+Usage:
+    ./manage.py create_analytics_snapshots                                 # yesterday
+    ./manage.py create_analytics_snapshots --start 2024-01-01              # backfill from a day up to yesterday
+    ./manage.py create_analytics_snapshots --start 2024-01-01 --end 2024-06-30
+
+Days that already have snapshots are counted again and replaced.
+"""
+
+import logging
+from datetime import date, timedelta
+
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+
+from registrar.utility import analytics
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Saves the analytics counts for yesterday, or backfills them for a range of past days"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=date.fromisoformat, help="First day to snapshot (YYYY-MM-DD)")
+        parser.add_argument("--end", type=date.fromisoformat, help="Last day to snapshot (YYYY-MM-DD)")
+
+    def handle(self, **options):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        end = options.get("end") or yesterday
+        start = options.get("start") or end
+        if end > yesterday:
+            raise CommandError(f"Only finished days can be snapshotted; the last one is {yesterday}")
+        if start > end:
+            raise CommandError("--start must not be after --end")
+
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        logger.info(f"Taking analytics snapshots for {len(days)} day(s), {start} to {end}")
+        saved = analytics.take_snapshots(days)
+        logger.info(f"Saved {saved} analytics snapshots")
@@ -1,5 +1,6 @@
 from datetime import timedelta
 from django.core.management import BaseCommand
+from epplibwrapper.utility.lanes import batch_priority
 from registrar.models import Domain, UserDomainRole
 import logging
 import argparse
@@ -15,6 +16,7 @@ class Command(BaseCommand):
     """Domains that, (1) have DNS status "Unknown" or "DNS Needed" and (2) are 7+ days past their expiration date,
     are marked "DELETED" in the registrar and deleted in the registry."""
 
+    @batch_priority()
     def handle(self, *args, **options):
         alert_email = options.get("alert_email")
         domains_to_be_deleted = self.get_domains()
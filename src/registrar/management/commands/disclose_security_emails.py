@@ -8,6 +8,7 @@ import logging
 import copy
 
 from django.core.management import BaseCommand
+from epplibwrapper.utility.lanes import batch_priority
 from registrar.models import Domain
 
 logger = logging.getLogger(__name__)
@@ -26,6 +27,7 @@ class Command(BaseCommand):
         # domains that skip disclose due to having contact registrar@dotgov.gov
         self.skipped_domain_contacts_count = 0
 
+    @batch_priority()
     def handle(self, **options):
         """
         Converts all ready and DNS needed domains with a non-default public contact
@@ -5,6 +5,7 @@ from datetime import date
 import logging
 
 from django.core.management import BaseCommand
+from epplibwrapper.utility.lanes import batch_priority
 from epplibwrapper.errors import RegistryError
 from registrar.models import Domain
 from registrar.management.commands.utility.terminal_helper import TerminalColors, TerminalHelper
@@ -51,6 +52,7 @@ class Command(BaseCommand):
         )
         parser.add_argument("--debug", action=argparse.BooleanOptionalAction, help="Increases log chattiness")
 
+    @batch_priority()
     def handle(self, **options):
         """
         Extends the expiration dates for valid domains.
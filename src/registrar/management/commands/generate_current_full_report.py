@@ -4,7 +4,7 @@ import logging
 import os
 
 from django.core.management import BaseCommand
-from registrar.utility import csv_export
+from registrar.utility import csv_export, current_reports
 from registrar.utility.s3_bucket import S3ClientHelper
 
 logger = logging.getLogger(__name__)
@@ -23,6 +23,12 @@ class Command(BaseCommand):
             default=True,
             help="Flag that determines if we do a check for os.path.exists. Used for test cases",
         )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild and upload the report in full, even if nothing changed since the last run",
+        )
+        parser.add_argument("--compress", action="store_true", help="Upload the report gzipped")
 
     def handle(self, **options):
         """Grabs the directory then creates current-full.csv in that directory"""
@@ -33,25 +39,24 @@ class Command(BaseCommand):
 
         logger.info("Generating report...")
         try:
-            self.generate_current_full_report(directory, file_name, check_path)
+            generated = self.generate_current_full_report(
+                directory, file_name, check_path, force=options.get("force"), compress=options.get("compress")
+            )
         except Exception as err:
             # TODO - #1317: Notify operations when auto report generation fails
             raise err
         else:
-            logger.info(f"Success! Created {file_name}")
+            if generated:
+                logger.info(f"Success! Created {file_name}")
 
-    def generate_current_full_report(self, directory, file_name, check_path):
+    def generate_current_full_report(self, directory, file_name, check_path, force=False, compress=False):
         """Creates a current-full.csv file under the specified directory,
-        then uploads it to a AWS S3 bucket"""
+        then uploads it to a AWS S3 bucket. Only rows that changed since the last run are
+        rendered again, and nothing is done if none did (see registrar/utility/current_reports.py).
+        Returns False in that case."""
         s3_client = S3ClientHelper()
         file_path = os.path.join(directory, file_name)
 
-        # Generate a file locally for upload
-        with open(file_path, "w") as file:
-            csv_export.DomainDataFull.export_data_to_csv(file)
-
-        if check_path and not os.path.exists(file_path):
-            raise FileNotFoundError(f"Could not find newly created file at '{file_path}'")
-
-        # Upload this generated file for our S3 instance
-        s3_client.upload_file(file_path, file_name)
+        return current_reports.generate_report(
+            csv_export.DomainDataFull, s3_client, file_path, file_name, check_path, force=force, compress=compress
+        )
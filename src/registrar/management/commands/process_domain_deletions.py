@@ -0,0 +1,36 @@
+"""Runs the due steps of unfinished domain deletion jobs.
+
+Deletion jobs normally run in a background thread of the worker that enqueued them
+(see registrar/models/utility/domain_deletion.py). If that worker restarts, the job
+stays where it was; this command picks it up. It is safe to run at any time: a job
+that is already running elsewhere is skipped, and retries that aren't due yet wait
+for the next run.
+"""
+
+import logging
+
+from django.core.management import BaseCommand
+
+from registrar.models import DomainDeletionJob
+from registrar.models.utility import domain_deletion
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Run the due steps of unfinished domain deletion jobs"
+
+    def handle(self, **options):
+        job_ids = list(
+            DomainDeletionJob.objects.exclude(step__in=DomainDeletionJob.FINISHED_STEPS)
+            .order_by("next_attempt_at")
+            .values_list("id", flat=True)
+        )
+        logger.info(f"Unfinished domain deletion jobs: {len(job_ids)}")
+
+        for job_id in job_ids:
+            job = domain_deletion.run(job_id)
+            if job is None:
+                logger.info(f"Deletion job {job_id} is running elsewhere, skipped")
+            else:
+                logger.info(f"Deletion job {job_id} ({job.domain.name}): {job.get_step_display()}")
@@ -0,0 +1,172 @@
+"""Refreshes the database copies of registry data for every domain.
+
+Hosts and their IPs, the security contact and the expiration/creation dates are
+otherwise only written back to the database when someone opens a domain page
+(Domain._fetch_cache). Reports and exports read those copies, so this command
+fetches every domain from the registry and lets _fetch_cache update them.
+
+Domains are processed in id order, in batches. After each batch the last id is saved
+as a checkpoint (in the default cache, which is database backed), and the next run
+continues after it. Pass --restart to start over.
+"""
+
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+
+from epplibwrapper.utility.fanout import fan_out
+from epplibwrapper.utility.lanes import batch_priority
+from registrar.management.commands.utility.terminal_helper import TerminalColors, TerminalHelper
+from registrar.models import Domain, HostIP
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_KEY = "reconcile_registry_data:last_domain_id"
+
+
+class RateLimiter:
+    """Lets at most `rate` callers per second through wait(), evenly spaced. Thread safe."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next, now)
+            self._next = start + self.interval
+        time.sleep(start - now)
+
+
+class Command(BaseCommand):
+    help = "Fetch every domain from the registry and update its hosts, IPs, security contact and dates in the database"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.changed: list[str] = []
+        self.unchanged: list[str] = []
+        self.failed: list[str] = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Domains fetched from the registry at once (each uses a pooled EPP connection)",
+        )
+        parser.add_argument("--rate", type=float, default=5, help="Max domains started per second (0 = no limit)")
+        parser.add_argument("--batch-size", type=int, default=100, help="Domains between checkpoints")
+        parser.add_argument("--limit", type=int, default=0, help="Stop after this many domains (0 = all)")
+        parser.add_argument(
+            "--restart", action="store_true", help="Ignore the checkpoint and start from the first domain"
+        )
+
+    @batch_priority()
+    def handle(self, **options):
+        concurrency = options["concurrency"]
+        batch_size = options["batch_size"]
+        if concurrency < 1 or batch_size < 1:
+            raise CommandError("--concurrency and --batch-size must be at least 1")
+
+        if options["restart"]:
+            cache.delete(CHECKPOINT_KEY)
+        last_id = cache.get(CHECKPOINT_KEY, 0)
+
+        # UNKNOWN domains aren't in the registry yet (fetching one creates it), so they are skipped
+        domains = (
+            Domain.objects.exclude(state__in=[Domain.State.DELETED, Domain.State.UNKNOWN])
+            .filter(id__gt=last_id)
+            .order_by("id")
+        )
+        domain_ids = list(domains.values_list("id", flat=True))
+        if options["limit"]:
+            domain_ids = domain_ids[: options["limit"]]
+
+        TerminalHelper.prompt_for_execution(
+            system_exit_on_terminate=True,
+            prompt_message=(
+                f"Domains to reconcile: {len(domain_ids)}"
+                + (f" (resuming after domain id {last_id})" if last_id else "")
+                + f"\nConcurrency: {concurrency}, rate limit: {options['rate'] or 'none'}/s"
+            ),
+            prompt_title="Reconcile registry data for these domains?",
+        )
+
+        limiter = RateLimiter(options["rate"])
+        for start in range(0, len(domain_ids), batch_size):
+            batch = domain_ids[start : start + batch_size]
+            for name, changes in fan_out(lambda domain_id: self.reconcile(domain_id, limiter), batch, concurrency):
+                self.record(name, changes)
+            cache.set(CHECKPOINT_KEY, batch[-1], timeout=None)
+            logger.info(f"Reconciled {start + len(batch)}/{len(domain_ids)} domains (checkpoint: id {batch[-1]})")
+
+        # a complete run starts from the beginning next time
+        if not options["limit"]:
+            cache.delete(CHECKPOINT_KEY)
+        self.log_summary()
+
+    def reconcile(self, domain_id, limiter) -> tuple[str, dict | None]:
+        """Fetch one domain from the registry. Returns (name, changes), with changes None on failure."""
+        limiter.wait()
+        try:
+            domain = Domain.objects.get(id=domain_id)
+            before = self.db_copy(domain)
+            # the database copies are only written on an actual registry fetch
+            domain._fetch_cache(fetch_hosts=True, fetch_contacts=True, skip_cache=True)
+            if not domain._cache:
+                # _fetch_cache logs the RegistryError and leaves the cache empty
+                return domain.name, None
+            domain.refresh_from_db()
+            after = self.db_copy(domain)
+            changes = {field: (before[field], after[field]) for field in before if before[field] != after[field]}
+            return domain.name, changes
+        except Exception as err:
+            logger.error(f"Failed to reconcile domain {domain_id}: {err}", exc_info=True)
+            return str(domain_id), None
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                # fan_out's worker threads each have their own database connection
+                connection.close()
+
+    def db_copy(self, domain) -> dict:
+        """The registry data the database holds for a domain."""
+        hosts: dict[str, list[str]] = {host.name: [] for host in domain.host.all()}
+        for host_name, address in HostIP.objects.filter(host__domain=domain).values_list("host__name", "address"):
+            hosts[host_name].append(address)
+        return {
+            "hosts": {name: sorted(addresses) for name, addresses in sorted(hosts.items())},
+            "security_contact_registry_id": domain.security_contact_registry_id,
+            "expiration_date": domain.expiration_date,
+            "x_registry_created_at": domain.x_registry_created_at,
+        }
+
+    def record(self, name, changes):
+        if changes is None:
+            self.failed.append(name)
+        elif changes:
+            self.changed.append(name)
+            for field, (old, new) in changes.items():
+                logger.info(f"{TerminalColors.OKCYAN}{name}: {field} changed from {old} to {new}{TerminalColors.ENDC}")
+        else:
+            self.unchanged.append(name)
+
+    def log_summary(self):
+        message = (
+            "============= FINISHED =============\n"
+            f"Changed: {len(self.changed)}\n"
+            f"Unchanged: {len(self.unchanged)}\n"
+            f"Failed: {len(self.failed)}"
+        )
+        if self.failed:
+            message += f"\nFailed domains: {self.failed}"
+            logger.error(f"{TerminalColors.FAIL}{message}{TerminalColors.ENDC}")
+        else:
+            logger.info(f"{TerminalColors.OKGREEN}{message}{TerminalColors.ENDC}")
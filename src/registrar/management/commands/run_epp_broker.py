@@ -0,0 +1,48 @@
+"""Runs the EPP connection broker (see epplibwrapper/broker.py).
+
+Started by run.sh when EPP_BROKER_SOCKET is set. Owns the only EPP connection pool
+for this instance; the gunicorn workers send their commands here.
+"""
+
+import logging
+import signal
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from epplibwrapper.broker import BrokerServer
+from epplibwrapper.client import EPPLibWrapper
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Serve the EPP connection pool to the gunicorn workers over a Unix domain socket"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--socket",
+            default=settings.EPP_BROKER_SOCKET,
+            help="Path of the Unix domain socket to listen on (default: EPP_BROKER_SOCKET)",
+        )
+
+    def handle(self, *args, **options):
+        socket_path = options["socket"]
+        if not socket_path:
+            raise CommandError("No socket path: set EPP_BROKER_SOCKET or pass --socket.")
+
+        # this process owns the sessions, so it builds its own pool regardless of CLIENT
+        wrapper = EPPLibWrapper()
+        server = BrokerServer(socket_path, wrapper)
+
+        # turn SIGTERM (cf stop, run.sh exiting) into a clean shutdown below
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+        logger.info(f"EPP broker listening on {socket_path}. Pool stats: {wrapper.stats()}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            wrapper.close_all()
+            logger.info("EPP broker stopped and logged out of the registry")
@@ -13,6 +13,7 @@ import logging
 
 from django.core.management import BaseCommand
 
+from epplibwrapper.utility.lanes import batch_priority
 from registrar.management.commands.utility.terminal_helper import TerminalColors, TerminalHelper
 from registrar.models import PublicContact
 
@@ -130,6 +131,7 @@ class Command(BaseCommand):
             for domain_name, status in recovery_status_by_domain.items():
                 logfile.write(f"{domain_name},{status}\n")
 
+    @batch_priority()
     def handle(self, *args, **options):
         dry_run = bool(options.get("dry_run", True))
         target_domain = options.get("target_domain")
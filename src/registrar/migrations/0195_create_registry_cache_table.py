@@ -0,0 +1,26 @@
+# Creates the database table behind the "registry" cache alias (settings.CACHES).
+# Deploys only run `migrate`, so the table is created here rather than relying on
+# someone running `createcachetable` in every environment. createcachetable skips
+# tables that already exist, so this is safe to re-run.
+
+from django.core.management import call_command
+from django.db import migrations
+from typing import Any
+
+
+def create_registry_cache_table(apps, schema_editor) -> Any:
+    call_command("createcachetable", "registry_cache_table", database=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrar", "0194_alter_domain_is_enrolled_in_dns_hosting"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_registry_cache_table,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
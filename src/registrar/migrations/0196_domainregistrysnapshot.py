@@ -0,0 +1,42 @@
+# Generated by Django 5.2.16 on 2026-10-16 21:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrar", "0195_create_registry_cache_table"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DomainRegistrySnapshot",
+            fields=[
+                (
+                    "domain",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="registry_snapshot",
+                        serialize=False,
+                        to="registrar.domain",
+                    ),
+                ),
+                ("data", models.BinaryField()),
+                (
+                    "has_hosts",
+                    models.BooleanField(default=False, help_text="Data includes the domain's hosts (InfoHost)"),
+                ),
+                (
+                    "has_contacts",
+                    models.BooleanField(default=False, help_text="Data includes the domain's contacts (InfoContact)"),
+                ),
+                ("synced_at", models.DateTimeField(help_text="When this data was fetched from the registry")),
+            ],
+            options={
+                "verbose_name": "Domain registry snapshot",
+            },
+        ),
+    ]
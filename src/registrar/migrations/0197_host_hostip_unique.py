@@ -0,0 +1,42 @@
+# Generated by Django 5.2.16 on 2026-10-16 21:40
+
+from django.db import migrations, models
+
+
+def remove_duplicate_hosts_and_ips(apps, schema_editor):
+    """Concurrent registry refreshes could write the same host or IP twice. Keep the oldest row."""
+    Host = apps.get_model("registrar", "Host")
+    HostIP = apps.get_model("registrar", "HostIP")
+
+    kept_hosts: dict[tuple[int, str], int] = {}
+    for host_id, domain_id, name in Host.objects.order_by("id").values_list("id", "domain_id", "name"):
+        kept_id = kept_hosts.setdefault((domain_id, name), host_id)
+        if kept_id != host_id:
+            HostIP.objects.filter(host_id=host_id).update(host_id=kept_id)
+            Host.objects.filter(id=host_id).delete()
+
+    kept_ips: set[tuple[int, str]] = set()
+    for ip_id, host_id, address in HostIP.objects.order_by("id").values_list("id", "host_id", "address"):
+        if (host_id, address) in kept_ips:
+            HostIP.objects.filter(id=ip_id).delete()
+        else:
+            kept_ips.add((host_id, address))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrar", "0196_domainregistrysnapshot"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_hosts_and_ips, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="host",
+            constraint=models.UniqueConstraint(fields=("domain", "name"), name="unique_host_name_per_domain"),
+        ),
+        migrations.AddConstraint(
+            model_name="hostip",
+            constraint=models.UniqueConstraint(fields=("host", "address"), name="unique_address_per_host"),
+        ),
+    ]
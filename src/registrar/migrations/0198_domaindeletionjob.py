@@ -0,0 +1,79 @@
+# Generated by Django 5.2.16 on 2026-10-16 22:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrar", "0197_host_hostip_unique"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DomainDeletionJob",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "notify_managers",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Email domain managers and portfolio admins once the domain is deleted",
+                    ),
+                ),
+                (
+                    "step",
+                    models.CharField(
+                        choices=[
+                            ("remove_hosts", "Removing nameservers"),
+                            ("remove_contacts", "Removing contacts"),
+                            ("remove_dnssec", "Removing DNSSEC data"),
+                            ("wait_for_registry", "Waiting for the registry to release hosts"),
+                            ("delete_domain", "Deleting the domain"),
+                            ("done", "Deleted"),
+                            ("failed", "Failed"),
+                        ],
+                        default="remove_hosts",
+                        max_length=32,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0, help_text="Tries at the current step")),
+                ("next_attempt_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("last_error", models.TextField(blank=True, default="")),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "domain",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deletion_jobs",
+                        to="registrar.domain",
+                    ),
+                ),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Domain deletion job",
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("step__in", ["done", "failed"]), _negated=True),
+                        fields=("domain",),
+                        name="unique_unfinished_deletion_job_per_domain",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.16 on 2026-10-16 23:40
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrar", "0199_create_rdap_cache_table"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalyticsSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("date", models.DateField(help_text="The counts use this day as their date cut-off")),
+                (
+                    "metric",
+                    models.CharField(
+                        choices=[
+                            ("managed_domains", "Managed domains"),
+                            ("unmanaged_domains", "Unmanaged domains"),
+                            ("ready_domains", "Ready domains"),
+                            ("deleted_domains", "Deleted domains"),
+                            ("requests", "Domain requests"),
+                            ("submitted_requests", "Submitted domain requests"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                (
+                    "counts",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.PositiveIntegerField(),
+                        help_text="Total, one count per org type, then election offices (as in get_sliced_domains)",
+                        size=None,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Analytics snapshot",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "metric"), name="unique_analytics_snapshot_per_day_and_metric"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Creates the database table behind the "reports" cache alias (settings.CACHES),
+# for the same reason as 0195_create_registry_cache_table.
+
+from django.core.management import call_command
+from django.db import migrations
+from typing import Any
+
+
+def create_reports_cache_table(apps, schema_editor) -> Any:
+    call_command("createcachetable", "reports_cache_table", database=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrar", "0200_analyticssnapshot"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_reports_cache_table,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.16 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrar", "0201_create_reports_cache_table"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EppSessionLease",
+            fields=[
+                ("slot", models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ("owner", models.CharField(blank=True, help_text="The worker holding the slot", max_length=255)),
+                ("expires_at", models.DateTimeField(help_text="The slot is free from this time on")),
+            ],
+            options={
+                "verbose_name": "EPP session lease",
+            },
+        ),
+    ]
@@ -3,6 +3,10 @@ from .contact import Contact
 from .domain_request import DomainRequest
 from .domain_information import DomainInformation
 from .domain import Domain
+from .domain_registry_snapshot import DomainRegistrySnapshot
+from .domain_deletion_job import DomainDeletionJob
+from .analytics_snapshot import AnalyticsSnapshot
+from .epp_session_lease import EppSessionLease
 from .draft_domain import DraftDomain
 from .federal_agency import FederalAgency
 from .federal_tribe import FederalTribe
@@ -45,6 +49,10 @@ __all__ = [
     "DomainRequest",
     "DomainInformation",
     "Domain",
+    "DomainRegistrySnapshot",
+    "DomainDeletionJob",
+    "AnalyticsSnapshot",
+    "EppSessionLease",
     "DraftDomain",
     "DomainInvitation",
     "FederalAgency",
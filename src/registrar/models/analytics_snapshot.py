@@ -0,0 +1,38 @@
+from django.contrib.postgres.fields import ArrayField
+from django.db import models
+
+from .utility.time_stamped_model import TimeStampedModel
+
+
+class AnalyticsSnapshot(TimeStampedModel):
+    """
+    One analytics metric's counts, sliced by org type, as of a past day.
+    Written by the create_analytics_snapshots command and read by the analytics
+    page and reports instead of counting live tables. See registrar/utility/analytics.py.
+    """
+
+    class Metric(models.TextChoices):
+        MANAGED_DOMAINS = "managed_domains", "Managed domains"
+        UNMANAGED_DOMAINS = "unmanaged_domains", "Unmanaged domains"
+        READY_DOMAINS = "ready_domains", "Ready domains"
+        DELETED_DOMAINS = "deleted_domains", "Deleted domains"
+        REQUESTS = "requests", "Domain requests"
+        SUBMITTED_REQUESTS = "submitted_requests", "Submitted domain requests"
+
+    class Meta:
+        verbose_name = "Analytics snapshot"
+        constraints = [
+            models.UniqueConstraint(fields=["date", "metric"], name="unique_analytics_snapshot_per_day_and_metric"),
+        ]
+
+    date = models.DateField(help_text="The counts use this day as their date cut-off")
+
+    metric = models.CharField(max_length=32, choices=Metric.choices)
+
+    counts = ArrayField(
+        models.PositiveIntegerField(),
+        help_text="Total, one count per org type, then election offices (as in get_sliced_domains)",
+    )
+
+    def __str__(self):
+        return f"{self.get_metric_display()} on {self.date}"
@@ -10,7 +10,7 @@ from django.conf import settings
 from django.db import transaction, models, IntegrityError
 from django_fsm import FSMField, transition, TransitionNotAllowed  # type: ignore
 from django.utils import timezone
-from functools import cached_property
+from functools import cached_property, partial
 from django.core.exceptions import ValidationError
 from typing import Any
 from registrar.models.domain_invitation import DomainInvitation
@@ -34,6 +34,7 @@ from epplibwrapper import (
     RegistryError,
     ErrorCode,
 )
+from epplibwrapper.utility.fanout import fan_out
 
 from registrar.models.utility.contact_error import ContactError, ContactErrorCodes
 
@@ -41,6 +42,7 @@ from django.db.models import DateField, TextField
 
 from .utility.domain_field import DomainField
 from .utility.domain_helper import DomainHelper
+from .utility import registry_cache, registry_snapshot
 from .utility.time_stamped_model import TimeStampedModel
 
 from .public_contact import PublicContact
@@ -248,10 +250,8 @@ class Domain(TimeStampedModel, DomainHelper):
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None, optimistic_lock=False):
         is_adding = self._state.adding
         # -------- Optimistic locking (quick-fix) --------
-        if optimistic_lock and self.pk:
-            current_updated_at = type(self).objects.only("updated_at").get(pk=self.pk).updated_at
-            if getattr(self, "_original_updated_at", None) and current_updated_at != self._original_updated_at:
-                raise ValidationError("A newer version of this form exists. Please try again.")
+        if optimistic_lock:
+            self.check_optimistic_lock()
 
         # If the domain is deleted we don't want the expiration date to be set
         if self.state == self.State.DELETED and self.expiration_date:
@@ -271,6 +271,13 @@ class Domain(TimeStampedModel, DomainHelper):
             self.created_at_reference = self.created_at
         self._original_updated_at = self.updated_at
 
+    def check_optimistic_lock(self):
+        """Raises ValidationError if the domain was saved elsewhere since it was loaded."""
+        if self.pk:
+            current_updated_at = type(self).objects.only("updated_at").get(pk=self.pk).updated_at
+            if getattr(self, "_original_updated_at", None) and current_updated_at != self._original_updated_at:
+                raise ValidationError("A newer version of this form exists. Please try again.")
+
     @property
     def display_created_at(self):
         """Creation date shown in the UI: the registry creation date, falling
@@ -297,6 +304,38 @@ class Domain(TimeStampedModel, DomainHelper):
         req = commands.CheckDomain([domain_name])
         return registry.send(req, cleaned=True).res_data[0].avail
 
+    @classmethod
+    def available_many(cls, domains: list[str]) -> dict[str, bool]:
+        """Check if several domains are available, using as few CheckDomain calls as possible.
+
+        Names are lowercased and deduplicated, then sent in chunks of
+        settings.EPP_CHECK_DOMAIN_BATCH_SIZE (the most names the registry accepts in one check).
+        Returns a dict of lowercased domain name -> availability.
+
+        throws- RegistryError or InvalidDomainError"""
+        if settings.IS_LOCAL:
+            logger.info("IS_LOCAL is true, so skipping registry check for domain availability")
+            return {domain.lower(): True for domain in domains}
+        for domain in domains:
+            if not cls.string_could_be_domain(domain):
+                logger.warning("Not a valid domain: %s" % str(domain))
+                raise errors.InvalidDomainError()
+
+        domain_names = list(dict.fromkeys(domain.lower() for domain in domains))
+
+        availability = {}
+        batch_size = settings.EPP_CHECK_DOMAIN_BATCH_SIZE
+        for start in range(0, len(domain_names), batch_size):
+            chunk = domain_names[start : start + batch_size]
+            response = registry.send(commands.CheckDomain(chunk), cleaned=True)
+            for result in response.res_data:
+                availability[result.name.lower()] = result.avail
+
+        missing = [domain_name for domain_name in domain_names if domain_name not in availability]
+        if missing:
+            raise RegistryError(f"Registry did not return availability for: {', '.join(missing)}")
+        return availability
+
     @classmethod
     def is_pending_delete(cls, domain: str) -> bool:
         """Check if domain is pendingDelete state via response from registry."""
@@ -436,6 +475,8 @@ class Domain(TimeStampedModel, DomainHelper):
             # update expiration date in registry, and set the updated
             # expiration date in the registrar, and in the cache
             self._cache["ex_date"] = registry.send(request, cleaned=True).res_data[0].ex_date
+            registry_cache.invalidate_domain_data(self.name)
+            registry_snapshot.discard(self)
             self.expiration_date = self._cache["ex_date"]
             if persist:
                 if optimistic_lock:
@@ -660,37 +701,61 @@ class Domain(TimeStampedModel, DomainHelper):
 
         return (deleted_values, updated_values, new_values, previousHostDict)
 
-    def _update_host_values(self, updated_values, oldNameservers):
-        for hostTuple in updated_values:
-            updated_response_code = self._update_host(hostTuple[0], hostTuple[1], oldNameservers.get(hostTuple[0]))
-            if updated_response_code not in [
-                ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY,
-                ErrorCode.OBJECT_EXISTS,
-            ]:
-                logger.warning("Could not update host %s. Error code was: %s " % (hostTuple[0], updated_response_code))
-
-    def createNewHostList(self, new_values: dict):
-        """convert the dictionary of new values to a list of HostObjSet
+    def _provision_hosts(self, updated_values, new_values: dict, oldNameservers: dict) -> tuple[list[str], set[str]]:
+        """Send the UpdateHost and CreateHost commands for changed and new nameservers.
+        They don't depend on each other, so several are in flight at once
+        (see _send_concurrently). As in a plain loop, the first one (in order) that raises
+        a RegistryError raises it here.
+        Args:
+            updated_values: list[tuple[str, list]]- hosts whose ips changed
+            new_values: dict(str,list)- dict of {nameserver:ips} to create
+            oldNameservers: dict(str,list)- the domain's current hosts and ips
+        Returns:
+            tuple[list[str], set[str]]- the new hosts that exist in the registry now, and
+            the changed or new hosts the registry now has with exactly the ips sent
+        """
+        ok_codes = [ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY, ErrorCode.OBJECT_EXISTS]
+        jobs = [
+            partial(self._update_host, nameserver, ips, oldNameservers.get(nameserver))
+            for nameserver, ips in updated_values
+        ]
+        jobs += [partial(self._create_host, host=nameserver, addrs=ips) for nameserver, ips in new_values.items()]
+        codes = self._send_concurrently(lambda job: job(), jobs)
+
+        update_codes, create_codes = codes[: len(updated_values)], codes[len(updated_values) :]
+        applied_hosts = set()
+        for (nameserver, ips), code in zip(updated_values, update_codes):
+            if code not in ok_codes:
+                logger.warning("Could not update host %s. Error code was: %s " % (nameserver, code))
+            elif code == ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY and self._sends_host_update(
+                ips, oldNameservers.get(nameserver)
+            ):
+                applied_hosts.add(nameserver)
+        # OBJECT_EXISTS: the host was already there, with whatever ips it had
+        applied_hosts.update(
+            nameserver
+            for nameserver, code in zip(new_values, create_codes)
+            if code == ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY
+        )
+        created_hosts = [nameserver for nameserver, code in zip(new_values, create_codes) if code in ok_codes]
+        return created_hosts, applied_hosts
+
+    def createNewHostList(self, created_hosts: list[str]):
+        """convert the list of created hosts to a list of HostObjSet
         for use in the UpdateDomain epp message
         Args:
-            new_values: dict(str,list)- dict of {nameserver:ips} to add to domain
+            created_hosts: list[str]- hosts (already in the registry) to add to domain
         Returns:
             tuple [list[epp.HostObjSet], int]
             list[epp.HostObjSet]-epp object  for use in the UpdateDomain epp message
                 defaults to empty list
             int-number of items being created default 0
         """
-
-        hostStringList = []
-        for key, value in new_values.items():
-            createdCode = self._create_host(host=key, addrs=value)  # creates in registry
-            if createdCode == ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY or createdCode == ErrorCode.OBJECT_EXISTS:
-                hostStringList.append(key)
-        if hostStringList == []:
+        if created_hosts == []:
             return [], 0
 
-        addToDomainObject = epp.HostObjSet(hosts=hostStringList)
-        return [addToDomainObject], len(hostStringList)
+        addToDomainObject = epp.HostObjSet(hosts=created_hosts)
+        return [addToDomainObject], len(created_hosts)
 
     def createDeleteHostList(self, hostsToDelete: list[str]):
         """
@@ -844,9 +909,10 @@ class Domain(TimeStampedModel, DomainHelper):
             oldNameservers,
         ) = self.getNameserverChanges(hosts=hosts)
 
-        _ = self._update_host_values(updated_values, oldNameservers)  # returns nothing, just need to be run and errors
-        addToDomainList, addToDomainCount = self.createNewHostList(new_values)
+        created_hosts, applied_hosts = self._provision_hosts(updated_values, new_values, oldNameservers)
+        addToDomainList, addToDomainCount = self.createNewHostList(created_hosts)
         deleteHostList, deleteCount = self.createDeleteHostList(deleted_values)
+        # every add and remove goes in this one UpdateDomain
         responseCode = self.addAndRemoveHostsFromDomain(hostsToAdd=addToDomainList, hostsToDelete=deleteHostList)
 
         # if unable to update domain raise error and stop
@@ -857,8 +923,8 @@ class Domain(TimeStampedModel, DomainHelper):
 
         self._delete_hosts_if_not_used(hostsToDelete=deleted_values)
 
-        # clear self._cache to fetch fresh data from the registry
-        self._invalidate_cache()
+        # the registry now has what was just sent, so cache that instead of fetching it again
+        self._cache_nameserver_changes(deleted_values, updated_values, new_values, created_hosts, applied_hosts)
 
         if successTotalNameservers < 2:
             try:
@@ -938,6 +1004,7 @@ class Domain(TimeStampedModel, DomainHelper):
         updateContact.disclose = self._disclose_fields(contact=contact)  # type: ignore
         try:
             registry.send(updateContact, cleaned=True)
+            registry_cache.invalidate_contact(contact.registry_id)
         except RegistryError as e:
             logger.error("Error updating contact, code was %s error was %s" % (e.code, e))
             # TODO - ticket 433 human readable error handling here
@@ -1177,6 +1244,23 @@ class Domain(TimeStampedModel, DomainHelper):
         """This domain should be deleted from the registry
         may raises RegistryError, should be caught or handled correctly by caller"""
 
+        self._check_subdomains_not_in_use()
+
+        self._delete_nameservers_and_hosts()
+
+        self._delete_nonregistrant_contacts()
+
+        self._delete_dnssecdata()
+
+        # Check if the domain can be deleted
+        if not self._domain_can_be_deleted():
+            note = "Domain has associated objects that prevent deletion."
+            raise RegistryError(code=ErrorCode.COMMAND_FAILED, note=note)
+
+        self._delete_from_registry()
+
+    def _check_subdomains_not_in_use(self):
+        """Raises RegistryError if a subdomain of this domain is a host on another domain."""
         logger.info("Deleting subdomains for %s", self.name)
         # check if any subdomains are in use by another domain
         hosts = Host.objects.filter(name__regex=r".+\.{}".format(self.name))
@@ -1192,18 +1276,9 @@ class Domain(TimeStampedModel, DomainHelper):
                     note=f"Host {host.name} is in use by {host.domain}",
                 )
 
-        self._delete_nameservers_and_hosts()
-
-        self._delete_nonregistrant_contacts()
-
-        self._delete_dnssecdata()
-
-        # Check if the domain can be deleted
-        if not self._domain_can_be_deleted():
-            note = "Domain has associated objects that prevent deletion."
-            raise RegistryError(code=ErrorCode.COMMAND_FAILED, note=note)
-
-        # Delete the domain
+    def _delete_from_registry(self):
+        """Sends DeleteDomain, then removes the domain's hosts, contacts and DNS data from the database.
+        The domain's hosts, contacts and DNSSEC data must already be gone from the registry."""
         request = commands.DeleteDomain(name=self.name)
         try:
             registry.send(request, cleaned=True)
@@ -1222,8 +1297,8 @@ class Domain(TimeStampedModel, DomainHelper):
         """Removes nameservers and deletes associated hosts in EPP if not in use."""
         try:
             deleted_values, updated_values, new_values, oldNameservers = self.getNameserverChanges(hosts=[])
-            self._update_host_values(updated_values, oldNameservers)  # Returns nothing, just need to be run and errors
-            addToDomainList, _ = self.createNewHostList(new_values)
+            created_hosts, _ = self._provision_hosts(updated_values, new_values, oldNameservers)
+            addToDomainList, _ = self.createNewHostList(created_hosts)
             deleteHostList, _ = self.createDeleteHostList(deleted_values)
             responseCode = self.addAndRemoveHostsFromDomain(hostsToAdd=addToDomainList, hostsToDelete=deleteHostList)
         except RegistryError as e:
@@ -1259,6 +1334,7 @@ class Domain(TimeStampedModel, DomainHelper):
                         )
                     request = commands.DeleteContact(contact.registry_id)
                     registry.send(request, cleaned=True)
+                    registry_cache.invalidate_contact(contact.registry_id)
                     logger.info(f"sent DeleteContact for {contact}")
             except RegistryError as e:
                 logger.error(f"Error deleting contact: {contact}, {e}", exc_info=True)
@@ -1375,35 +1451,20 @@ class Domain(TimeStampedModel, DomainHelper):
         Returns True if the domain can be deleted, False otherwise. Includes a retry mechanism
         using wait_interval and max_attempts, which may be necessary if subdomains and other
         associated objects were only recently deleted as the registry may not be immediately updated.
+        Deletions started from the admin or the domain delete page don't poll here; they
+        retry _registry_released_hosts with backoff (see registrar/models/utility/domain_deletion.py).
         """
         logger.info("Polling registry to confirm deletion pre-conditions for %s", self.name)
         last_info_error = None
         for attempt in range(max_attempts):
             try:
-                info_response = registry.send(commands.InfoDomain(name=self.name), cleaned=True)
-                domain_info = info_response.res_data[0]
-                hosts_associated = getattr(domain_info, "hosts", None)
-                if hosts_associated is None or len(hosts_associated) == 0:
-                    logger.info(
-                        "InfoDomain reports no associated hosts for %s. Proceeding with deletion.",
-                        self.name,
-                    )
+                if self._registry_released_hosts():
                     return True
-                else:
-                    logger.info(
-                        "Attempt %d: Domain %s still has hosts: %s",
-                        attempt + 1,
-                        self.name,
-                        hosts_associated,
-                    )
             except RegistryError as info_e:
                 # If the domain is already gone, we can assume deletion already occurred.
                 if info_e.code == ErrorCode.OBJECT_DOES_NOT_EXIST:
-                    logger.info(
-                        "InfoDomain check indicates domain %s no longer exists.",
-                        self.name,
-                    )
                     raise info_e
+                last_info_error = info_e
                 logger.warning("Attempt %d: Error during InfoDomain check: %s", attempt + 1, info_e)
             time.sleep(wait_interval)
         else:
@@ -1414,6 +1475,32 @@ class Domain(TimeStampedModel, DomainHelper):
             )
             return False
 
+    def _registry_released_hosts(self) -> bool:
+        """
+        Asks the registry (one InfoDomain) whether the domain still has hosts.
+        Returns True once it has none and the domain can be deleted.
+        Raises RegistryError, including OBJECT_DOES_NOT_EXIST if the domain is already gone.
+        """
+        try:
+            info_response = registry.send(commands.InfoDomain(name=self.name), cleaned=True)
+        except RegistryError as info_e:
+            if info_e.code == ErrorCode.OBJECT_DOES_NOT_EXIST:
+                logger.info(
+                    "InfoDomain check indicates domain %s no longer exists.",
+                    self.name,
+                )
+            raise info_e
+        domain_info = info_response.res_data[0]
+        hosts_associated = getattr(domain_info, "hosts", None)
+        if hosts_associated is None or len(hosts_associated) == 0:
+            logger.info(
+                "InfoDomain reports no associated hosts for %s. Proceeding with deletion.",
+                self.name,
+            )
+            return True
+        logger.info("Domain %s still has hosts: %s", self.name, hosts_associated)
+        return False
+
     def __str__(self) -> str:
         return self.name
 
@@ -1948,18 +2035,21 @@ class Domain(TimeStampedModel, DomainHelper):
         source=[State.ON_HOLD, State.DNS_NEEDED, State.UNKNOWN],
         target=State.DELETED,
     )
-    def deleteInEpp(self):
+    def deleteInEpp(self, ignoreEPP=False):
         """Domain is deleted in epp but is saved in our database.
         Subdomains will be deleted first if not in use by another domain.
         Contacts for this domain will also be deleted.
+        ignoreEPP (boolean) - set to true when the domain was already deleted from the
+        registry (used by the deletion job, see registrar/models/utility/domain_deletion.py)
         Error handling should be provided by the caller."""
         # While we want to log errors, we want to preserve
         # that information when this function is called.
         # Human-readable errors are introduced at the admin.py level,
         # as doing everything here would reduce reliablity.
         try:
-            logger.info("deleteInEpp()-> inside _delete_domain")
-            self._delete_domain()
+            if not ignoreEPP:
+                logger.info("deleteInEpp()-> inside _delete_domain")
+                self._delete_domain()
             self.deleted = timezone.now()
             self.expiration_date = None
         except RegistryError as err:
@@ -2214,8 +2304,8 @@ class Domain(TimeStampedModel, DomainHelper):
                 )
             return err.code
 
-    def _fetch_contacts(self, contact_data):
-        """Fetch contact info."""
+    def _fetch_contacts(self, contact_data, skip_cache=False):
+        """Fetch contact info. With skip_cache, every contact is fetched and its row rewritten."""
         choices = PublicContact.ContactTypeChoices
         # We expect that all these fields get populated,
         # so we can create these early, rather than waiting.
@@ -2224,20 +2314,42 @@ class Domain(TimeStampedModel, DomainHelper):
             choices.SECURITY: None,
             choices.TECHNICAL: None,
         }
+        entries = self._get_contact_entries([domainContact.contact for domainContact in contact_data], skip_cache)
         for domainContact in contact_data:
-            req = commands.InfoContact(id=domainContact.contact)
-            data = registry.send(req, cleaned=True).res_data[0]
-            logger.info(f"_fetch_contacts => this is the data: {data}")
-
-            # Map the object we recieved from EPP to a PublicContact
-            mapped_object = self.map_epp_contact_to_public_contact(data, domainContact.contact, domainContact.type)
-            logger.info(f"_fetch_contacts => mapped_object: {mapped_object}")
-
-            # Find/create it in the DB
-            in_db = self._get_or_create_public_contact(mapped_object)
-            contacts_dict[in_db.contact_type] = in_db.registry_id
+            entry = entries[domainContact.contact]
+            # the PublicContact row is only rewritten when the contact changed in the registry
+            if skip_cache or not registry_cache.is_synced(entry, self.name, domainContact.type):
+                # Map the object we recieved from EPP to a PublicContact
+                mapped_object = self.map_epp_contact_to_public_contact(
+                    entry["info"], domainContact.contact, domainContact.type
+                )
+                # Find/create it in the DB
+                with registry_cache.syncing(domainContact.contact):
+                    self._get_or_create_public_contact(mapped_object)
+                registry_cache.mark_synced(entry, self.name, domainContact.type)
+            contacts_dict[domainContact.type] = domainContact.contact
+        registry_cache.set_contacts(entries)
         return contacts_dict
 
+    def _get_contact_entries(self, registry_ids: list[str], skip_cache=False) -> dict[str, dict]:
+        """Contact cache entries (see registry_cache.get_contacts) for the contacts, by registry_id.
+        Contacts without a fresh entry (all of them, with skip_cache) are fetched from the
+        registry, in one batch. The caller stores the entries back with registry_cache.set_contacts."""
+        entries, generations = registry_cache.get_contacts(registry_ids)
+        to_fetch = list(
+            dict.fromkeys(rid for rid in registry_ids if skip_cache or not registry_cache.is_fresh(entries.get(rid)))
+        )
+        if to_fetch:
+            # the InfoContact commands are independent, so send them together;
+            # the DB work stays in the caller's thread (and this request's transaction)
+            requests = [commands.InfoContact(id=registry_id) for registry_id in to_fetch]
+            responses = registry.send_many(requests, cleaned=True)
+            for registry_id, response in zip(to_fetch, responses):
+                entries[registry_id] = registry_cache.contact_entry(
+                    response.res_data[0], entries.get(registry_id), generations.get(registry_id)
+                )
+        return entries
+
     def _get_or_create_contact(self, contact: PublicContact):
         """Try to fetch info about a contact. Create it if it does not exist."""
         logger.info("_get_or_create_contact() -> Fetching contact info")
@@ -2270,9 +2382,10 @@ class Domain(TimeStampedModel, DomainHelper):
     def _fetch_hosts(self, host_data):
         """Fetch host info."""
         hosts = []
-        for name in host_data:
-            req = commands.InfoHost(name=name)
-            data = registry.send(req, cleaned=True).res_data[0]
+        requests = [commands.InfoHost(name=name) for name in host_data]
+        responses = registry.send_many(requests, cleaned=True)
+        for name, response in zip(host_data, responses):
+            data = response.res_data[0]
             host = {
                 "name": name,
                 "addrs": [item.addr for item in getattr(data, "addrs", [])],
@@ -2317,7 +2430,7 @@ class Domain(TimeStampedModel, DomainHelper):
 
         """
         try:
-            if ip_list is None or len(ip_list) == 0 and isinstance(old_ip_list, list) and len(old_ip_list) != 0:
+            if not self._sends_host_update(ip_list, old_ip_list):
                 return ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY
 
             added_ip_list = set(ip_list).difference(old_ip_list)
@@ -2340,6 +2453,12 @@ class Domain(TimeStampedModel, DomainHelper):
             else:
                 raise e
 
+    @staticmethod
+    def _sends_host_update(ip_list, old_ip_list) -> bool:
+        """False when _update_host reports success without sending anything: the new
+        ip list is missing, or empty while the old one isn't."""
+        return not (ip_list is None or len(ip_list) == 0 and isinstance(old_ip_list, list) and len(old_ip_list) != 0)
+
     def addAndRemoveHostsFromDomain(self, hostsToAdd: list[str], hostsToDelete: list[str]):
         """sends an UpdateDomain message to the registry with the hosts provided
         Args:
@@ -2366,20 +2485,28 @@ class Domain(TimeStampedModel, DomainHelper):
             return e.code
 
     def _delete_hosts_if_not_used(self, hostsToDelete: list[str]):
-        """delete the host object in registry,
-        will only delete the host object, if it's not being used by another domain
-        Performs just the DeleteHost epp call
+        """delete the host objects in registry,
+        will only delete a host object if it's not being used by another domain
+        Performs just the DeleteHost epp calls, concurrently (see _send_concurrently)
         Args:
             hostsToDelete (list[str])- list of nameserver/host names to remove
         Returns:
             None
 
         """
+        self._send_concurrently(self._delete_host_if_not_used, hostsToDelete)
+
+    def _send_concurrently(self, send_one, items: list) -> list:
+        """send_one(item) for every item, as many at a time as registry.send_many would send
+        plain commands in the current priority lane (see EPPLibWrapper.fanout_limit)."""
+        max_workers = min(len(items), registry.fanout_limit()) if len(items) > 1 else 1
+        return fan_out(send_one, items, max_workers)
+
+    def _delete_host_if_not_used(self, nameserver: str):
         try:
-            for nameserver in hostsToDelete:
-                deleteHostReq = commands.DeleteHost(name=nameserver)
-                registry.send(deleteHostReq, cleaned=True)
-                logger.info("_delete_hosts_if_not_used()-> sending delete host req as %s" % deleteHostReq)
+            deleteHostReq = commands.DeleteHost(name=nameserver)
+            registry.send(deleteHostReq, cleaned=True)
+            logger.info("_delete_hosts_if_not_used()-> sending delete host req as %s" % deleteHostReq)
 
         except RegistryError as e:
             if e.code == ErrorCode.OBJECT_ASSOCIATION_PROHIBITS_OPERATION:
@@ -2387,6 +2514,43 @@ class Domain(TimeStampedModel, DomainHelper):
             else:
                 logger.error("Error _delete_hosts_if_not_used, code was %s error was %s" % (e.code, e))
 
+    def _cache_nameserver_changes(self, deleted_values, updated_values, new_values, created_hosts, applied_hosts):
+        """Apply a successful nameserver update to the cached registry data, the shared
+        registry cache, the domain's snapshot and the Host/HostIP tables, so the
+        registry doesn't have to be asked what was just sent to it.
+
+        Falls back to clearing the cache when hosts weren't cached to begin with
+        (e.g. they were read from the database because the registry was down), or when
+        the registry didn't apply some host change as sent (see _provision_hosts)."""
+        changed_hosts = {nameserver for nameserver, _ in updated_values}.union(created_hosts)
+        if "hosts" not in self._cache or not changed_hosts <= applied_hosts:
+            self._invalidate_cache()
+            return
+
+        updated_ips = dict(updated_values)
+        hosts = []
+        for host in self._cache["hosts"]:
+            if host["name"] in deleted_values:
+                continue
+            if host["name"] in updated_ips:
+                host = {**host, "addrs": list(updated_ips[host["name"]])}
+            hosts.append(host)
+        hosts += [{"name": name, "addrs": list(new_values[name] or [])} for name in created_hosts]
+
+        # RFC 5731: the registry sets "inactive" on a domain without hosts, and "ok" when it has no other status
+        statuses = [
+            status for status in self._cache.get("statuses", []) if status not in [self.Status.INACTIVE, self.Status.OK]
+        ]
+        if not hosts:
+            statuses.append(self.Status.INACTIVE)
+        self._cache = {**self._cache, "hosts": hosts, "statuses": statuses or [self.Status.OK]}
+
+        # other workers' copies are out of date; replace them with this one
+        registry_cache.invalidate_domain_data(self.name)
+        registry_cache.set_domain_data(self.name, self._cache)
+        registry_snapshot.store(self, self._cache)
+        self._update_hosts_and_ips_in_db(self._cache)
+
     def _fix_unknown_state(self, cleaned):
         """
         _fix_unknown_state: Calls _add_missing_contacts_if_unknown
@@ -2446,13 +2610,29 @@ class Domain(TimeStampedModel, DomainHelper):
                 f"missingAdmin: {missingAdmin}, missingSecurity: {missingSecurity}, missingTech: {missingTech}"
             )
 
-    def _fetch_cache(self, fetch_hosts=False, fetch_contacts=False):
-        """Contact registry for info about a domain."""
+    def _fetch_cache(self, fetch_hosts=False, fetch_contacts=False, skip_cache=False):
+        """Contact registry for info about a domain.
+
+        Checks the domain's registry snapshot (domain pages only) and then the shared
+        registry cache first, unless skip_cache is set. A domain in UNKNOWN state always
+        goes to the registry, since fetching it is what creates it there and fixes its state."""
+        if self.state != self.State.UNKNOWN and not skip_cache:
+            snapshot = registry_snapshot.load(self, hosts=fetch_hosts, contacts=fetch_contacts)
+            if snapshot is not None:
+                self._cache = snapshot
+                return
+            shared = registry_cache.get_domain_data(self.name, hosts=fetch_hosts, contacts=fetch_contacts)
+            if shared is not None:
+                self._cache = shared
+                if registry_snapshot.is_refreshing():
+                    registry_snapshot.store(self, shared)
+                return
+
         try:
             data_response = self._get_or_create_domain_in_registry()
             cache = self._extract_data_from_response(data_response)
             cleaned = self._clean_cache(cache, data_response)
-            self._update_hosts_and_contacts(cleaned, fetch_hosts, fetch_contacts)
+            self._update_hosts_and_contacts(cleaned, fetch_hosts, fetch_contacts, skip_cache)
 
             if self.state == self.State.UNKNOWN:
                 self._fix_unknown_state(cleaned)
@@ -2463,6 +2643,8 @@ class Domain(TimeStampedModel, DomainHelper):
             self._update_dates(cleaned)
 
             self._cache = cleaned
+            registry_cache.set_domain_data(self.name, cleaned)
+            registry_snapshot.store(self, cleaned)
 
         except RegistryError as e:
             logger.error(e)
@@ -2506,17 +2688,21 @@ class Domain(TimeStampedModel, DomainHelper):
                 dnssec_data = extension
         return dnssec_data
 
-    def _update_hosts_and_contacts(self, cleaned, fetch_hosts, fetch_contacts):
+    def _update_hosts_and_contacts(self, cleaned, fetch_hosts, fetch_contacts, skip_cache=False):
         """
         Update hosts and contacts if fetch_hosts and/or fetch_contacts.
         Additionally, capture and cache old hosts and contacts from cache if they
-        don't exist in cleaned
+        don't exist in cleaned.
+        With skip_cache, every contact (the registrant too) is fetched and rewritten
+        from the registry rather than taken from the contact cache.
         """
         old_cache_hosts = self._cache.get("hosts")
         old_cache_contacts = self._cache.get("contacts")
 
         if fetch_contacts:
-            cleaned["contacts"] = self._get_contacts(cleaned.get("_contacts", []))
+            cleaned["contacts"] = self._get_contacts(cleaned.get("_contacts", []), skip_cache)
+            if skip_cache and "registrant" in cleaned:
+                self._registrant_to_public_contact(cleaned["registrant"], skip_cache=True)
             if old_cache_hosts is not None:
                 logger.debug("resetting cleaned['hosts'] to old_cache_hosts")
                 cleaned["hosts"] = old_cache_hosts
@@ -2535,44 +2721,61 @@ class Domain(TimeStampedModel, DomainHelper):
             cleaned: dict containing hosts.  Hosts are provided as a list of dicts, e.g.
                 [{"name": "ns1.example.com",}, {"name": "ns1.example.gov"}, "addrs": ["0.0.0.0"])]
         """
-        cleaned_hosts = cleaned["hosts"]
-        # Get all existing hosts from the database for this domain
-        existing_hosts_in_db = Host.objects.filter(domain=self)
-        # Identify hosts to delete
-        cleaned_host_names = set(cleaned_host["name"] for cleaned_host in cleaned_hosts)
-        hosts_to_delete_from_db = [
-            existing_host for existing_host in existing_hosts_in_db if existing_host.name not in cleaned_host_names
-        ]
-        # Delete hosts and their associated HostIP instances
-        for host_to_delete in hosts_to_delete_from_db:
-            # Delete associated HostIP instances
-            HostIP.objects.filter(host=host_to_delete).delete()
-            # Delete the host itself
-            host_to_delete.delete()
-        # Update or create Hosts and HostIPs
-        for cleaned_host in cleaned_hosts:
-            # Check if the cleaned_host already exists
-            host_in_db, host_created = Host.objects.get_or_create(domain=self, name=cleaned_host["name"])
+        # What the registry has: host name -> IP addresses
+        registry_hosts: dict[str, set[str]] = {}
+        for cleaned_host in cleaned["hosts"]:
             # Check if the nameserver is a subdomain of the current domain
             # If it is NOT a subdomain, we remove the IP address
             if not Domain.isSubdomain(self.name, cleaned_host["name"]):
                 cleaned_host["addrs"] = []
-            # Get cleaned list of ips for update
-            cleaned_ips = cleaned_host["addrs"]
-            if not host_created:
-                # Get all existing ips from the database for this host
-                existing_ips_in_db = HostIP.objects.filter(host=host_in_db)
-                # Identify IPs to delete
-                ips_to_delete_from_db = [
-                    existing_ip for existing_ip in existing_ips_in_db if existing_ip.address not in cleaned_ips
-                ]
-                # Delete IPs
-                for ip_to_delete in ips_to_delete_from_db:
-                    # Delete the ip
-                    ip_to_delete.delete()
-            # Update or create HostIP instances
-            for ip_address in cleaned_ips:
-                HostIP.objects.get_or_create(address=ip_address, host=host_in_db)
+            registry_hosts[cleaned_host["name"]] = set(cleaned_host["addrs"])
+
+        host_ids, ips_in_db, stale_host_ids, stale_ip_ids = self._diff_hosts_and_ips_in_db(registry_hosts)
+
+        # Delete hosts and IPs the registry no longer has
+        if stale_ip_ids or stale_host_ids:
+            HostIP.objects.filter(models.Q(id__in=stale_ip_ids) | models.Q(host_id__in=stale_host_ids)).delete()
+        if stale_host_ids:
+            Host.objects.filter(id__in=stale_host_ids).delete()
+
+        # Create the new ones. ignore_conflicts: a concurrent refresh may have written them already
+        new_host_names = [name for name in registry_hosts if name not in host_ids]
+        if new_host_names:
+            Host.objects.bulk_create([Host(domain=self, name=name) for name in new_host_names], ignore_conflicts=True)
+            # ignore_conflicts leaves the ids unset, so read them back
+            host_ids.update(Host.objects.filter(domain=self, name__in=new_host_names).values_list("name", "id"))
+        new_ips = [
+            HostIP(host_id=host_ids[name], address=address)
+            for name, addresses in registry_hosts.items()
+            for address in addresses - ips_in_db.get(host_ids[name], set())
+        ]
+        if new_ips:
+            HostIP.objects.bulk_create(new_ips, ignore_conflicts=True)
+
+    def _diff_hosts_and_ips_in_db(self, registry_hosts):
+        """Compare the hosts and IPs in the database with the registry's, in two queries.
+
+        Returns (ids of the hosts to keep by name, their IP addresses by host id,
+        ids of hosts to delete, ids of IPs to delete)."""
+        host_ids: dict[str, int] = {}
+        stale_host_ids = set()
+        for host_id, name in Host.objects.filter(domain=self).values_list("id", "name"):
+            if name in registry_hosts:
+                host_ids[name] = host_id
+            else:
+                stale_host_ids.add(host_id)
+
+        host_names = {host_id: name for name, host_id in host_ids.items()}
+        ips_in_db: dict[int, set[str]] = {}
+        stale_ip_ids = []
+        for ip_id, host_id, address in HostIP.objects.filter(host__domain=self).values_list("id", "host_id", "address"):
+            if host_id in stale_host_ids:
+                # deleted with its host
+                continue
+            ips_in_db.setdefault(host_id, set()).add(address)
+            if address not in registry_hosts[host_names[host_id]]:
+                stale_ip_ids.append(ip_id)
+        return host_ids, ips_in_db, stale_host_ids, stale_ip_ids
 
     def _update_security_contact_in_db(self, cleaned):
         """Update security contact registry id in database if retrieved from registry.
@@ -2618,7 +2821,7 @@ class Domain(TimeStampedModel, DomainHelper):
         if requires_save:
             self.save()
 
-    def _get_contacts(self, contacts):
+    def _get_contacts(self, contacts, skip_cache=False):
         choices = PublicContact.ContactTypeChoices
         # We expect that all these fields get populated,
         # so we can create these early, rather than waiting.
@@ -2628,7 +2831,7 @@ class Domain(TimeStampedModel, DomainHelper):
             choices.TECHNICAL: None,
         }
         if contacts and isinstance(contacts, list) and len(contacts) > 0:
-            cleaned_contacts = self._fetch_contacts(contacts)
+            cleaned_contacts = self._fetch_contacts(contacts, skip_cache)
         return cleaned_contacts
 
     def _get_hosts(self, hosts):
@@ -2697,26 +2900,36 @@ class Domain(TimeStampedModel, DomainHelper):
         # If it already exists, we can assume that the DB instance was updated during set, so we should just use that.
         return existing_contact
 
-    def _registrant_to_public_contact(self, registry_id: str):
+    def _registrant_to_public_contact(self, registry_id: str, skip_cache=False):
         """EPPLib returns the registrant as a string,
         which is the registrants associated registry_id. This function is used to
         convert that id to a useable object by calling commands.InfoContact
-        on that ID, then mapping that object to type PublicContact."""
-        contact = PublicContact(
-            registry_id=registry_id,
-            contact_type=PublicContact.ContactTypeChoices.REGISTRANT,
-        )
+        on that ID, then mapping that object to type PublicContact.
+        With skip_cache, the contact is fetched and its row rewritten even if cached."""
+        contact_type = PublicContact.ContactTypeChoices.REGISTRANT
         # Grabs the expanded contact
-        full_object = self._request_contact_info(contact)
-        # Maps it to type PublicContact
-        mapped_object = self.map_epp_contact_to_public_contact(full_object, contact.registry_id, contact.contact_type)
-        return self._get_or_create_public_contact(mapped_object)
+        entry = self._get_contact_entries([registry_id], skip_cache)[registry_id]
+        in_db = None
+        if not skip_cache and registry_cache.is_synced(entry, self.name, contact_type):
+            in_db = PublicContact.objects.filter(
+                registry_id=registry_id, contact_type=contact_type, domain=self
+            ).first()
+        if in_db is None:
+            # Maps it to type PublicContact
+            mapped_object = self.map_epp_contact_to_public_contact(entry["info"], registry_id, contact_type)
+            with registry_cache.syncing(registry_id):
+                in_db = self._get_or_create_public_contact(mapped_object)
+            registry_cache.mark_synced(entry, self.name, contact_type)
+        registry_cache.set_contacts({registry_id: entry})
+        return in_db
 
     def _invalidate_cache(self):
         """Remove cache data when updates are made.
         NOTE: The "on hold date" property is a one off addition - we want to
         make sure that when there is state change we delete the on hold date as well."""
         self._cache = {}
+        registry_cache.invalidate_domain_data(self.name)
+        registry_snapshot.discard(self)
         logging.info(f"Cache is empty for domain: {self.name}")
         delattr(self, "on_hold_date") if hasattr(self, "on_hold_date") else None
 
@@ -2733,17 +2946,21 @@ class Domain(TimeStampedModel, DomainHelper):
         else:
             raise KeyError("Requested key %s was not found in registry cache." % str(property))
 
-    def delete_with_no_dns(self, *args, **kwargs):
-        # Guard: stop deletion if domain has active nameservers
+    def check_no_active_nameservers(self):
+        """Raises ActionNotAllowed if the domain has active nameservers and so should not be deleted."""
         # self.nameservers checks the registry, self.host.all() checks our db
         if len(self.nameservers) >= 2 or self.host.all().count() >= 2:
             logger.error(
                 f"Domain {self.name} has {len(self.nameservers)} nameservers "
-                f"and {len(self.host.all().count())} hosts "
+                f"and {self.host.all().count()} hosts "
                 f"but is in state {self.state}. Aborting deletion."
             )
             raise ActionNotAllowed(f"Domain {self.name} has active nameservers. Cannot delete.")
 
+    def delete_with_no_dns(self, *args, **kwargs):
+        # Guard: stop deletion if domain has active nameservers
+        self.check_no_active_nameservers()
+
         # Delete a domain with associated PublicContacts
         PublicContact.objects.filter(domain=self).delete()
         # Delete domain
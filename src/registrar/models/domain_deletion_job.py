@@ -0,0 +1,68 @@
+from django.db import models
+from django.utils import timezone
+
+from .utility.time_stamped_model import TimeStampedModel
+
+
+class DomainDeletionJob(TimeStampedModel):
+    """
+    A domain's removal from the registry, run one step at a time outside the
+    request that asked for it. See registrar/models/utility/domain_deletion.py.
+    """
+
+    class Step(models.TextChoices):
+        REMOVE_HOSTS = "remove_hosts", "Removing nameservers"
+        REMOVE_CONTACTS = "remove_contacts", "Removing contacts"
+        REMOVE_DNSSEC = "remove_dnssec", "Removing DNSSEC data"
+        WAIT_FOR_REGISTRY = "wait_for_registry", "Waiting for the registry to release hosts"
+        DELETE_DOMAIN = "delete_domain", "Deleting the domain"
+        DONE = "done", "Deleted"
+        FAILED = "failed", "Failed"
+
+    FINISHED_STEPS = [Step.DONE, Step.FAILED]
+
+    class Meta:
+        verbose_name = "Domain deletion job"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["domain"],
+                condition=~models.Q(step__in=["done", "failed"]),
+                name="unique_unfinished_deletion_job_per_domain",
+            ),
+        ]
+
+    domain = models.ForeignKey(
+        "registrar.Domain",
+        on_delete=models.CASCADE,
+        related_name="deletion_jobs",
+    )
+
+    requested_by = models.ForeignKey(
+        "registrar.User",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+
+    notify_managers = models.BooleanField(
+        default=False,
+        help_text="Email domain managers and portfolio admins once the domain is deleted",
+    )
+
+    step = models.CharField(max_length=32, choices=Step.choices, default=Step.REMOVE_HOSTS)
+
+    attempts = models.PositiveSmallIntegerField(default=0, help_text="Tries at the current step")
+
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+
+    last_error = models.TextField(blank=True, default="")
+
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.step in self.FINISHED_STEPS
+
+    def __str__(self):
+        return f"Deletion of {self.domain_id}: {self.get_step_display()}"
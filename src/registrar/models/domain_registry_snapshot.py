@@ -0,0 +1,34 @@
+from django.db import models
+
+
+class DomainRegistrySnapshot(models.Model):
+    """
+    The last cleaned registry data (Domain._cache) fetched for a domain.
+
+    The registry is the source of truth for this data. Domain pages render from
+    this copy instead of waiting on the registry, and refresh it in the background
+    once it is older than REGISTRY_SNAPSHOT_STALE_SECONDS.
+    See registrar/models/utility/registry_snapshot.py.
+    """
+
+    class Meta:
+        verbose_name = "Domain registry snapshot"
+
+    domain = models.OneToOneField(
+        "registrar.Domain",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="registry_snapshot",
+    )
+
+    # pickled dict, in the same shape as Domain._cache
+    data = models.BinaryField()
+
+    has_hosts = models.BooleanField(default=False, help_text="Data includes the domain's hosts (InfoHost)")
+
+    has_contacts = models.BooleanField(default=False, help_text="Data includes the domain's contacts (InfoContact)")
+
+    synced_at = models.DateTimeField(help_text="When this data was fetched from the registry")
+
+    def __str__(self):
+        return f"Registry snapshot of {self.domain_id} at {self.synced_at}"
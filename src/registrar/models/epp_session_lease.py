@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class EppSessionLease(models.Model):
+    """
+    One slot of the shared EPP burst session budget (EPP_POOL_BURST_SESSION_BUDGET).
+    A slot is free once expires_at has passed. Slots are leased, refreshed and released
+    with single UPDATE statements by epplibwrapper.utility.session_budget.
+    """
+
+    class Meta:
+        verbose_name = "EPP session lease"
+
+    slot = models.PositiveIntegerField(primary_key=True)
+
+    owner = models.CharField(max_length=255, blank=True, help_text="The worker holding the slot")
+
+    expires_at = models.DateTimeField(help_text="The slot is free from this time on")
+
+    def __str__(self):
+        return f"EPP session slot {self.slot} ({self.owner or 'free'})"
@@ -15,6 +15,10 @@ class Host(TimeStampedModel):
     available when registry is not available.
     """
 
+    class Meta:
+        # Domain._update_hosts_and_ips_in_db relies on this to skip rows a concurrent refresh already wrote
+        constraints = [models.UniqueConstraint(fields=["domain", "name"], name="unique_host_name_per_domain")]
+
     name = models.CharField(
         max_length=253,
         null=False,
@@ -17,6 +17,7 @@ class HostIP(TimeStampedModel):
     class Meta:
         verbose_name = "Host IP"
         verbose_name_plural = "Host IPs"
+        constraints = [models.UniqueConstraint(fields=["host", "address"], name="unique_address_per_host")]
 
     address = models.CharField(
         max_length=46,
@@ -0,0 +1,229 @@
+"""Removes domains from the registry one step at a time, outside the request that asked for it.
+
+Deleting a domain takes several registry round trips (Domain._delete_domain), and the
+registry can take a while to notice that a domain's hosts are gone. Done inside a
+request, that held a worker and a database transaction for 10+ seconds. Instead,
+the admin and the domain delete page call enqueue(), which saves a DomainDeletionJob
+and returns right away. The job then runs these steps:
+
+    remove_hosts -> remove_contacts -> remove_dnssec -> wait_for_registry -> delete_domain -> done
+
+A step that raises (or, for wait_for_registry, finds hosts still on the domain) is
+tried again after an exponential backoff, up to MAX_ATTEMPTS times, after which the
+job is failed and last_error says why. A failed deletion can simply be started again.
+
+Jobs run in a background thread (unless DOMAIN_DELETION_IN_BACKGROUND is off, as in
+tests, where each due step runs right away). A job whose worker went away is picked
+up by the process_domain_deletions management command.
+"""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django_fsm import TransitionNotAllowed, can_proceed  # type: ignore
+
+from epplibwrapper import RegistryError, ErrorCode
+from epplibwrapper.utility.lanes import batch_priority
+from registrar.models.domain_deletion_job import DomainDeletionJob
+
+logger = logging.getLogger(__name__)
+
+Step = DomainDeletionJob.Step
+
+# tries per step, and the backoff between them: 2, 4, 8, 16, 32... seconds
+MAX_ATTEMPTS = 6
+RETRY_BASE_SECONDS = 2
+RETRY_MAX_SECONDS = 300
+
+# a job whose runner hasn't finished after this long (worker killed mid-run) may be run again
+RUN_LOCK_SECONDS = 30 * 60
+
+
+class HostsNotReleased(Exception):
+    """The registry still lists hosts on the domain."""
+
+
+def enqueue(domain, requested_by=None, notify_managers=False, optimistic_lock=False) -> DomainDeletionJob:
+    """
+    Starts deleting the domain from the registry, or returns the deletion already under way.
+    Raises TransitionNotAllowed if the domain can't be deleted from its current state,
+    and RegistryError if one of its subdomains is a host on another domain.
+    With optimistic_lock, raises ValidationError if the domain was saved elsewhere since it was loaded.
+    """
+    if optimistic_lock:
+        domain.check_optimistic_lock()
+    if not can_proceed(domain.deleteInEpp):
+        raise TransitionNotAllowed(f"Can't delete domain {domain.name} in state {domain.state}")
+    domain._check_subdomains_not_in_use()
+
+    job = unfinished_job(domain)
+    if job is None:
+        try:
+            with transaction.atomic():
+                job = DomainDeletionJob.objects.create(
+                    domain=domain, requested_by=requested_by, notify_managers=notify_managers
+                )
+        except IntegrityError:
+            # another request enqueued it first
+            job = unfinished_job(domain)
+    transaction.on_commit(lambda: start(job.pk))
+    return job
+
+
+def unfinished_job(domain) -> DomainDeletionJob | None:
+    return DomainDeletionJob.objects.filter(domain=domain).exclude(step__in=DomainDeletionJob.FINISHED_STEPS).first()
+
+
+def latest_job(domain) -> DomainDeletionJob | None:
+    """The domain's most recent deletion job, for showing its progress."""
+    return DomainDeletionJob.objects.filter(domain=domain).order_by("-created_at").first()
+
+
+def start(job_id):
+    """Run the job in the background (unless DOMAIN_DELETION_IN_BACKGROUND is off)."""
+    if not settings.DOMAIN_DELETION_IN_BACKGROUND:
+        run(job_id)
+        return
+    # a new thread starts with an empty context: no request deadline
+    threading.Thread(
+        target=_run_in_background,
+        args=(job_id,),
+        name=f"domain-deletion-{job_id}",
+        daemon=True,
+    ).start()
+
+
+def _run_in_background(job_id):
+    try:
+        run(job_id, wait=True)
+    finally:
+        # this thread's own database connection
+        connection.close()
+
+
+@batch_priority()
+def run(job_id, wait=False) -> DomainDeletionJob | None:
+    """
+    Runs the job's due steps until it finishes or its next try isn't due yet.
+    With wait, sleeps until each retry is due instead of returning.
+    Returns the job, or None if it is already running elsewhere.
+    """
+    lock_key = f"domain-deletion-job:{job_id}"
+    if not cache.add(lock_key, True, timeout=RUN_LOCK_SECONDS):
+        return None
+    try:
+        while True:
+            job = DomainDeletionJob.objects.select_related("domain").get(pk=job_id)
+            if job.is_finished:
+                return job
+            delay = (job.next_attempt_at - timezone.now()).total_seconds()
+            if delay > 0:
+                if not wait:
+                    return job
+                time.sleep(delay)
+            advance(job)
+    finally:
+        cache.delete(lock_key)
+
+
+def advance(job: DomainDeletionJob):
+    """Runs the job's current step once and saves where it got to."""
+    domain = job.domain
+    logger.info("Deletion of %s: running step %s (attempt %d)", domain.name, job.step, job.attempts + 1)
+    try:
+        next_step = _STEP_HANDLERS[job.step](job)
+    except Exception as err:
+        _retry_or_fail(job, err)
+    else:
+        job.step = next_step
+        job.attempts = 0
+        job.next_attempt_at = timezone.now()
+        job.last_error = ""
+        if next_step == Step.DONE:
+            job.finished_at = timezone.now()
+            logger.info("Deletion of %s finished", domain.name)
+    job.save()
+
+    if job.step == Step.DONE and job.notify_managers:
+        from registrar.utility.email_invitations import send_domain_deleted_email_to_managers_and_admins
+
+        send_domain_deleted_email_to_managers_and_admins(domain=domain)
+
+
+def _retry_or_fail(job: DomainDeletionJob, err: Exception):
+    job.attempts += 1
+    if isinstance(err, RegistryError) and err.note:
+        job.last_error = f"{err} ({err.note})"
+    else:
+        job.last_error = str(err)
+
+    # the domain is already gone from the registry, or it can't be deleted from its state
+    permanent = isinstance(err, TransitionNotAllowed) or (
+        isinstance(err, RegistryError) and err.code == ErrorCode.OBJECT_DOES_NOT_EXIST
+    )
+    if permanent or job.attempts >= MAX_ATTEMPTS:
+        logger.error("Deletion of %s failed at step %s: %s", job.domain.name, job.step, job.last_error)
+        job.step = Step.FAILED
+        job.finished_at = timezone.now()
+        return
+
+    delay = min(RETRY_BASE_SECONDS * 2 ** (job.attempts - 1), RETRY_MAX_SECONDS)
+    job.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+    logger.warning("Deletion of %s: step %s will be retried in %ds: %s", job.domain.name, job.step, delay, err)
+
+
+def _remove_hosts(job):
+    job.domain._delete_nameservers_and_hosts()
+    return Step.REMOVE_CONTACTS
+
+
+def _remove_contacts(job):
+    job.domain._delete_nonregistrant_contacts()
+    return Step.REMOVE_DNSSEC
+
+
+def _remove_dnssec(job):
+    job.domain._delete_dnssecdata()
+    return Step.WAIT_FOR_REGISTRY
+
+
+def _wait_for_registry(job):
+    if not job.domain._registry_released_hosts():
+        raise HostsNotReleased("Domain has associated objects that prevent deletion.")
+    return Step.DELETE_DOMAIN
+
+
+def _delete_domain(job):
+    domain = job.domain
+    try:
+        domain._delete_from_registry()
+    except RegistryError as err:
+        # an earlier try deleted it from the registry but didn't get to save the domain
+        if err.code != ErrorCode.OBJECT_DOES_NOT_EXIST:
+            raise
+        logger.info("Domain %s is already deleted from the registry", domain.name)
+        domain._delete_related_objects_from_db()
+
+    with transaction.atomic():
+        # the registry calls above take a while, and the domain may have been saved elsewhere
+        # meanwhile: transition a fresh copy, locked until the transaction commits
+        domain = type(domain).objects.select_for_update().get(pk=domain.pk)
+        domain.deleteInEpp(ignoreEPP=True)
+        domain.save()
+    job.domain = domain
+    return Step.DONE
+
+
+_STEP_HANDLERS = {
+    Step.REMOVE_HOSTS: _remove_hosts,
+    Step.REMOVE_CONTACTS: _remove_contacts,
+    Step.REMOVE_DNSSEC: _remove_dnssec,
+    Step.WAIT_FOR_REGISTRY: _wait_for_registry,
+    Step.DELETE_DOMAIN: _delete_domain,
+}
@@ -298,6 +298,7 @@ def replace_url_queryparams(url_to_modify: str, query_params, convert_list_to_cs
 def convert_queryset_to_dict(queryset, is_model=True, key="id"):
     """
     Transforms a queryset into a dictionary keyed by a specified key (like "id").
+    When several items share a key, the first one is kept (as a streamed export can't look ahead).
 
     Parameters:
         requests (QuerySet or list of dicts): Input data.
@@ -308,12 +309,11 @@ def convert_queryset_to_dict(queryset, is_model=True, key="id"):
         dict: Dictionary with keys derived from 'key' and values corresponding to items in 'queryset'.
     """
 
-    if is_model:
-        request_dict = {getattr(value, key): value for value in queryset}
-    else:
+    request_dict = {}
+    for value in queryset:
         # Querysets sometimes contain sets of dictionaries.
         # Calling .values is an example of this.
-        request_dict = {value[key]: value for value in queryset}
+        request_dict.setdefault(getattr(value, key) if is_model else value[key], value)
 
     return request_dict
 
@@ -0,0 +1,261 @@
+"""Shared (cross-request, cross-worker) cache for registry data about a domain.
+
+Sits behind Domain._fetch_cache: every Domain instance still starts with an empty
+`_cache`, but before contacting the registry it checks here for a cleaned copy that
+another request (or worker) fetched recently.
+
+Entries are keyed by domain name and by which optional parts were fetched
+(hosts, contacts), because InfoHost/InfoContact lookups are only done on demand.
+A lookup is satisfied by any entry that has *at least* the requested parts.
+
+Backed by the "registry" alias in settings.CACHES, which sets the TTL and the
+max number of entries (older entries are culled once that's reached).
+Setting REGISTRY_CACHE_TTL to 0 turns this tier off.
+
+Contacts are cached on their own, keyed by registry_id (see get_contacts), since
+they change far less often than the domain data that refers to them.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import product
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = "registry"
+
+
+class _Counters:
+    """Hit/miss counters for this worker process (thread/greenlet safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "invalidations": self.invalidations}
+
+
+counters = _Counters()
+
+
+def is_enabled() -> bool:
+    return settings.REGISTRY_CACHE_TTL > 0
+
+
+def _key(domain_name: str, hosts: bool, contacts: bool) -> str:
+    return f"domain:{domain_name.lower()}:hosts={int(hosts)}:contacts={int(contacts)}"
+
+
+def _all_keys(domain_name: str) -> list[str]:
+    return [_key(domain_name, hosts, contacts) for hosts, contacts in product((False, True), repeat=2)]
+
+
+def get_domain_data(domain_name: str, hosts=False, contacts=False) -> dict | None:
+    """Return cached registry data for a domain that includes the requested parts, or None."""
+    if not is_enabled():
+        return None
+
+    # richest entries first, so a full entry wins over a partial one
+    candidates = [
+        _key(domain_name, has_hosts, has_contacts)
+        for has_hosts, has_contacts in ((True, True), (True, False), (False, True), (False, False))
+        if (has_hosts or not hosts) and (has_contacts or not contacts)
+    ]
+    try:
+        # a savepoint, so a failed cache query doesn't break the request's transaction
+        with transaction.atomic():
+            found = caches[CACHE_ALIAS].get_many(candidates)
+    except Exception:
+        # the cache is an optimization, never a reason to fail a page
+        logger.warning("Registry cache lookup failed for %s", domain_name, exc_info=True)
+        found = {}
+
+    for key in candidates:
+        if key in found:
+            counters.incr("hits")
+            logger.debug("Registry cache hit for %s. %s", domain_name, counters.snapshot())
+            return found[key]
+
+    counters.incr("misses")
+    logger.debug("Registry cache miss for %s. %s", domain_name, counters.snapshot())
+    return None
+
+
+def set_domain_data(domain_name: str, data: dict):
+    """Store cleaned registry data for a domain, keyed by which optional parts it contains."""
+    if not is_enabled():
+        return
+
+    key = _key(domain_name, "hosts" in data, "contacts" in data)
+    try:
+        with transaction.atomic():
+            caches[CACHE_ALIAS].set(key, data, timeout=settings.REGISTRY_CACHE_TTL)
+    except Exception:
+        logger.warning("Registry cache write failed for %s", domain_name, exc_info=True)
+
+
+def invalidate_domain_data(domain_name: str):
+    """Drop every cached entry for a domain. Called whenever the domain is updated in the registry."""
+    if not is_enabled():
+        return
+
+    counters.incr("invalidations")
+    try:
+        with transaction.atomic():
+            caches[CACHE_ALIAS].delete_many(_all_keys(domain_name))
+    except Exception:
+        logger.warning("Registry cache invalidation failed for %s", domain_name, exc_info=True)
+
+
+def stats() -> dict:
+    """Counters for this worker, e.g. for log lines: how many registry fetches the cache saved."""
+    return counters.snapshot()
+
+
+# A contact entry is used without asking the registry for REGISTRY_CONTACT_CACHE_TTL
+# seconds. After that it is kept (for this long) so that a fetch finding the same
+# up_date can skip rewriting the contact's PublicContact rows.
+CONTACT_ENTRY_LIFETIME = 24 * 60 * 60
+
+# A contact's generation outlives its entries; once it expires, entries stored under it are misses
+CONTACT_GENERATION_LIFETIME = 2 * CONTACT_ENTRY_LIFETIME
+
+# registry_ids whose PublicContact rows this context is writing from their entry (see syncing)
+_syncing: ContextVar[frozenset] = ContextVar("registry_cache_syncing", default=frozenset())
+
+
+def contacts_enabled() -> bool:
+    return settings.REGISTRY_CONTACT_CACHE_TTL > 0
+
+
+def _contact_key(registry_id: str) -> str:
+    return f"contact:{registry_id}"
+
+
+def _generation_key(registry_id: str) -> str:
+    return f"contact-generation:{registry_id}"
+
+
+def get_contacts(registry_ids) -> tuple[dict[str, dict], dict[str, str | None]]:
+    """Cached entries (fresh or not, see is_fresh) for the contacts that have one, by registry_id,
+    and every contact's current generation, to pass to contact_entry.
+
+    An entry is a dict with the contact's InfoContact result ("info"), its registry
+    up_date ("version"), when it was last fetched ("checked_at"), the domain/contact
+    type pairs whose PublicContact rows already match this version ("synced") and the
+    contact's generation when it was fetched ("generation").
+
+    invalidate_contact moves a contact to a new generation. An entry from an older one
+    (fetched before the contact changed) is neither returned here nor stored by set_contacts.
+    """
+    if not contacts_enabled():
+        return {}, {}
+    registry_ids = list(dict.fromkeys(registry_ids))
+    try:
+        with transaction.atomic():
+            found = caches[CACHE_ALIAS].get_many(
+                [_contact_key(registry_id) for registry_id in registry_ids]
+                + [_generation_key(registry_id) for registry_id in registry_ids]
+            )
+    except Exception:
+        logger.warning("Registry contact cache lookup failed", exc_info=True)
+        return {}, {}
+    generations = {registry_id: found.get(_generation_key(registry_id)) for registry_id in registry_ids}
+    entries = {
+        registry_id: found[_contact_key(registry_id)]
+        for registry_id in registry_ids
+        if _contact_key(registry_id) in found
+        and found[_contact_key(registry_id)].get("generation") == generations[registry_id]
+    }
+    return entries, generations
+
+
+def is_fresh(entry: dict | None) -> bool:
+    """True if the entry was fetched recently enough to be used without asking the registry."""
+    return entry is not None and time.time() - entry["checked_at"] < settings.REGISTRY_CONTACT_CACHE_TTL
+
+
+def contact_entry(info, previous: dict | None, generation: str | None) -> dict:
+    """A new entry for just-fetched InfoContact data. Keeps the previous entry's synced
+    pairs if the contact hasn't changed in the registry since (same up_date).
+    generation is the contact's generation from before the fetch (see get_contacts)."""
+    # a contact that was never updated has no up_date
+    version = info.up_date or info.cr_date
+    synced = previous["synced"] if previous is not None and previous["version"] == version else []
+    return {
+        "info": info,
+        "version": version,
+        "checked_at": time.time(),
+        "synced": list(synced),
+        "generation": generation,
+    }
+
+
+def is_synced(entry: dict, domain_name: str, contact_type: str) -> bool:
+    return f"{domain_name}:{contact_type}" in entry["synced"]
+
+
+def mark_synced(entry: dict, domain_name: str, contact_type: str):
+    if not is_synced(entry, domain_name, contact_type):
+        entry["synced"].append(f"{domain_name}:{contact_type}")
+
+
+def set_contacts(entries: dict[str, dict]):
+    """Store contact entries, by registry_id. An entry whose contact was invalidated since
+    it was fetched (its generation moved on) is left out: it may predate the change."""
+    if not contacts_enabled() or not entries:
+        return
+    try:
+        cache = caches[CACHE_ALIAS]
+        with transaction.atomic():
+            generations = cache.get_many([_generation_key(registry_id) for registry_id in entries])
+            current = {
+                _contact_key(registry_id): entry
+                for registry_id, entry in entries.items()
+                if generations.get(_generation_key(registry_id)) == entry.get("generation")
+            }
+            if current:
+                cache.set_many(current, timeout=CONTACT_ENTRY_LIFETIME)
+    except Exception:
+        logger.warning("Registry contact cache write failed", exc_info=True)
+
+
+@contextmanager
+def syncing(registry_id: str):
+    """PublicContact rows written inside this block are copied from the contact's entry,
+    which the caller then stores: they don't invalidate it."""
+    token = _syncing.set(_syncing.get() | {registry_id})
+    try:
+        yield
+    finally:
+        _syncing.reset(token)
+
+
+def invalidate_contact(registry_id: str):
+    """Move a contact to a new generation and drop its entry. Called when the contact or
+    its PublicContact rows change."""
+    if not contacts_enabled() or registry_id in _syncing.get():
+        return
+    try:
+        cache = caches[CACHE_ALIAS]
+        with transaction.atomic():
+            cache.set(_generation_key(registry_id), uuid.uuid4().hex, timeout=CONTACT_GENERATION_LIFETIME)
+            cache.delete(_contact_key(registry_id))
+    except Exception:
+        logger.warning("Registry contact cache invalidation failed for %s", registry_id, exc_info=True)
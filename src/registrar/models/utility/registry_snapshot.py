@@ -0,0 +1,142 @@
+"""Persisted registry data per domain, so domain pages render without waiting on the registry.
+
+Sits in front of the shared registry cache (registry_cache.py) in Domain._fetch_cache,
+but only inside `serving_snapshots()`, which the domain views' GETs open. There,
+a domain with a snapshot renders from it straight away (stale-while-revalidate):
+if the snapshot is older than REGISTRY_SNAPSHOT_STALE_SECONDS, a background
+refresh fetches the domain from the registry again and replaces it.
+
+Everything else (form posts, management commands, the Cache setters) keeps reading
+from the registry. Every registry fetch stores a new snapshot, and every update made
+through the registrar (Domain._invalidate_cache) deletes it, so the page after an
+edit shows the registry's answer, not the snapshot's.
+
+Setting REGISTRY_SNAPSHOT_STALE_SECONDS to 0 turns this off.
+"""
+
+import logging
+import pickle
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from epplibwrapper.utility.lanes import batch_priority
+from registrar.models.domain_registry_snapshot import DomainRegistrySnapshot
+
+logger = logging.getLogger(__name__)
+
+_serving: ContextVar[bool] = ContextVar("serving_registry_snapshots", default=False)
+_refreshing: ContextVar[bool] = ContextVar("refreshing_registry_snapshot", default=False)
+
+# a refresh that hasn't finished after this long (worker killed mid-refresh) may be retried
+REFRESH_LOCK_SECONDS = 60
+
+
+def is_enabled() -> bool:
+    return settings.REGISTRY_SNAPSHOT_STALE_SECONDS > 0
+
+
+@contextmanager
+def serving_snapshots():
+    """Registry data read inside the block may come from the domain's snapshot."""
+    token = _serving.set(True)
+    try:
+        yield
+    finally:
+        _serving.reset(token)
+
+
+def is_refreshing() -> bool:
+    """True inside a snapshot refresh, which stores whatever data the fetch found."""
+    return _refreshing.get()
+
+
+def load(domain, hosts=False, contacts=False) -> dict | None:
+    """The domain's snapshot data, if it includes the requested parts and snapshots may
+    be served here. Starts a background refresh when the snapshot is stale."""
+    if not is_enabled() or not _serving.get() or _refreshing.get() or domain.pk is None:
+        return None
+
+    snapshot = DomainRegistrySnapshot.objects.filter(domain=domain).first()
+    if snapshot is None or (hosts and not snapshot.has_hosts) or (contacts and not snapshot.has_contacts):
+        return None
+    try:
+        data = pickle.loads(snapshot.data)  # nosec B301 - written by store() below
+    except Exception:
+        # e.g. pickled by an older epplib; fetch it again instead
+        logger.warning("Unreadable registry snapshot for %s", domain.name, exc_info=True)
+        return None
+
+    if timezone.now() - snapshot.synced_at > timedelta(seconds=settings.REGISTRY_SNAPSHOT_STALE_SECONDS):
+        refresh(domain.pk, snapshot.has_hosts, snapshot.has_contacts)
+    return data
+
+
+def store(domain, data: dict):
+    """Save data just fetched for the domain as its snapshot."""
+    if not is_enabled() or domain.pk is None:
+        return
+    try:
+        DomainRegistrySnapshot.objects.update_or_create(
+            domain=domain,
+            defaults={
+                "data": pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL),
+                "has_hosts": "hosts" in data,
+                "has_contacts": "contacts" in data,
+                "synced_at": timezone.now(),
+            },
+        )
+    except Exception:
+        # the snapshot is an optimization, never a reason to fail a page
+        logger.warning("Registry snapshot write failed for %s", domain.name, exc_info=True)
+
+
+def discard(domain):
+    """Drop the domain's snapshot. Called whenever the domain is updated in the registry."""
+    if not is_enabled() or domain.pk is None:
+        return
+    DomainRegistrySnapshot.objects.filter(domain=domain).delete()
+
+
+def refresh(domain_id, hosts, contacts):
+    """Fetch the domain from the registry again (in the background, unless
+    REGISTRY_SNAPSHOT_REFRESH_IN_BACKGROUND is off) and store a new snapshot.
+    At most one refresh per domain runs at a time, across workers."""
+    lock_key = f"registry-snapshot-refresh:{domain_id}"
+    if not cache.add(lock_key, True, timeout=REFRESH_LOCK_SECONDS):
+        return
+
+    if not settings.REGISTRY_SNAPSHOT_REFRESH_IN_BACKGROUND:
+        _refresh(domain_id, hosts, contacts, lock_key)
+        return
+    # a new thread starts with an empty context: no request deadline, and serving_snapshots is off
+    threading.Thread(
+        target=_refresh,
+        args=(domain_id, hosts, contacts, lock_key),
+        name=f"registry-snapshot-{domain_id}",
+        daemon=True,
+    ).start()
+
+
+def _refresh(domain_id, hosts, contacts, lock_key):
+    from registrar.models import Domain
+
+    token = _refreshing.set(True)
+    try:
+        # background work: don't take pooled connections from web requests
+        with batch_priority():
+            Domain.objects.get(pk=domain_id)._fetch_cache(fetch_hosts=hosts, fetch_contacts=contacts)
+    except Exception:
+        logger.warning("Registry snapshot refresh failed for domain %s", domain_id, exc_info=True)
+    finally:
+        _refreshing.reset(token)
+        cache.delete(lock_key)
+        if settings.REGISTRY_SNAPSHOT_REFRESH_IN_BACKGROUND:
+            # this thread's own database connection
+            connection.close()
@@ -19,6 +19,7 @@ from waffle.decorators import flag_is_active
 from registrar.models.utility.generic_helper import replace_url_queryparams
 from registrar.utility.db_helpers import get_portfolio_from_session
 from .logging_context import set_user_log_context
+from epplibwrapper.utility.deadline import request_deadline
 
 logger = logging.getLogger(__name__)
 
@@ -415,3 +416,18 @@ class DatabaseConnectionMiddleware:
                 f"path={request.path}"
             )
         return response
+
+
+class RequestDeadlineMiddleware:
+    """
+    Middleware to give registry calls made during a request a deadline a little under the
+    gunicorn worker timeout, so they stop waiting/retrying once the response can't make it.
+    See epplibwrapper/utility/deadline.py.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_deadline(settings.REQUEST_DEADLINE_SECONDS or None):
+            return self.get_response(request)
@@ -1,7 +1,8 @@
 # registrar/signals.py
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import UserDomainRole, DomainInvitation, User
+from .models import UserDomainRole, DomainInvitation, PublicContact, User
+from .models.utility import registry_cache
 
 
 @receiver(post_delete, sender=UserDomainRole)
@@ -22,3 +23,13 @@ def cleanup_retrieved_domain_invitations(sender, instance, **kwargs):
         domain_id=instance.domain_id,
         status=DomainInvitation.DomainInvitationStatus.RETRIEVED,
     ).delete()
+
+
+@receiver(post_save, sender=PublicContact)
+@receiver(post_delete, sender=PublicContact)
+def invalidate_cached_contact(sender, instance, **kwargs):
+    """
+    Drop the contact's registry cache entry, which records the PublicContact rows
+    that match the registry (see registry_cache.get_contacts).
+    """
+    registry_cache.invalidate_contact(instance.registry_id)
@@ -1809,6 +1809,16 @@ class MockEppLib(TestCase):
         )
 
     def mockCheckDomainCommand(self, _request, cleaned):
+        names = getattr(_request, "names", None) or []
+        if len(names) > 1:
+            # a multi-name check answers every name it was given, in one response
+            single_results = [self.mockCheckDomainCommand(commands.CheckDomain([name]), cleaned) for name in names]
+            return MagicMock(
+                res_data=[
+                    responses.check.CheckDomainResultData(name=name, avail=result.res_data[0].avail, reason=None)
+                    for name, result in zip(names, single_results)
+                ]
+            )
         if "gsa.gov" in getattr(_request, "names", None):
             return self._mockDomainName("gsa.gov", False)
         elif "igorville.gov" in getattr(_request, "names", None):
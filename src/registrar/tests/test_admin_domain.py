@@ -17,9 +17,11 @@ from registrar.models import (
     Host,
     Portfolio,
 )
+from registrar.models.domain_deletion_job import DomainDeletionJob
 from registrar.models.federal_agency import FederalAgency
 from registrar.models.public_contact import PublicContact
 from registrar.models.user_domain_role import UserDomainRole
+from registrar.models.utility import domain_deletion
 from registrar.utility.constants import BranchChoices
 from registrar.utility.errors import DnsHostingError, DnsHostingErrorCodes
 from .common import (
@@ -353,13 +355,14 @@ class TestDomainAdminAsStaff(MockEppLib):
             {"_delete_domain": "Remove from registry", "name": domain.name},
             follow=True,
         )
-        request.user = self.client
+        request.user = self.superuser
         with patch("django.contrib.messages.add_message") as mock_add_message:
-            self.admin.do_delete_domain(request, domain)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.admin.do_delete_domain(request, domain)
             mock_add_message.assert_called_once_with(
                 request,
                 messages.INFO,
-                "Domain my-nameserver.gov has been deleted. Thanks!",
+                "Removal of my-nameserver.gov from the registry has started. Its progress is shown on this page.",
                 extra_tags="",
                 fail_silently=False,
             )
@@ -369,6 +372,11 @@ class TestDomainAdminAsStaff(MockEppLib):
         self.assertContains(response, "When a domain is removed from the registry:")
         self.assertContains(response, "Yes, remove from registry")
 
+        # DOMAIN_DELETION_IN_BACKGROUND is off in tests, so the job already ran
+        job = DomainDeletionJob.objects.get(domain=domain)
+        self.assertEqual(job.step, DomainDeletionJob.Step.DONE)
+        self.assertEqual(job.requested_by, self.superuser)
+        domain.refresh_from_db()
         self.assertEqual(domain.state, Domain.State.DELETED)
 
     @less_console_noise_decorator
@@ -407,17 +415,24 @@ class TestDomainAdminAsStaff(MockEppLib):
             {"_delete_domain": "Remove from registry", "name": domain.name},
             follow=True,
         )
-        request.user = self.client
-        with patch("django.contrib.messages.add_message") as mock_add_message:
+        request.user = self.superuser
+        with self.captureOnCommitCallbacks(execute=True):
             self.admin.do_delete_domain(request, domain)
-            mock_add_message.assert_called_once_with(
-                request,
-                messages.ERROR,
-                "Error deleting this Domain: Command failed with note: Domain has associated objects that prevent deletion.",  # noqa
-                extra_tags="",
-                fail_silently=False,
-            )
 
+        # the registry still lists hosts on the domain, so the job waits and retries
+        job = DomainDeletionJob.objects.get(domain=domain)
+        self.assertEqual(job.step, DomainDeletionJob.Step.WAIT_FOR_REGISTRY)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(job.last_error, "Domain has associated objects that prevent deletion.")
+        response = self.client.get("/admin/registrar/domain/{}/change/".format(domain.pk))
+        self.assertContains(response, "Removal from registry: Waiting for the registry to release hosts")
+        self.assertNotContains(response, 'href="#toggle-remove-from-registry"')
+
+        for _ in range(domain_deletion.MAX_ATTEMPTS - 1):
+            domain_deletion.advance(job)
+        self.assertEqual(job.step, DomainDeletionJob.Step.FAILED)
+
+        domain.refresh_from_db()
         self.assertEqual(domain.state, Domain.State.ON_HOLD)
 
     @less_console_noise_decorator
@@ -444,7 +459,7 @@ class TestDomainAdminAsStaff(MockEppLib):
             {"_delete_domain": "Remove from registry", "name": domain.name},
             follow=True,
         )
-        request.user = self.client
+        request.user = self.superuser
         with patch("django.contrib.messages.add_message") as mock_add_message:
             self.admin.do_delete_domain(request, domain)
             mock_add_message.assert_called_once_with(
@@ -485,19 +500,13 @@ class TestDomainAdminAsStaff(MockEppLib):
             {"_delete_domain": "Remove from registry", "name": domain.name},
             follow=True,
         )
-        request.user = self.client
+        request.user = self.superuser
         # Delete it once
 
-        with patch("django.contrib.messages.add_message") as mock_add_message:
+        with self.captureOnCommitCallbacks(execute=True):
             self.admin.do_delete_domain(request, domain)
-            mock_add_message.assert_called_once_with(
-                request,
-                messages.INFO,
-                "Domain my-nameserver.gov has been deleted. Thanks!",
-                extra_tags="",
-                fail_silently=False,
-            )
 
+        domain.refresh_from_db()
         self.assertEqual(domain.state, Domain.State.DELETED)
         # Try to delete it again
         # Test the info dialog
@@ -506,7 +515,7 @@ class TestDomainAdminAsStaff(MockEppLib):
             {"_delete_domain": "Remove from registry", "name": domain.name},
             follow=True,
         )
-        request.user = self.client
+        request.user = self.superuser
         with patch("django.contrib.messages.add_message") as mock_add_message:
             self.admin.do_delete_domain(request, domain)
             mock_add_message.assert_called_once_with(
@@ -17,6 +17,9 @@ from django.utils.module_loading import import_string
 import logging
 import pyzipper
 from django.core.management.base import CommandError
+from django.core.cache import cache, caches
+from registrar.management.commands.reconcile_registry_data import CHECKPOINT_KEY
+from registrar.models.utility import registry_cache
 from registrar.management.commands.clean_tables import Command as CleanTablesCommand
 from registrar.management.commands.export_tables import Command as ExportTablesCommand
 from registrar.models import (
@@ -35,6 +38,7 @@ from registrar.models import (
     Portfolio,
     Suborganization,
     AllowedEmail,
+    Host,
 )
 from registrar.utility.enums import DefaultEmail
 import tablib
@@ -752,6 +756,72 @@ class TestExtendExpirationDates(MockEppLib):
         self.assertEqual(desired_domain.expiration_date, date(2024, 11, 15))
 
 
+class TestReconcileRegistryData(MockEppLib):
+    def setUp(self):
+        super().setUp()
+        self.domain = Domain.objects.create(name="fake.gov", state=Domain.State.READY)
+        self.second_domain = Domain.objects.create(name="igorville.gov", state=Domain.State.READY)
+        self.unknown_domain = Domain.objects.create(name="unknown.gov")
+
+    def tearDown(self):
+        super().tearDown()
+        cache.delete(CHECKPOINT_KEY)
+        Host.objects.all().delete()
+        PublicContact.objects.all().delete()
+        Domain.objects.all().delete()
+
+    @less_console_noise_decorator
+    def run_reconcile_registry_data(self, *args):
+        with patch(
+            "registrar.management.commands.utility.terminal_helper.TerminalHelper.query_yes_no_exit",  # noqa
+            return_value=True,
+        ):
+            call_command("reconcile_registry_data", "--concurrency", "1", "--rate", "0", *args)
+
+    @less_console_noise_decorator
+    def test_updates_database_copies_from_the_registry(self):
+        """Hosts and dates are written for every domain in the registry, and a complete run clears the checkpoint"""
+        self.run_reconcile_registry_data()
+
+        self.domain.refresh_from_db()
+        self.assertEqual(sorted(self.domain.host.values_list("name", flat=True)), ["fake.host.com", "fake2.host.com"])
+        self.assertEqual(self.domain.expiration_date, date(2023, 5, 25))
+        self.assertTrue(self.second_domain.host.exists())
+        # UNKNOWN domains aren't in the registry yet
+        self.assertFalse(self.unknown_domain.host.exists())
+        self.assertIsNone(cache.get(CHECKPOINT_KEY))
+
+    @less_console_noise_decorator
+    def test_limited_run_resumes_from_checkpoint(self):
+        """A run stopped by --limit saves its place, and the next run continues after it"""
+        self.run_reconcile_registry_data("--limit", "1")
+
+        self.assertEqual(cache.get(CHECKPOINT_KEY), self.domain.id)
+        self.assertTrue(self.domain.host.exists())
+        self.assertFalse(self.second_domain.host.exists())
+
+        self.run_reconcile_registry_data()
+
+        self.assertTrue(self.second_domain.host.exists())
+        self.assertIsNone(cache.get(CHECKPOINT_KEY))
+
+    @override_settings(REGISTRY_CONTACT_CACHE_TTL=3600)
+    @less_console_noise_decorator
+    def test_restores_contacts_edited_in_the_database(self):
+        """A contact row changed behind the contact cache is rewritten from the registry"""
+        caches[registry_cache.CACHE_ALIAS].clear()
+        self.run_reconcile_registry_data()
+        security_contacts = PublicContact.objects.filter(
+            domain=self.domain, contact_type=PublicContact.ContactTypeChoices.SECURITY
+        )
+        self.assertEqual(security_contacts.get().email, "security@mail.gov")
+
+        security_contacts.update(email="drifted@mail.gov")
+        self.run_reconcile_registry_data()
+
+        self.assertEqual(security_contacts.get().email, "security@mail.gov")
+
+
 class TestDiscloseEmails(MockEppLib):
     def setUp(self):
         super().setUp()
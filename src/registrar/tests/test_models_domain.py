@@ -4,7 +4,10 @@ Feature being tested: Registry Integration
 This file tests the various ways in which the registrar interacts with the registry.
 """
 
+from django.core.cache import caches
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.utils import timezone
 from django.db.utils import IntegrityError
 from unittest.mock import MagicMock, patch, call
 from datetime import datetime, date, timedelta
@@ -21,6 +24,8 @@ from registrar.utility.enums import DefaultEmail
 from registrar.utility.errors import ActionNotAllowed, NameserverError, NameserverErrorCodes
 
 from registrar.models.utility.contact_error import ContactError, ContactErrorCodes
+from registrar.models.utility import domain_deletion, registry_cache, registry_snapshot
+from registrar.models import DomainDeletionJob, DomainRegistrySnapshot
 from registrar.utility import errors
 
 from django_fsm import TransitionNotAllowed  # type: ignore
@@ -349,6 +354,229 @@ class TestDomainCache(MockEppLib):
             self.assertEqual(PublicContact.objects.filter(domain=domain.id).count(), 2)
 
 
+@override_settings(REGISTRY_CACHE_TTL=60)
+class TestDomainSharedRegistryCache(MockEppLib):
+    """The shared registry cache tier behind Domain._fetch_cache"""
+
+    def setUp(self):
+        super().setUp()
+        caches[registry_cache.CACHE_ALIAS].clear()
+        self.domain = Domain.objects.create(name="igorville.gov", state=Domain.State.DNS_NEEDED)
+
+    def tearDown(self):
+        PublicContact.objects.all().delete()
+        Domain.objects.all().delete()
+        super().tearDown()
+
+    def info_domain_calls(self):
+        return [c for c in self.mockedSendFunction.call_args_list if isinstance(c.args[0], commands.InfoDomain)]
+
+    @less_console_noise_decorator
+    def test_second_instance_reads_from_shared_cache(self):
+        """A fresh Domain instance (another request) reuses the data instead of sending InfoDomain again"""
+        hits_before = registry_cache.stats()["hits"]
+        first = self.domain.creation_date
+
+        second = Domain.objects.get(pk=self.domain.pk).creation_date
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.info_domain_calls()), 1)
+        self.assertEqual(registry_cache.stats()["hits"], hits_before + 1)
+
+    @less_console_noise_decorator
+    def test_entry_without_requested_part_is_a_miss(self):
+        """Data fetched without contacts can't answer a request that needs contacts"""
+        _ = self.domain.creation_date
+
+        Domain.objects.get(pk=self.domain.pk)._get_property("contacts")
+
+        self.assertEqual(len(self.info_domain_calls()), 2)
+
+    @less_console_noise_decorator
+    def test_setter_invalidates_shared_cache(self):
+        """Updating the domain through a Cache setter drops the shared entries"""
+        _ = self.domain.creation_date
+        self.domain.dnssecdata = []
+
+        _ = Domain.objects.get(pk=self.domain.pk).creation_date
+
+        self.assertEqual(len(self.info_domain_calls()), 2)
+
+    @less_console_noise_decorator
+    def test_unknown_domain_skips_shared_cache(self):
+        """A domain in UNKNOWN state always goes to the registry so its state can be fixed"""
+        unknown = Domain.objects.create(name="fake.gov", state=Domain.State.UNKNOWN)
+        registry_cache.set_domain_data("fake.gov", {"cr_date": "cached"})
+
+        unknown._fetch_cache()
+
+        self.assertNotEqual(unknown._cache.get("cr_date"), "cached")
+
+    @less_console_noise_decorator
+    def test_failed_cache_query_leaves_transaction_usable(self):
+        """A cache query that fails in the database is rolled back on its own, so the fetch can still save"""
+
+        def failing_query(*args, **kwargs):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT * FROM registry_cache_missing_table")
+
+        with patch.object(caches[registry_cache.CACHE_ALIAS], "get_many", side_effect=failing_query):
+            _ = self.domain.creation_date
+
+        self.domain.refresh_from_db()
+        self.assertIsNotNone(self.domain.x_registry_created_at)
+
+
+@override_settings(REGISTRY_CONTACT_CACHE_TTL=3600)
+class TestDomainContactCache(MockEppLib):
+    """The contact cache keyed by registry_id behind Domain._fetch_contacts"""
+
+    def setUp(self):
+        super().setUp()
+        caches[registry_cache.CACHE_ALIAS].clear()
+        self.domain = Domain.objects.create(name="freeman.gov", state=Domain.State.READY)
+
+    def tearDown(self):
+        PublicContact.objects.all().delete()
+        Domain.objects.all().delete()
+        super().tearDown()
+
+    def info_contact_calls(self):
+        return [c for c in self.mockedSendFunction.call_args_list if isinstance(c.args[0], commands.InfoContact)]
+
+    @less_console_noise_decorator
+    def test_second_fetch_reuses_contacts(self):
+        """Another request's fetch of the domain sends no InfoContact and writes no PublicContact"""
+        self.domain._fetch_cache(fetch_contacts=True)
+        # security, technical and administrative
+        self.assertEqual(len(self.info_contact_calls()), 3)
+
+        second = Domain.objects.get(pk=self.domain.pk)
+        with patch.object(Domain, "_get_or_create_public_contact") as get_or_create:
+            second._fetch_cache(fetch_contacts=True)
+        get_or_create.assert_not_called()
+        self.assertEqual(len(self.info_contact_calls()), 3)
+        self.assertEqual(second._cache["contacts"], self.domain._cache["contacts"])
+
+    @less_console_noise_decorator
+    def test_unchanged_contact_is_not_rewritten(self):
+        """Once an entry is stale the contact is fetched again, but its row is only rewritten if up_date changed"""
+        self.domain._fetch_cache(fetch_contacts=True)
+
+        with patch.object(registry_cache, "is_fresh", return_value=False):
+            with patch.object(Domain, "_get_or_create_public_contact") as get_or_create:
+                Domain.objects.get(pk=self.domain.pk)._fetch_cache(fetch_contacts=True)
+        self.assertEqual(len(self.info_contact_calls()), 6)
+        get_or_create.assert_not_called()
+
+        changed = copy.deepcopy(self.mockSecurityContact)
+        changed.up_date = datetime(2024, 1, 1)
+        with patch.object(registry_cache, "is_fresh", return_value=False), patch.object(
+            self, "mockSecurityContact", changed
+        ):
+            with patch.object(Domain, "_get_or_create_public_contact") as get_or_create:
+                Domain.objects.get(pk=self.domain.pk)._fetch_cache(fetch_contacts=True)
+        get_or_create.assert_called_once()
+
+    @less_console_noise_decorator
+    def test_contact_changed_during_fetch_is_not_stored(self):
+        """An entry fetched before another request changed its contact isn't stored, so the next fetch asks again"""
+        get_contact_entries = Domain._get_contact_entries
+
+        def fetch_then_change(domain, registry_ids):
+            entries = get_contact_entries(domain, registry_ids)
+            # another request updates the security contact before this one stores what it fetched
+            registry_cache.invalidate_contact("securityContact")
+            return entries
+
+        with patch.object(Domain, "_get_contact_entries", autospec=True, side_effect=fetch_then_change):
+            self.domain._fetch_cache(fetch_contacts=True)
+        self.assertEqual(len(self.info_contact_calls()), 3)
+
+        Domain.objects.get(pk=self.domain.pk)._fetch_cache(fetch_contacts=True)
+        # only the changed contact is fetched again
+        self.assertEqual(len(self.info_contact_calls()), 4)
+        self.assertEqual(self.info_contact_calls()[-1].args[0], commands.InfoContact(id="securityContact"))
+
+    @less_console_noise_decorator
+    def test_deleted_public_contact_drops_entry(self):
+        """Deleting a contact's PublicContact row means the next fetch writes it again"""
+        self.domain._fetch_cache(fetch_contacts=True)
+        PublicContact.objects.filter(domain=self.domain, registry_id="securityContact").delete()
+
+        Domain.objects.get(pk=self.domain.pk)._fetch_cache(fetch_contacts=True)
+
+        self.assertEqual(len(self.info_contact_calls()), 4)
+        self.assertTrue(PublicContact.objects.filter(domain=self.domain, registry_id="securityContact").exists())
+
+
+@override_settings(REGISTRY_SNAPSHOT_STALE_SECONDS=300)
+class TestDomainRegistrySnapshot(MockEppLib):
+    """Domain pages render from the persisted registry snapshot (stale-while-revalidate)"""
+
+    def setUp(self):
+        super().setUp()
+        self.domain = Domain.objects.create(name="igorville.gov", state=Domain.State.DNS_NEEDED)
+
+    def tearDown(self):
+        DomainRegistrySnapshot.objects.all().delete()
+        PublicContact.objects.all().delete()
+        Domain.objects.all().delete()
+        super().tearDown()
+
+    def info_domain_calls(self):
+        return [c for c in self.mockedSendFunction.call_args_list if isinstance(c.args[0], commands.InfoDomain)]
+
+    @less_console_noise_decorator
+    def test_registry_fetch_stores_snapshot(self):
+        _ = self.domain.creation_date
+
+        snapshot = DomainRegistrySnapshot.objects.get(domain=self.domain)
+        self.assertFalse(snapshot.has_hosts)
+        self.assertIsNotNone(snapshot.synced_at)
+
+    @less_console_noise_decorator
+    def test_pages_render_from_fresh_snapshot(self):
+        """Inside serving_snapshots a new instance reads the snapshot instead of the registry"""
+        first = self.domain.creation_date
+
+        with registry_snapshot.serving_snapshots():
+            second = Domain.objects.get(pk=self.domain.pk).creation_date
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.info_domain_calls()), 1)
+
+    @less_console_noise_decorator
+    def test_snapshot_not_used_outside_pages(self):
+        """Write paths and commands keep reading from the registry"""
+        _ = self.domain.creation_date
+
+        _ = Domain.objects.get(pk=self.domain.pk).creation_date
+
+        self.assertEqual(len(self.info_domain_calls()), 2)
+
+    @less_console_noise_decorator
+    def test_stale_snapshot_is_served_then_refreshed(self):
+        _ = self.domain.creation_date
+        stale_at = DomainRegistrySnapshot.objects.get(domain=self.domain).synced_at - timedelta(hours=1)
+        DomainRegistrySnapshot.objects.filter(domain=self.domain).update(synced_at=stale_at)
+
+        with registry_snapshot.serving_snapshots():
+            _ = Domain.objects.get(pk=self.domain.pk).creation_date
+
+        # REGISTRY_SNAPSHOT_REFRESH_IN_BACKGROUND is off in tests, so the refresh already ran
+        self.assertEqual(len(self.info_domain_calls()), 2)
+        self.assertGreater(DomainRegistrySnapshot.objects.get(domain=self.domain).synced_at, stale_at)
+
+    @less_console_noise_decorator
+    def test_setter_discards_snapshot(self):
+        """Updating the domain drops the snapshot, so the next page shows the registry's answer"""
+        _ = self.domain.creation_date
+        self.domain.dnssecdata = []
+
+        self.assertFalse(DomainRegistrySnapshot.objects.filter(domain=self.domain).exists())
+
+
 class TestDomainCreation(MockEppLib):
     """Rule: An approved domain request must result in a domain"""
 
@@ -1494,6 +1722,25 @@ class TestRegistrantContacts(MockEppLib):
             # Confirm that we are getting the desired email
             self.assertEqual(domain.security_contact.email, expectedSecContact.email)
 
+    @less_console_noise_decorator
+    def test_nameservers_stored_on_fetch_cache_replace_stale_rows(self):
+        """
+        Scenario: The db has hosts and IPs the registry no longer has.
+            They are deleted, rows that match are kept, and nothing is duplicated.
+        """
+        domain, _ = Domain.objects.get_or_create(name="meow.gov", state=Domain.State.READY)
+        stale_host = Host.objects.create(domain=domain, name="ns1.stale.gov")
+        HostIP.objects.create(host=stale_host, address="1.1.1.1")
+        kept_host = Host.objects.create(domain=domain, name="fake.meow.gov")
+        kept_ip = HostIP.objects.create(host=kept_host, address="2.0.0.8")
+        HostIP.objects.create(host=kept_host, address="3.3.3.3")
+
+        domain._fetch_cache(fetch_hosts=True)
+        domain._fetch_cache(fetch_hosts=True)
+
+        self.assertEqual(list(domain.host.values_list("id", flat=True)), [kept_host.id])
+        self.assertEqual(list(HostIP.objects.filter(host__domain=domain).values_list("id", flat=True)), [kept_ip.id])
+
     @skip("not implemented yet")
     def test_update_is_unsuccessful(self):
         """
@@ -1780,10 +2027,13 @@ class TestRegistrantNameservers(MockEppLib):
                 call(update_domain_with_created, cleaned=True),
             ]
             self.mockedSendFunction.assert_has_calls(expectedCalls, any_order=True)
-            # Extra EPP calls due to _invalidate_cache() in the nameserver setter
-            # 1. InfoDomain; 2. InfoHost (nameserver1); 3. InfoHost (nameserver2)
-            # The other four calls are above in expected_calls.
-            self.assertEqual(7, self.mockedSendFunction.call_count)
+            # The setter caches what it sent instead of fetching it again
+            self.assertEqual(4, self.mockedSendFunction.call_count)
+            self.assertEqual(self.domain.nameservers, [(self.nameserver1, []), (self.nameserver2, [])])
+            self.assertEqual(
+                sorted(self.domain.host.values_list("name", flat=True)), [self.nameserver1, self.nameserver2]
+            )
+            self.assertEqual(4, self.mockedSendFunction.call_count)
             # check that status is READY
             self.assertTrue(self.domain.is_active())
             self.assertNotEqual(self.domain.first_ready, None)
@@ -2047,6 +2297,50 @@ class TestRegistrantNameservers(MockEppLib):
             self.mockedSendFunction.assert_has_calls(expectedCalls, any_order=True)
             self.assertTrue(domain.is_active())
 
+    @less_console_noise_decorator
+    def test_provision_hosts_reports_only_applied_changes(self):
+        """Host updates that were skipped, or that the registry didn't apply as sent, aren't reported as applied"""
+        domain, _ = Domain.objects.get_or_create(name="nameserverwithip.gov", state=Domain.State.READY)
+
+        def update_host(request, cleaned):
+            code = (
+                ErrorCode.OBJECT_EXISTS
+                if request.name == "ns2.nameserverwithip.gov"
+                else ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY
+            )
+            return MagicMock(code=code)
+
+        with patch.object(self, "mockUpdateHostCommands", side_effect=update_host):
+            created_hosts, applied_hosts = domain._provision_hosts(
+                [
+                    ("ns1.nameserverwithip.gov", ["2.3.4.5"]),
+                    ("ns2.nameserverwithip.gov", ["2.3.4.5"]),
+                    ("ns3.nameserverwithip.gov", []),
+                ],
+                {"ns4.nameserverwithip.gov": ["3.4.5.6"]},
+                {
+                    "ns1.nameserverwithip.gov": ["1.2.3.4"],
+                    "ns2.nameserverwithip.gov": ["1.2.3.4"],
+                    "ns3.nameserverwithip.gov": ["1.2.3.4"],
+                },
+            )
+
+        self.assertEqual(created_hosts, ["ns4.nameserverwithip.gov"])
+        # ns2 came back OBJECT_EXISTS, and no UpdateHost was sent for ns3
+        self.assertEqual(applied_hosts, {"ns1.nameserverwithip.gov", "ns4.nameserverwithip.gov"})
+
+    @less_console_noise_decorator
+    def test_nameserver_changes_not_applied_clear_the_cache(self):
+        """A host change the registry didn't apply clears the cache instead of caching what was sent"""
+        domain, _ = Domain.objects.get_or_create(name="nameserverwithip.gov", state=Domain.State.READY)
+        domain._cache = {"hosts": [{"name": "ns1.nameserverwithip.gov", "addrs": ["1.2.3.4"]}], "statuses": []}
+
+        with patch.object(domain, "_invalidate_cache") as invalidate_cache:
+            domain._cache_nameserver_changes([], [("ns1.nameserverwithip.gov", ["2.3.4.5"])], {}, [], set())
+
+        invalidate_cache.assert_called_once()
+        self.assertEqual(domain._cache["hosts"], [{"name": "ns1.nameserverwithip.gov", "addrs": ["1.2.3.4"]}])
+
     def test_user_cannot_add_non_subordinate_with_ip(self):
         """
         Scenario: Registrant adds a nameserver which is NOT a subdomain of their .gov
@@ -2085,9 +2379,8 @@ class TestRegistrantNameservers(MockEppLib):
             ]
             self.mockedSendFunction.assert_has_calls(expectedCalls, any_order=True)
 
-            # Four extra EPP calls from _invalidate_cache() in the nameserver setter.
-            # See PR #5052 for full explanation if needed
-            self.assertEqual(self.mockedSendFunction.call_count, 8)
+            # Nothing changed, so nothing past the initial InfoDomain and InfoHosts is sent
+            self.assertEqual(self.mockedSendFunction.call_count, 4)
 
     def test_is_subdomain_with_no_ip(self):
         with less_console_noise():
@@ -2160,21 +2453,13 @@ class TestRegistrantNameservers(MockEppLib):
             # make the domain
             domain, _ = Domain.objects.get_or_create(name="meow.gov", state=Domain.State.READY)
 
-            # mock the get_or_create methods for Host and HostIP
-            with patch.object(Host.objects, "get_or_create") as mock_host_get_or_create, patch.object(
-                HostIP.objects, "get_or_create"
-            ) as mock_host_ip_get_or_create:
-                mock_host_get_or_create.return_value = (Host(domain=domain), True)
-                mock_host_ip_get_or_create.return_value = (HostIP(), True)
-
-                # force fetch_cache to be called, which will return above documented mocked hosts
-                domain.nameservers
+            # force fetch_cache to be called, which will return above documented mocked hosts
+            domain.nameservers
 
-                mock_host_get_or_create.assert_called_once_with(domain=domain, name="fake.meow.gov")
-                # Retrieve the mocked_host from the return value of the mock
-                actual_mocked_host, _ = mock_host_get_or_create.return_value
-                mock_host_ip_get_or_create.assert_called_with(address="2.0.0.8", host=actual_mocked_host)
-                self.assertEqual(mock_host_ip_get_or_create.call_count, 1)
+            self.assertEqual(list(domain.host.values_list("name", flat=True)), ["fake.meow.gov"])
+            self.assertEqual(
+                list(HostIP.objects.filter(host__domain=domain).values_list("address", flat=True)), ["2.0.0.8"]
+            )
 
     def test_nameservers_stored_on_fetch_cache_a_subdomain_without_ip(self):
         """
@@ -2185,25 +2470,17 @@ class TestRegistrantNameservers(MockEppLib):
             # make the domain
             domain, _ = Domain.objects.get_or_create(name="subdomainwoip.gov", state=Domain.State.READY)
 
-            # mock the get_or_create methods for Host and HostIP
-            with patch.object(Host.objects, "get_or_create") as mock_host_get_or_create, patch.object(
-                HostIP.objects, "get_or_create"
-            ) as mock_host_ip_get_or_create:
-                mock_host_get_or_create.return_value = (Host(domain=domain), True)
-                mock_host_ip_get_or_create.return_value = (HostIP(), True)
-
-                # force fetch_cache to be called, which will return above documented mocked hosts
-                domain.nameservers
+            # force fetch_cache to be called, which will return above documented mocked hosts
+            domain.nameservers
 
-                mock_host_get_or_create.assert_called_once_with(domain=domain, name="fake.subdomainwoip.gov")
-                mock_host_ip_get_or_create.assert_not_called()
-                self.assertEqual(mock_host_ip_get_or_create.call_count, 0)
+            self.assertEqual(list(domain.host.values_list("name", flat=True)), ["fake.subdomainwoip.gov"])
+            self.assertFalse(HostIP.objects.filter(host__domain=domain).exists())
 
     # @less_console_noise_decorator
     def test_nameservers_stored_on_fetch_cache_not_subdomain_with_ip(self):
         """
         Scenario: Nameservers are stored in db when they are retrieved from fetch_cache.
-            Verify the success of this by asserting get_or_create calls to db.
+            Verify the success of this by checking the hosts and IPs in the db.
             The mocked data for the EPP calls returns a host name
             of 'fake.host.com' from InfoDomain and an array of 2 IPs: 1.2.3.4 and 2.3.4.5
             from InfoHost
@@ -2213,18 +2490,11 @@ class TestRegistrantNameservers(MockEppLib):
         """
         domain, _ = Domain.objects.get_or_create(name="freeman.gov", state=Domain.State.READY)
 
-        with patch.object(Host.objects, "get_or_create") as mock_host_get_or_create, patch.object(
-            HostIP.objects, "get_or_create"
-        ) as mock_host_ip_get_or_create:
-            mock_host_get_or_create.return_value = (Host(domain=domain), True)
-            mock_host_ip_get_or_create.return_value = (HostIP(), True)
+        # force fetch_cache to be called, which will return above documented mocked hosts
+        domain.nameservers
 
-            # force fetch_cache to be called, which will return above documented mocked hosts
-            domain.nameservers
-
-            mock_host_get_or_create.assert_called_once_with(domain=domain, name="fake.host.com")
-            mock_host_ip_get_or_create.assert_not_called()
-            self.assertEqual(mock_host_ip_get_or_create.call_count, 0)
+        self.assertEqual(list(domain.host.values_list("name", flat=True)), ["fake.host.com"])
+        self.assertFalse(HostIP.objects.filter(host__domain=domain).exists())
 
     def test_nameservers_stored_on_fetch_cache_not_subdomain_without_ip(self):
         """
@@ -2234,17 +2504,11 @@ class TestRegistrantNameservers(MockEppLib):
         with less_console_noise():
             domain, _ = Domain.objects.get_or_create(name="fakemeow.gov", state=Domain.State.READY)
 
-            with patch.object(Host.objects, "get_or_create") as mock_host_get_or_create, patch.object(
-                HostIP.objects, "get_or_create"
-            ) as mock_host_ip_get_or_create:
-                mock_host_get_or_create.return_value = (Host(domain=domain), True)
-                mock_host_ip_get_or_create.return_value = (HostIP(), True)
+            # force fetch_cache to be called, which will return above documented mocked hosts
+            domain.nameservers
 
-                # force fetch_cache to be called, which will return above documented mocked hosts
-                domain.nameservers
-                mock_host_get_or_create.assert_called_once_with(domain=domain, name="fake.meow.com")
-                mock_host_ip_get_or_create.assert_not_called()
-                self.assertEqual(mock_host_ip_get_or_create.call_count, 0)
+            self.assertEqual(list(domain.host.values_list("name", flat=True)), ["fake.meow.com"])
+            self.assertFalse(HostIP.objects.filter(host__domain=domain).exists())
 
     @skip("not implemented yet")
     def test_update_is_unsuccessful(self):
@@ -3456,6 +3720,135 @@ class TestAnalystDelete(MockEppLib):
         self.assertEqual(self.domain.deleted, None)
 
 
+class TestDomainDeletionJob(MockEppLib):
+    """Rule: Deletions started from the admin or the delete page run as a job, outside the request"""
+
+    def setUp(self):
+        super().setUp()
+        self.domain, _ = Domain.objects.get_or_create(name="fake.gov", state=Domain.State.READY)
+        self.domain.place_client_hold()
+        # Mock the InfoDomain command data to return a domain with no hosts
+        self.mockDataInfoDomain.hosts = []
+
+    def tearDown(self):
+        # reset to avoid test pollution
+        self.mockDataInfoDomain.hosts = ["fake.host.com", "fake2.host.com"]
+        DomainDeletionJob.objects.all().delete()
+        Domain.objects.all().delete()
+        super().tearDown()
+
+    @less_console_noise_decorator
+    def test_job_runs_every_step_and_deletes_domain(self):
+        """The job runs once the enqueuing transaction commits and deletes the domain"""
+        with self.captureOnCommitCallbacks(execute=True):
+            job = domain_deletion.enqueue(self.domain)
+        job.refresh_from_db()
+        self.assertEqual(job.step, DomainDeletionJob.Step.DONE)
+        self.assertIsNotNone(job.finished_at)
+        self.mockedSendFunction.assert_any_call(commands.DeleteDomain(name="fake.gov"), cleaned=True)
+
+        self.domain.refresh_from_db()
+        self.assertEqual(self.domain.state, Domain.State.DELETED)
+        self.assertIsNotNone(self.domain.deleted)
+
+    @less_console_noise_decorator
+    def test_enqueue_returns_the_unfinished_job(self):
+        """Deleting a domain twice while the first deletion runs doesn't start a second one"""
+        with patch.object(domain_deletion, "start"):
+            first = domain_deletion.enqueue(self.domain)
+            second = domain_deletion.enqueue(self.domain)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(DomainDeletionJob.objects.filter(domain=self.domain).count(), 1)
+
+    @less_console_noise_decorator
+    def test_enqueue_checks_state(self):
+        """A domain that can't be deleted from its state gets no job"""
+        ready_domain, _ = Domain.objects.get_or_create(name="ready.gov", state=Domain.State.READY)
+        with self.assertRaises(TransitionNotAllowed):
+            domain_deletion.enqueue(ready_domain)
+        self.assertFalse(DomainDeletionJob.objects.filter(domain=ready_domain).exists())
+
+    @less_console_noise_decorator
+    def test_waits_for_registry_with_backoff(self):
+        """Hosts still on the domain are checked again later, not in a loop"""
+        with patch.object(Domain, "_registry_released_hosts", side_effect=[False, True]):
+            with self.captureOnCommitCallbacks(execute=True):
+                job = domain_deletion.enqueue(self.domain)
+
+            job.refresh_from_db()
+            self.assertEqual(job.step, DomainDeletionJob.Step.WAIT_FOR_REGISTRY)
+            self.assertEqual(job.attempts, 1)
+            self.assertGreater(job.next_attempt_at, timezone.now())
+
+            # not due yet
+            domain_deletion.run(job.pk)
+            job.refresh_from_db()
+            self.assertEqual(job.step, DomainDeletionJob.Step.WAIT_FOR_REGISTRY)
+
+            DomainDeletionJob.objects.filter(pk=job.pk).update(next_attempt_at=timezone.now())
+            job = domain_deletion.run(job.pk)
+        self.assertEqual(job.step, DomainDeletionJob.Step.DONE)
+
+    @less_console_noise_decorator
+    def test_fails_after_max_attempts(self):
+        """A step that keeps failing fails the job, and the domain keeps its state"""
+        with patch.object(domain_deletion, "start"):
+            job = domain_deletion.enqueue(self.domain)
+        with patch.object(
+            Domain, "_delete_nameservers_and_hosts", side_effect=RegistryError(code=ErrorCode.COMMAND_FAILED)
+        ):
+            for _ in range(domain_deletion.MAX_ATTEMPTS):
+                domain_deletion.advance(job)
+        self.assertEqual(job.step, DomainDeletionJob.Step.FAILED)
+        self.assertEqual(job.attempts, domain_deletion.MAX_ATTEMPTS)
+
+        self.domain.refresh_from_db()
+        self.assertEqual(self.domain.state, Domain.State.ON_HOLD)
+
+    @less_console_noise_decorator
+    def test_delete_step_is_retry_safe(self):
+        """A domain already gone from the registry (an earlier try deleted it) is marked deleted"""
+        with patch.object(domain_deletion, "start"):
+            job = domain_deletion.enqueue(self.domain)
+        job.step = DomainDeletionJob.Step.DELETE_DOMAIN
+        with patch.object(
+            Domain, "_delete_from_registry", side_effect=RegistryError(code=ErrorCode.OBJECT_DOES_NOT_EXIST)
+        ):
+            domain_deletion.advance(job)
+        self.assertEqual(job.step, DomainDeletionJob.Step.DONE)
+
+        self.domain.refresh_from_db()
+        self.assertEqual(self.domain.state, Domain.State.DELETED)
+
+    @less_console_noise_decorator
+    def test_delete_step_keeps_edits_made_while_it_ran(self):
+        """The domain is re-read before it is marked deleted, so a save made during the registry calls isn't lost"""
+        with patch.object(domain_deletion, "start"):
+            job = domain_deletion.enqueue(self.domain)
+        job.step = DomainDeletionJob.Step.DELETE_DOMAIN
+
+        def edit_elsewhere():
+            Domain.objects.filter(pk=self.domain.pk).update(first_ready=date(2020, 1, 1))
+
+        with patch.object(Domain, "_delete_from_registry", side_effect=edit_elsewhere):
+            domain_deletion.advance(job)
+        self.assertEqual(job.step, DomainDeletionJob.Step.DONE)
+
+        self.domain.refresh_from_db()
+        self.assertEqual(self.domain.state, Domain.State.DELETED)
+        self.assertEqual(self.domain.first_ready, date(2020, 1, 1))
+
+    @less_console_noise_decorator
+    def test_enqueue_with_optimistic_lock_refuses_a_stale_domain(self):
+        """A domain saved elsewhere since it was loaded gets no job"""
+        stale_domain = Domain.objects.get(pk=self.domain.pk)
+        Domain.objects.get(pk=self.domain.pk).save()
+
+        with self.assertRaises(ValidationError):
+            domain_deletion.enqueue(stale_domain, optimistic_lock=True)
+        self.assertFalse(DomainDeletionJob.objects.filter(domain=self.domain).exists())
+
+
 class TestDomainDNSHostingEnrollment(MockEppLib):
     """Rule: DNS hosting enrollment requires a portfolio"""
 
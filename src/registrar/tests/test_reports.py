@@ -1,10 +1,18 @@
+import gzip
 import io
-from django.test import Client, RequestFactory, SimpleTestCase
+import tempfile
+import time
+from django.test import Client, RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from io import StringIO
 from registrar.decorators import allow_slow_queries
 from registrar.models import (
+    AnalyticsSnapshot,
     DomainRequest,
     Domain,
+    DomainInvitation,
     UserDomainRole,
     PortfolioInvitation,
     User,
@@ -12,6 +20,7 @@ from registrar.models import (
 from registrar.models import Portfolio, DraftDomain, DomainInformation
 from registrar.models.user_portfolio_permission import UserPortfolioPermission
 from registrar.models.utility.portfolio_helper import UserPortfolioRoleChoices
+from registrar.utility import analytics, current_reports
 from registrar.utility.csv_export import (
     DomainDataFull,
     DomainDataType,
@@ -30,13 +39,13 @@ from registrar.utility.csv_export import (
     get_default_end_date,
 )
 from django.db.models import Case, When
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
 from unittest.mock import MagicMock, call, mock_open, patch
 from api.views import get_current_federal, get_current_full
 from django.conf import settings
 from botocore.exceptions import ClientError
 import boto3_mocking
-from registrar.utility.s3_bucket import S3ClientError, S3ClientErrorCodes  # type: ignore
+from registrar.utility.s3_bucket import S3ClientError, S3ClientErrorCodes, S3ClientHelper  # type: ignore
 from django.utils import timezone
 from api.tests.common import less_console_noise_decorator
 from .common import (
@@ -49,7 +58,7 @@ from .common import (
     GenericTestHelper,
 )
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from django.contrib.admin.models import LogEntry, ADDITION
 from django.contrib.contenttypes.models import ContentType
 import csv
@@ -116,6 +125,135 @@ class CsvReportsTest(MockDbForSharedTests):
 
             content.write.assert_has_calls(expected_file_content)
 
+    @boto3_mocking.patching
+    @less_console_noise_decorator
+    @override_settings(CURRENT_REPORT_CACHE_TTL=3600)
+    def test_generate_full_report_skips_when_unchanged(self):
+        """A run with no changes since the last one doesn't render or upload the report again"""
+        mock_client = MagicMock()
+        with tempfile.TemporaryDirectory() as directory:
+            with boto3_mocking.clients.handler_for("s3", mock_client):
+                call_command("generate_current_full_report", directory=directory)
+                with patch.object(DomainDataFull, "parse_row") as parse_row:
+                    call_command("generate_current_full_report", directory=directory)
+
+        parse_row.assert_not_called()
+        self.assertEqual(mock_client.upload_file.call_count, 1)
+
+    @boto3_mocking.patching
+    @less_console_noise_decorator
+    @override_settings(CURRENT_REPORT_CACHE_TTL=3600)
+    def test_generate_full_report_renders_changed_rows(self):
+        """Only rows whose data changed are rendered again, and the report matches a full rebuild"""
+        mock_client = MagicMock()
+        with tempfile.TemporaryDirectory() as directory, tempfile.TemporaryDirectory() as full_directory:
+            with boto3_mocking.clients.handler_for("s3", mock_client):
+                call_command("generate_current_full_report", directory=directory)
+
+                self.domain_information_12.organization_name = "Interstate Organization"
+                self.domain_information_12.save()
+                with patch.object(DomainDataFull, "parse_row", wraps=DomainDataFull.parse_row) as parse_row:
+                    call_command("generate_current_full_report", directory=directory)
+                call_command("generate_current_full_report", directory=full_directory, force=True)
+
+            incremental_report = Path(directory, "current-full.csv").read_text()
+            full_report = Path(full_directory, "current-full.csv").read_text()
+
+        self.assertEqual(parse_row.call_count, 1)
+        self.assertIn("zdomain12.gov,Interstate,Interstate Organization,", incremental_report)
+        self.assertEqual(incremental_report, full_report)
+        self.assertEqual(mock_client.upload_file.call_count, 3)
+
+    @boto3_mocking.patching
+    @less_console_noise_decorator
+    @override_settings(CURRENT_REPORT_CACHE_TTL=3600)
+    def test_generate_full_report_renders_unlinked_rows(self):
+        """A row whose portfolio was unlinked with queryset.update() (no updated_at moves) is rendered again"""
+        mock_client = MagicMock()
+        with tempfile.TemporaryDirectory() as directory, tempfile.TemporaryDirectory() as full_directory:
+            with boto3_mocking.clients.handler_for("s3", mock_client):
+                call_command("generate_current_full_report", directory=directory)
+
+                DomainInformation.objects.filter(pk=self.domain_information_1.pk).update(portfolio=None)
+                with patch.object(DomainDataFull, "parse_row", wraps=DomainDataFull.parse_row) as parse_row:
+                    call_command("generate_current_full_report", directory=directory)
+                call_command("generate_current_full_report", directory=full_directory, force=True)
+
+            incremental_report = Path(directory, "current-full.csv").read_text()
+            full_report = Path(full_directory, "current-full.csv").read_text()
+
+        self.assertEqual(parse_row.call_count, 1)
+        self.assertNotIn("Portfolio 1 Federal Agency", incremental_report)
+        self.assertEqual(incremental_report, full_report)
+
+    @boto3_mocking.patching
+    @less_console_noise_decorator
+    @override_settings(CURRENT_REPORT_CACHE_TTL=3600)
+    def test_generate_full_report_rebuilds_after_ttl(self):
+        """Stored rows aren't reused past CURRENT_REPORT_CACHE_TTL after the full build, even when runs reuse them"""
+        mock_client = MagicMock()
+        now = time.time()
+        with tempfile.TemporaryDirectory() as directory:
+            with boto3_mocking.clients.handler_for("s3", mock_client):
+                call_command("generate_current_full_report", directory=directory)
+                self.domain_information_12.organization_name = "Interstate Organization"
+                self.domain_information_12.save()
+                with patch("registrar.utility.current_reports.time.time", return_value=now + 1800):
+                    call_command("generate_current_full_report", directory=directory)
+                with patch("registrar.utility.current_reports.time.time", return_value=now + 3600), patch.object(
+                    DomainDataFull, "parse_row", wraps=DomainDataFull.parse_row
+                ) as parse_row:
+                    call_command("generate_current_full_report", directory=directory)
+            row_count = len(Path(directory, "current-full.csv").read_text().splitlines()) - 1
+
+        self.assertEqual(parse_row.call_count, row_count)
+
+    def test_row_store_version_follows_the_export_code(self):
+        """Rows stored by another version of the code that renders them aren't reused"""
+        version = current_reports.get_row_store_version(DomainDataFull)
+        current_reports.get_row_store_version.cache_clear()
+        try:
+            with patch.object(current_reports.inspect, "getsource", return_value="def parse_row(): ..."):
+                self.assertNotEqual(current_reports.get_row_store_version(DomainDataFull), version)
+        finally:
+            current_reports.get_row_store_version.cache_clear()
+        self.assertEqual(current_reports.get_row_store_version(DomainDataFull), version)
+
+    @boto3_mocking.patching
+    @less_console_noise_decorator
+    def test_generate_federal_report_skips_unchanged_upload(self):
+        """A report that comes out the same as the uploaded one isn't uploaded again"""
+        mock_client = MagicMock()
+        with tempfile.TemporaryDirectory() as directory:
+            with boto3_mocking.clients.handler_for("s3", mock_client):
+                call_command("generate_current_federal_report", directory=directory)
+                extra_args = mock_client.upload_file.call_args.kwargs["ExtraArgs"]
+                mock_client.head_object.return_value = {"Metadata": extra_args["Metadata"]}
+                call_command("generate_current_federal_report", directory=directory)
+                # Asking for a compressed copy uploads it even though the content is the same
+                call_command("generate_current_federal_report", directory=directory, compress=True)
+
+        self.assertEqual(mock_client.upload_file.call_count, 2)
+        compressed_args = mock_client.upload_file.call_args.kwargs["ExtraArgs"]
+        self.assertEqual(compressed_args["ContentEncoding"], "gzip")
+        self.assertEqual(compressed_args["Metadata"], extra_args["Metadata"])
+
+    @boto3_mocking.patching
+    @less_console_noise_decorator
+    def test_get_compressed_file(self):
+        """Files uploaded compressed are decompressed when read"""
+        file_content = "Domain name,Domain type\r\ncdomain1.gov,Federal - Executive\r\n"
+        mock_client = MagicMock()
+        mock_client.get_object.return_value = {
+            "Body": io.BytesIO(gzip.compress(file_content.encode())),
+            "ContentEncoding": "gzip",
+        }
+        with boto3_mocking.clients.handler_for("s3", mock_client):
+            with patch("boto3.client", return_value=mock_client):
+                content = S3ClientHelper().get_file("current-full.csv", decode_to_utf=True)
+
+        self.assertEqual(content, file_content)
+
     @boto3_mocking.patching
     def test_not_found_full_report(self):
         """Ensures that we get a not found when the report doesn't exist"""
@@ -309,6 +447,30 @@ class ExportDataTest(MockDbForIndividualTests, MockEppLib):
         self.maxDiff = None
         self.assertEqual(csv_content, expected_content)
 
+    @less_console_noise_decorator
+    def test_domain_data_type_user_cost_does_not_grow_with_other_domains(self):
+        """The per-user export only looks up contacts, managers and invitations of the exported domains"""
+        UserDomainRole.objects.create(user=self.user, domain=self.domain_2)
+        request = get_wsgi_request_object(client=self.client, user=self.user)
+
+        def export():
+            csv_file = StringIO()
+            with CaptureQueriesContext(connection) as queries:
+                DomainDataTypeUser.export_data_to_csv(csv_file, request=request)
+            return csv_file.getvalue(), len(queries)
+
+        content_before, queries_before = export()
+
+        # Managers, invitations and a security contact on a domain the user doesn't manage
+        UserDomainRole.objects.create(user=self.meoward_user, domain=self.domain_3)
+        DomainInvitation.objects.create(email="other@example.gov", domain=self.domain_3)
+        self.domain_3.security_contact
+
+        content_after, queries_after = export()
+
+        self.assertEqual(content_after, content_before)
+        self.assertEqual(queries_after, queries_before)
+
     @less_console_noise_decorator
     def test_domain_data_type_user_with_portfolio(self):
         """Tests DomainDataTypeUser export with portfolio permissions"""
@@ -812,6 +974,53 @@ class ExportDataTest(MockDbForIndividualTests, MockEppLib):
             self.maxDiff = None
             self.assertEqual(csv_content, expected_content)
 
+    @less_console_noise_decorator
+    def test_stream_csv_matches_export_data_to_csv(self):
+        """stream_csv yields the same CSV as export_data_to_csv, a chunk of rows at a time"""
+        self.domain_1.security_contact
+        self.domain_2.ready()
+        self.domain_2.save()
+        for export in [DomainDataFull, DomainRequestDataFull]:
+            with self.subTest(export=export.__name__):
+                csv_file = StringIO()
+                rows = export.export_data_to_csv(csv_file)
+                self.assertGreater(len(rows), 2)
+
+                chunks = list(export.stream_csv(chunk_size=2))
+
+                self.assertEqual("".join(chunks), csv_file.getvalue())
+                # the header goes out on its own, then the rows two at a time
+                self.assertEqual(len(chunks), 1 + (len(rows) + 1) // 2)
+
+    @less_console_noise_decorator
+    def test_stream_csv_keeps_first_row_of_duplicated_key(self):
+        """When the query repeats an object's row, both export paths keep its first row"""
+        rows = list(DomainDataFull.get_annotated_queryset())
+        duplicate = {**rows[0], "domain__name": "duplicate.gov"}
+        with patch.object(DomainDataFull, "get_annotated_queryset", return_value=rows + [duplicate]):
+            csv_file = StringIO()
+            DomainDataFull.export_data_to_csv(csv_file)
+            streamed = "".join(DomainDataFull.stream_csv())
+
+        self.assertEqual(streamed, csv_file.getvalue())
+        self.assertIn(rows[0]["domain__name"], streamed)
+        self.assertNotIn("duplicate.gov", streamed)
+
+    @less_console_noise_decorator
+    def test_export_data_full_view_streams(self):
+        """The current-full report is served as a streaming response"""
+        self.client.force_login(self.custom_superuser)
+        csv_file = StringIO()
+        DomainDataFull.export_data_to_csv(csv_file)
+
+        response = self.client.get(reverse("export_data_full"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="current-full.csv"', response["Content-Disposition"])
+        self.assertEqual(b"".join(response.streaming_content).decode(), csv_file.getvalue())
+
 
 class MemberExportTest(MockDbForIndividualTests, MockEppLib):
 
@@ -1027,6 +1236,20 @@ class MemberExportTest(MockDbForIndividualTests, MockEppLib):
         self.assertEqual(header, expected_header)
         self.assertEqual(data_rows, expected_rows)
 
+    @less_console_noise_decorator
+    def test_member_export_stream_csv(self):
+        """stream_csv yields the same members CSV as export_data_to_csv"""
+        request = self.factory.get("/")
+        request.user = self.user
+        request = GenericTestHelper._mock_user_request_for_factory(request)
+        request.session["portfolio"] = self.portfolio_1.id
+
+        csv_file = StringIO()
+        rows = MemberExport.export_data_to_csv(csv_file, request=request)
+        self.assertTrue(rows)
+
+        self.assertEqual("".join(MemberExport.stream_csv(request=request)), csv_file.getvalue())
+
 
 class MemberExportNoneDomainInfoTest(SimpleTestCase):
     """parse_row and write_csv when domain_info=None and unexpected errors."""
@@ -1092,3 +1315,123 @@ class HelperFunctions(MockDbForSharedTests):
             submitted_requests_sliced_at_end_date = DomainRequestExport.get_sliced_requests(filter_condition)
             expected_content = [3, 2, 0, 0, 0, 0, 1, 0, 0, 1]
             self.assertEqual(submitted_requests_sliced_at_end_date, expected_content)
+
+    @less_console_noise_decorator
+    def test_get_sliced_domains_for_conditions(self):
+        """Counts for several conditions come from one query and match the counts for each condition."""
+        filter_conditions = [
+            {"domain__permissions__isnull": False, "domain__first_ready__lte": self.end_date},
+            {"domain__permissions__isnull": True, "domain__first_ready__lte": self.end_date},
+            {"domain__permissions__isnull": False, "domain__first_ready__lte": self.start_date},
+            {"domain__state__in": [Domain.State.DELETED], "domain__deleted__lte": self.end_date},
+        ]
+        expected = [DomainExport.get_sliced_domains(condition) for condition in filter_conditions]
+
+        with self.assertNumQueries(1):
+            sliced_counts = DomainExport.get_sliced_domains_for_conditions(filter_conditions)
+
+        self.assertEqual(sliced_counts, expected)
+        self.assertEqual(sliced_counts[0], [3, 2, 1, 0, 0, 0, 0, 0, 0, 0])
+
+    @less_console_noise_decorator
+    def test_get_sliced_requests_for_conditions(self):
+        """Counts for several conditions come from one query and match the counts for each condition."""
+        filter_conditions = [
+            {"created_at__lte": self.end_date},
+            {
+                "status": DomainRequest.DomainRequestStatus.SUBMITTED,
+                "last_submitted_date__lte": self.end_date,
+            },
+        ]
+        expected = [DomainRequestExport.get_sliced_requests(condition) for condition in filter_conditions]
+
+        with self.assertNumQueries(1):
+            sliced_counts = DomainRequestExport.get_sliced_requests_for_conditions(filter_conditions)
+
+        self.assertEqual(sliced_counts, expected)
+        self.assertEqual(sliced_counts[1], [3, 2, 0, 0, 0, 0, 1, 0, 0, 1])
+
+
+class AnalyticsSnapshotTest(MockDbForSharedTests):
+    """Tests the daily analytics snapshots and reading counts from them."""
+
+    def setUp(self):
+        super().setUp()
+        self.yesterday = timezone.localdate() - timedelta(days=1)
+        self.metrics = AnalyticsSnapshot.Metric.values
+
+    @less_console_noise_decorator
+    def test_take_snapshots_saves_live_counts(self):
+        """A snapshot holds the counts the live tables give for its day"""
+        cutoffs = [analytics.start_of_day(self.yesterday)]
+        expected = analytics.count_metrics(self.metrics, cutoffs)
+
+        saved = analytics.take_snapshots([self.yesterday])
+
+        self.assertEqual(saved, len(self.metrics))
+        for metric in self.metrics:
+            snapshot = AnalyticsSnapshot.objects.get(date=self.yesterday, metric=metric)
+            self.assertEqual(snapshot.counts, expected[metric][0])
+
+    @less_console_noise_decorator
+    def test_take_snapshots_refuses_today(self):
+        """Today's counts can still change, so they aren't snapshotted"""
+        with self.assertRaises(ValueError):
+            analytics.take_snapshots([timezone.localdate()])
+        self.assertFalse(AnalyticsSnapshot.objects.exists())
+
+    @less_console_noise_decorator
+    def test_get_sliced_counts_reads_snapshots(self):
+        """Cut-offs at the start of a snapshotted day are answered from the snapshot alone"""
+        for index, metric in enumerate(self.metrics):
+            AnalyticsSnapshot.objects.create(date=self.yesterday, metric=metric, counts=[index] * 10)
+
+        with self.assertNumQueries(1):
+            sliced_counts = analytics.get_sliced_counts(self.metrics, [analytics.start_of_day(self.yesterday)])
+
+        for index, metric in enumerate(self.metrics):
+            self.assertEqual(sliced_counts[metric], [[index] * 10])
+
+    @less_console_noise_decorator
+    def test_get_sliced_counts_counts_live_without_snapshot(self):
+        """Cut-offs without a snapshot (or that aren't at the start of a past day) are counted live"""
+        AnalyticsSnapshot.objects.create(
+            date=self.yesterday, metric=AnalyticsSnapshot.Metric.MANAGED_DOMAINS, counts=[99] * 10
+        )
+        cutoffs = [analytics.start_of_day(self.yesterday), timezone.now()]
+
+        sliced_counts = analytics.get_sliced_counts(self.metrics, cutoffs)
+
+        # yesterday is missing the other metrics' snapshots, so it is counted live too
+        self.assertEqual(sliced_counts, analytics.count_metrics(self.metrics, cutoffs))
+
+    @less_console_noise_decorator
+    def test_sliced_counts_match_export_helpers(self):
+        """Live metric counts match get_sliced_domains and get_sliced_requests"""
+        sliced_counts = analytics.count_metrics(self.metrics, [self.end_date])
+
+        self.assertEqual(
+            sliced_counts[AnalyticsSnapshot.Metric.MANAGED_DOMAINS][0],
+            DomainExport.get_sliced_domains(
+                {"domain__permissions__isnull": False, "domain__first_ready__lte": self.end_date}
+            ),
+        )
+        self.assertEqual(
+            sliced_counts[AnalyticsSnapshot.Metric.SUBMITTED_REQUESTS][0],
+            DomainRequestExport.get_sliced_requests(
+                {"status": DomainRequest.DomainRequestStatus.SUBMITTED, "last_submitted_date__lte": self.end_date}
+            ),
+        )
+
+    @less_console_noise_decorator
+    def test_create_analytics_snapshots_command(self):
+        """The command backfills every day in the range, and refuses days that aren't over"""
+        start = self.yesterday - timedelta(days=9)
+
+        call_command("create_analytics_snapshots", start=start)
+
+        self.assertEqual(AnalyticsSnapshot.objects.count(), 10 * len(self.metrics))
+        self.assertEqual(AnalyticsSnapshot.objects.order_by("date").first().date, start)
+
+        with self.assertRaises(CommandError):
+            call_command("create_analytics_snapshots", end=timezone.localdate())
@@ -100,6 +100,40 @@ class TestVersionPageView(TestCase):
         self.assertNotContains(response, "Git tag")
 
 
+class TestMetricsView(TestCase):
+    """The EPP metrics endpoint is Prometheus text and staff only."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = create_test_user()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        User.objects.all().delete()
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    @less_console_noise_decorator
+    def test_metrics_forbidden_for_non_staff(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 403)
+
+    @less_console_noise_decorator
+    def test_metrics_in_prometheus_format_for_staff(self):
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertContains(response, "# TYPE epp_command_duration_seconds histogram")
+        self.assertContains(response, "# TYPE epp_pool_exhausted_total counter")
+
+
 class TestWithUser(MockEppLib):
     """Class for executing tests with a test user.
     Note that tests share the test user within their test class, so the user
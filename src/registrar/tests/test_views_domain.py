@@ -32,6 +32,7 @@ from registrar.models import (
     DnsRecord,
     DomainRequest,
     Domain,
+    DomainDeletionJob,
     DomainInformation,
     DomainInvitation,
     AllowedEmail,
@@ -3716,18 +3717,25 @@ class TestDomainDeletion(TestWithUser):
         """
         * Domain State in DNS NEEDED
         * Posting to the endpoint with a state of DNS Needed
-        * Should delete the Domain
+        * Should start a deletion job, which deletes the Domain
         """
 
         self.mockDataInfoDomain.hosts = []
 
         self.client.force_login(self.user)
         domain_id = self.dns_needed_tobedeleted.id
-        self.client.post(
-            reverse("domain-delete", kwargs={"domain_pk": domain_id}),
-            data={"is_policy_acknowledged": "True"},
-            follow=True,
+        # DOMAIN_DELETION_IN_BACKGROUND is off in tests, so the job runs once the request commits
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("domain-delete", kwargs={"domain_pk": domain_id}),
+                data={"is_policy_acknowledged": "True"},
+            )
+        self.assertRedirects(
+            response, reverse("domain", kwargs={"domain_pk": domain_id}), fetch_redirect_response=False
         )
+        job = DomainDeletionJob.objects.get(domain_id=domain_id)
+        self.assertEqual(job.step, DomainDeletionJob.Step.DONE)
+        self.assertEqual(job.requested_by, self.user)
 
         json_response = self.client.get("/get-domains-json/")
         self.assertContains(json_response, self.dns_needed_tobedeleted.name)
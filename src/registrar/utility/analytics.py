@@ -0,0 +1,195 @@
+"""Analytics counts sliced by org type, read from daily snapshots where there are some.
+
+The analytics page and the managed/unmanaged domains reports show, for a start and an
+end date, how many domains and requests match each metric (METRIC_CONDITIONS): in total,
+per org type and for election offices. Counting them means scanning DomainInformation
+and DomainRequest, so the create_analytics_snapshots command (run daily, and able to
+backfill) stores each finished day's counts in AnalyticsSnapshot.
+
+get_sliced_counts reads a date cut-off's counts from its snapshot, and counts the live
+tables for cut-offs without one (today, a time other than the start of a day, or a day
+that wasn't snapshotted). A snapshot keeps the counts as they were when it was taken;
+later changes, like a domain getting its first manager, don't alter it.
+"""
+
+import operator
+from datetime import datetime, time
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Case, CharField, Count, F, Q, When
+from django.utils import timezone
+
+from registrar.models import AnalyticsSnapshot, Domain, DomainInformation, DomainRequest
+
+Metric = AnalyticsSnapshot.Metric
+
+# The org types counts are sliced by, in column order (after "Total", before "Election office")
+SLICED_ORG_TYPES = [
+    DomainRequest.OrganizationChoices.FEDERAL,
+    DomainRequest.OrganizationChoices.INTERSTATE,
+    DomainRequest.OrganizationChoices.STATE_OR_TERRITORY,
+    DomainRequest.OrganizationChoices.TRIBAL,
+    DomainRequest.OrganizationChoices.COUNTY,
+    DomainRequest.OrganizationChoices.CITY,
+    DomainRequest.OrganizationChoices.SPECIAL_DISTRICT,
+    DomainRequest.OrganizationChoices.SCHOOL_DISTRICT,
+]
+
+# What each metric counts as of a date cut-off
+METRIC_CONDITIONS = {
+    Metric.MANAGED_DOMAINS: lambda cutoff: {
+        "domain__permissions__isnull": False,
+        "domain__first_ready__lte": cutoff,
+    },
+    Metric.UNMANAGED_DOMAINS: lambda cutoff: {
+        "domain__permissions__isnull": True,
+        "domain__first_ready__lte": cutoff,
+    },
+    Metric.READY_DOMAINS: lambda cutoff: {
+        "domain__state__in": [Domain.State.READY],
+        "domain__first_ready__lte": cutoff,
+    },
+    Metric.DELETED_DOMAINS: lambda cutoff: {
+        "domain__state__in": [Domain.State.DELETED],
+        "domain__deleted__lte": cutoff,
+    },
+    Metric.REQUESTS: lambda cutoff: {
+        "created_at__lte": cutoff,
+    },
+    Metric.SUBMITTED_REQUESTS: lambda cutoff: {
+        "status": DomainRequest.DomainRequestStatus.SUBMITTED,
+        "last_submitted_date__lte": cutoff,
+    },
+}
+
+DOMAIN_METRICS = [Metric.MANAGED_DOMAINS, Metric.UNMANAGED_DOMAINS, Metric.READY_DOMAINS, Metric.DELETED_DOMAINS]
+REQUEST_METRICS = [Metric.REQUESTS, Metric.SUBMITTED_REQUESTS]
+
+# days counted per query when taking snapshots
+SNAPSHOT_BATCH_DAYS = 7
+
+
+def count_sliced(queryset, filter_conditions):
+    """
+    Counts the objects in queryset matching each filter condition (a dict of filter kwargs),
+    sliced by org type and election office, in a single query.
+    Objects are counted once, however many rows a condition joins them to (e.g. one per manager).
+
+    Returns one list per condition: [total, one count per SLICED_ORG_TYPES, election office].
+    """
+    if not filter_conditions:
+        return []
+
+    queryset = queryset.annotate(
+        converted_generic_org_type=Case(
+            # Recreate the logic of the converted_generic_org_type property
+            # here in annotations
+            When(portfolio__isnull=False, then=F("portfolio__organization_type")),
+            default=F("generic_org_type"),
+            output_field=CharField(),
+        )
+    )
+    slices = [Q()] + [Q(converted_generic_org_type=org_type) for org_type in SLICED_ORG_TYPES]
+    slices.append(Q(is_election_board=True))
+
+    aggregates = {}
+    for condition_index, condition in enumerate(filter_conditions):
+        for slice_index, slice_condition in enumerate(slices):
+            aggregates[f"count_{condition_index}_{slice_index}"] = Count(
+                "id", filter=Q(**condition) & slice_condition, distinct=True
+            )
+
+    # Only read the rows that at least one condition can count
+    matches_any = reduce(operator.or_, (Q(**condition) for condition in filter_conditions))
+    counts = queryset.filter(matches_any).aggregate(**aggregates)
+
+    return [
+        [counts[f"count_{condition_index}_{slice_index}"] for slice_index in range(len(slices))]
+        for condition_index in range(len(filter_conditions))
+    ]
+
+
+def count_metrics(metrics, cutoffs):
+    """Counts the metrics at each cut-off from the live tables: {metric: [counts at each cut-off]}."""
+    metrics = [str(metric) for metric in metrics]
+    counts = {}
+    for model, model_metrics in [(DomainInformation, DOMAIN_METRICS), (DomainRequest, REQUEST_METRICS)]:
+        wanted = [metric for metric in metrics if metric in model_metrics]
+        if not wanted or not cutoffs:
+            continue
+        conditions = [METRIC_CONDITIONS[metric](cutoff) for metric in wanted for cutoff in cutoffs]
+        results = count_sliced(model.objects.all(), conditions)
+        for index, metric in enumerate(wanted):
+            counts[metric] = results[index * len(cutoffs) : (index + 1) * len(cutoffs)]
+    return {metric: counts.get(metric, []) for metric in metrics}
+
+
+def get_sliced_counts(metrics, cutoffs):
+    """
+    The metrics' sliced counts at each date cut-off (aware datetimes, as from csv_export.format_start_date),
+    from snapshots where there are some: {metric: [counts at each cut-off]}.
+    """
+    metrics = [str(metric) for metric in metrics]
+    snapshot_dates = {index: _snapshot_date(cutoff) for index, cutoff in enumerate(cutoffs)}
+    stored = {}
+    wanted_dates = {day for day in snapshot_dates.values() if day is not None}
+    if wanted_dates:
+        for snapshot in AnalyticsSnapshot.objects.filter(date__in=wanted_dates, metric__in=metrics):
+            stored[(snapshot.metric, snapshot.date)] = snapshot.counts
+
+    live_indexes = [
+        index
+        for index in range(len(cutoffs))
+        if any((metric, snapshot_dates[index]) not in stored for metric in metrics)
+    ]
+    live = count_metrics(metrics, [cutoffs[index] for index in live_indexes])
+
+    sliced_counts = {}
+    for metric in metrics:
+        sliced_counts[metric] = [
+            (
+                live[metric][live_indexes.index(index)]
+                if index in live_indexes
+                else stored[(metric, snapshot_dates[index])]
+            )
+            for index in range(len(cutoffs))
+        ]
+    return sliced_counts
+
+
+def take_snapshots(days):
+    """
+    Counts every metric as of each of the days (dates before today) and saves them,
+    replacing earlier snapshots of those days. Returns the number of snapshots saved.
+    """
+    today = timezone.localdate()
+    if any(day >= today for day in days):
+        raise ValueError("Only days before today can be snapshotted")
+
+    saved = 0
+    days = sorted(set(days))
+    for start in range(0, len(days), SNAPSHOT_BATCH_DAYS):
+        batch = days[start : start + SNAPSHOT_BATCH_DAYS]
+        counts = count_metrics(Metric.values, [start_of_day(day) for day in batch])
+        with transaction.atomic():
+            for metric, counts_per_day in counts.items():
+                for day, day_counts in zip(batch, counts_per_day):
+                    AnalyticsSnapshot.objects.update_or_create(date=day, metric=metric, defaults={"counts": day_counts})
+                    saved += 1
+    return saved
+
+
+def start_of_day(day):
+    """The cut-off the analytics page uses for a date (see csv_export.format_start_date)."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _snapshot_date(cutoff):
+    """The day whose snapshot answers for this cut-off, if it can be answered from one."""
+    local = timezone.localtime(cutoff)
+    if local.time() != time.min:
+        return None
+    day = local.date()
+    # today's counts can still change
+    return day if day < timezone.localdate() else None
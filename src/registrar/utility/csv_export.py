@@ -1,5 +1,4 @@
 from abc import ABC, abstractmethod
-from collections import defaultdict
 import csv
 import logging
 from datetime import datetime
@@ -31,15 +30,18 @@ from django.db.models import (
     Subquery,
     Exists,
     Func,
+    DateTimeField,
+    IntegerField,
 )
 from django.utils import timezone
-from django.db.models.functions import Concat, Coalesce, Cast
+from django.db.models.functions import Concat, Coalesce, Cast, Greatest
 from django.contrib.postgres.aggregates import ArrayAgg, StringAgg
 from django.contrib.postgres.fields import ArrayField
 from django.contrib.admin.models import LogEntry, ADDITION
 from django.contrib.contenttypes.models import ContentType
 from registrar.models.utility.generic_helper import convert_queryset_to_dict
 from registrar.templatetags.custom_filters import get_region
+from registrar.utility import analytics
 from registrar.utility.constants import BranchChoices
 from registrar.utility.enums import DefaultEmail, DefaultUserValues
 from registrar.models.utility.portfolio_helper import (
@@ -51,6 +53,27 @@ from registrar.models.utility.portfolio_helper import (
 
 logger = logging.getLogger(__name__)
 
+# Rows fetched from the database (and written out) per chunk when streaming an export
+STREAM_CHUNK_SIZE = 2000
+
+
+class CsvChunkBuffer:
+    """
+    File-like object for a csv writer that holds what is written until it is taken.
+    Lets a streamed export hand out its CSV text a chunk at a time.
+    """
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, value):
+        self._parts.append(value)
+
+    def take(self):
+        data = "".join(self._parts)
+        self._parts = []
+        return data
+
 
 def write_header(writer, columns):
     """
@@ -182,7 +205,13 @@ class BaseExport(ABC):
 
     @classmethod
     def annotate_and_retrieve_fields(
-        cls, initial_queryset, computed_fields, related_table_fields=None, include_many_to_many=False, **kwargs
+        cls,
+        initial_queryset,
+        computed_fields,
+        related_table_fields=None,
+        include_many_to_many=False,
+        chunk_size=None,
+        **kwargs,
     ) -> QuerySet:
         """
         Applies annotations to a queryset and retrieves specified fields,
@@ -193,8 +222,9 @@ class BaseExport(ABC):
             computed_fields  (dict, optional): Fields to compute {field_name: expression}.
             related_table_fields (list, optional): Extra fields to retrieve; defaults to annotation keys if None.
             include_many_to_many (bool, optional): Determines if we should include many to many fields or not
-            **kwargs: Additional keyword arguments for specific parameters (e.g., public_contacts, domain_invitations,
-                  user_domain_roles).
+            chunk_size (int, optional): When given, rows are fetched lazily this many at a time
+                  (see stream_csv) and an iterator is passed to update_queryset instead of the queryset.
+            **kwargs: Additional keyword arguments, passed on to update_queryset.
 
         Returns:
             QuerySet: Contains dictionaries with the specified fields for each record.
@@ -216,6 +246,8 @@ class BaseExport(ABC):
                 model_fields.add(field.name)
 
         queryset = initial_queryset.annotate(**computed_fields).values(*model_fields, *related_table_fields)
+        if chunk_size:
+            queryset = queryset.iterator(chunk_size=chunk_size)
 
         return cls.update_queryset(queryset, **kwargs)
 
@@ -238,22 +270,74 @@ class BaseExport(ABC):
         # Return rows that for easier parsing and testing
         return rows
 
+    @classmethod
+    def stream_csv(cls, chunk_size=STREAM_CHUNK_SIZE, **kwargs):
+        """
+        Yields the same CSV as export_data_to_csv, a chunk of rows at a time, for a StreamingHttpResponse.
+        Rows are read from the database, parsed and written chunk_size at a time,
+        so memory use doesn't grow with the size of the report.
+        """
+        buffer = CsvChunkBuffer()
+        writer = csv.writer(buffer)
+        columns = cls.get_columns()
+
+        cls.write_csv_before(writer, **kwargs)
+        write_header(writer, columns)
+        yield buffer.take()
+
+        # Rows for the same object can repeat when the query joins; keep the first,
+        # as convert_queryset_to_dict does for get_model_annotation_dict
+        seen = set()
+        key = cls.get_stream_key()
+        written = 0
+        for model in cls.get_model_annotation_iterator(chunk_size=chunk_size, **kwargs):
+            if model[key] in seen:
+                continue
+            seen.add(model[key])
+            try:
+                writer.writerow(cls.parse_row(columns, model))
+            except ValueError as err:
+                logger.error(f"csv_export -> Error when parsing row: {err}")
+                continue
+            written += 1
+            if written % chunk_size == 0:
+                yield buffer.take()
+
+        remaining = buffer.take()
+        if remaining:
+            yield remaining
+
+    @classmethod
+    def get_stream_key(cls):
+        """
+        Returns the field that identifies a row's object, which get_model_annotation_dict keys on.
+        Override in subclasses as needed.
+        """
+        return "id"
+
     @classmethod
     def get_annotated_queryset(cls, **kwargs):
         """Returns an annotated queryset based off of all query conditions."""
-        sort_fields = cls.get_sort_fields()
         # Get additional args and merge with incoming kwargs
         additional_args = cls.get_additional_args()
         kwargs.update(additional_args)
+        computed_fields = cls.get_computed_fields(**kwargs)
+        related_table_fields = cls.get_related_table_fields()
+
+        model_queryset = cls.get_filtered_queryset(**kwargs)
+        return cls.annotate_and_retrieve_fields(model_queryset, computed_fields, related_table_fields, **kwargs)
+
+    @classmethod
+    def get_filtered_queryset(cls, **kwargs):
+        """Returns the export's objects, filtered and sorted, before fields are computed and retrieved."""
+        sort_fields = cls.get_sort_fields()
         select_related = cls.get_select_related()
         prefetch_related = cls.get_prefetch_related()
         exclusions = cls.get_exclusions()
         annotations_for_sort = cls.get_annotations_for_sort()
         filter_conditions = cls.get_filter_conditions(**kwargs)
-        computed_fields = cls.get_computed_fields(**kwargs)
-        related_table_fields = cls.get_related_table_fields()
 
-        model_queryset = (
+        return (
             cls.model()
             .objects.select_related(*select_related)
             .prefetch_related(*prefetch_related)
@@ -263,12 +347,16 @@ class BaseExport(ABC):
             .order_by(*sort_fields)
             .distinct()
         )
-        return cls.annotate_and_retrieve_fields(model_queryset, computed_fields, related_table_fields, **kwargs)
 
     @classmethod
     def get_model_annotation_dict(cls, **kwargs):
         return convert_queryset_to_dict(cls.get_annotated_queryset(**kwargs), is_model=False)
 
+    @classmethod
+    def get_model_annotation_iterator(cls, chunk_size=STREAM_CHUNK_SIZE, **kwargs):
+        """Returns the rows of get_model_annotation_dict as an iterator, fetched chunk_size at a time."""
+        return cls.get_annotated_queryset(chunk_size=chunk_size, **kwargs)
+
     @classmethod
     def write_csv(
         cls,
@@ -327,9 +415,30 @@ class MemberExport(BaseExport):
         - UserPortfolioPermissionModelAnnotation.get_annotated_queryset(portfolio, csv_report=True)
         - PortfolioInvitationModelAnnotation.get_annotated_queryset(portfolio, csv_report=True)
         """
+        members = cls.get_members_queryset(request)
+        if members is None:
+            return {}
+        return convert_queryset_to_dict(members, is_model=False, key="email_display")
+
+    @classmethod
+    def get_model_annotation_iterator(cls, chunk_size=STREAM_CHUNK_SIZE, request=None, **kwargs):
+        """Returns the rows of get_model_annotation_dict as an iterator, fetched chunk_size at a time."""
+        members = cls.get_members_queryset(request)
+        if members is None:
+            return iter(())
+        return members.iterator(chunk_size=chunk_size)
+
+    @classmethod
+    def get_stream_key(cls):
+        return "email_display"
+
+    @classmethod
+    def get_members_queryset(cls, request):
+        """Returns the union of portfolio permissions and invitations for the portfolio in the session,
+        or None when there is no portfolio."""
         portfolio = get_portfolio_from_session(request.session)
         if not portfolio:
-            return {}
+            return None
 
         # Union the two querysets to combine UserPortfolioPermission + invites.
         # Unions cannot have a col mismatch, so we must clamp what is returned here.
@@ -431,8 +540,7 @@ class MemberExport(BaseExport):
         # Adding a order_by increases output predictability.
         # Doesn't matter as much for normal use, but makes tests easier.
         # We should also just be ordering by default anyway.
-        members = permissions.union(invitations).order_by("email_display", "member_display", "first_name", "last_name")
-        return convert_queryset_to_dict(members, is_model=False, key="email_display")
+        return permissions.union(invitations).order_by("email_display", "member_display", "first_name", "last_name")
 
     @classmethod
     def get_invited_by_query(cls, object_id_query):
@@ -706,77 +814,101 @@ class DomainExport(BaseExport):
             ),
         }
 
-    @classmethod
-    def update_queryset(cls, queryset, **kwargs):
-        """
-        Returns an updated queryset.
-
-        Add security_contact_email, invited_users, and managers to the queryset,
-        based on public_contacts, domain_invitations and user_domain_roles
-        passed through kwargs.
-        """
-        public_contacts = kwargs.get("public_contacts", {})
-        domain_invitations = kwargs.get("domain_invitations", {})
-        user_domain_roles = kwargs.get("user_domain_roles", {})
-
-        annotated_domain_infos = []
-
-        # Create mapping of domain to a list of invited users and managers
-        invited_users_dict = defaultdict(list)
-        for domain, email in domain_invitations:
-            invited_users_dict[domain].append(email)
-
-        managers_dict = defaultdict(list)
-        for domain, email in user_domain_roles:
-            managers_dict[domain].append(email)
-
-        # Annotate with security_contact from public_contacts, invited users
-        # from domain_invitations, and managers from user_domain_roles
-        for domain_info in queryset:
-            domain_info["security_contact_email"] = public_contacts.get(
-                domain_info.get("domain__security_contact_registry_id")
-            )
-            domain_info["invited_users"] = ", ".join(invited_users_dict.get(domain_info.get("domain__name"), []))
-            domain_info["managers"] = ", ".join(managers_dict.get(domain_info.get("domain__name"), []))
-            annotated_domain_infos.append(domain_info)
-
-        if annotated_domain_infos:
-            return annotated_domain_infos
-
-        return queryset
-
     # ============================================================= #
     # Helper functions for django ORM queries.                      #
     # We are using these rather than pure python for speed reasons. #
     # ============================================================= #
 
     @classmethod
-    def get_all_security_emails(cls):
+    def get_security_contact_email_query(cls):
         """
-        Fetch all PublicContact entries and return a mapping of registry_id to email.
+        Returns a subquery for the email of the domain's security contact.
         """
-        public_contacts = PublicContact.objects.values_list("registry_id", "email")
-        return {registry_id: email for registry_id, email in public_contacts}
+        return Subquery(
+            PublicContact.objects.filter(
+                registry_id=OuterRef("domain__security_contact_registry_id"),
+                domain=OuterRef("domain"),
+            ).values("email")[:1],
+            output_field=CharField(),
+        )
+
+    @classmethod
+    def get_row_version(cls):
+        """
+        Returns an expression for a row's version: the latest updated_at of the records
+        its fields are read from, and which records those are. Unlinking one (e.g. with
+        queryset.update() or on_delete=SET_NULL) moves no updated_at, but changes the version.
+        """
+        security_contact = PublicContact.objects.filter(
+            registry_id=OuterRef("domain__security_contact_registry_id"),
+            domain=OuterRef("domain"),
+        )
+        # Greatest skips the NULLs of relations a row doesn't have
+        latest_update = Greatest(
+            "updated_at",
+            "domain__updated_at",
+            "federal_agency__updated_at",
+            "senior_official__updated_at",
+            "sub_organization__updated_at",
+            "portfolio__updated_at",
+            "portfolio__federal_agency__updated_at",
+            "portfolio__senior_official__updated_at",
+            Subquery(security_contact.values("updated_at")[:1], output_field=DateTimeField()),
+            output_field=DateTimeField(),
+        )
+        linked_records = [
+            F("domain_id"),
+            F("federal_agency_id"),
+            F("senior_official_id"),
+            F("sub_organization_id"),
+            F("portfolio_id"),
+            F("portfolio__federal_agency_id"),
+            F("portfolio__senior_official_id"),
+            Subquery(security_contact.values("id")[:1], output_field=IntegerField()),
+        ]
+        parts = [latest_update]
+        for linked_record in linked_records:
+            # Concat writes a missing one as ""
+            parts += [Value("|"), linked_record]
+        return Concat(*parts, output_field=TextField())
 
     @classmethod
-    def get_all_domain_invitations(cls):
+    def get_managers_query(cls, delimiter=", "):
         """
-        Fetch all DomainInvitation entries and return a mapping of domain to email.
+        Returns a subquery for the emails of the domain's managers, sorted and joined by delimiter.
         """
-        domain_invitations = DomainInvitation.objects.filter(status="invited").values_list("domain__name", "email")
-        return list(domain_invitations)
+        return Coalesce(
+            Subquery(
+                UserDomainRole.objects.filter(domain=OuterRef("domain"))
+                .order_by()
+                .values("domain")
+                .annotate(emails=StringAgg("user__email", delimiter=delimiter, order_by="user__email"))
+                .values("emails"),
+                output_field=CharField(),
+            ),
+            Value(""),
+            output_field=CharField(),
+        )
 
     @classmethod
-    def get_all_user_domain_roles(cls):
+    def get_invited_users_query(cls, delimiter=", "):
         """
-        Fetch all UserDomainRole entries and return a mapping of domain to user__email.
+        Returns a subquery for the emails of the domain's pending invitations, sorted and joined by delimiter.
         """
-        user_domain_roles = (
-            UserDomainRole.objects.select_related("user")
-            .order_by("domain__name", "user__email")
-            .values_list("domain__name", "user__email")
+        return Coalesce(
+            Subquery(
+                DomainInvitation.objects.filter(
+                    domain=OuterRef("domain"), status=DomainInvitation.DomainInvitationStatus.INVITED
+                )
+                .order_by()
+                .values("domain")
+                .annotate(emails=StringAgg("email", delimiter=delimiter, order_by="email"))
+                .values("emails"),
+                output_field=CharField(),
+            ),
+            Value(""),
+            output_field=CharField(),
         )
-        return list(user_domain_roles)
 
     @classmethod
     def parse_row(cls, columns, model):
@@ -858,85 +990,18 @@ class DomainExport(BaseExport):
         }
         return FIELDS
 
-    def get_filtered_domain_infos_by_org(domain_infos_to_filter, org_to_filter_by):
-        """Returns a list of Domain Requests that has been filtered by the given organization value."""
-
-        annotated_queryset = domain_infos_to_filter.annotate(
-            converted_generic_org_type=Case(
-                # Recreate the logic of the converted_generic_org_type property
-                # here in annotations
-                When(portfolio__isnull=False, then=F("portfolio__organization_type")),
-                default=F("generic_org_type"),
-                output_field=CharField(),
-            )
-        )
-        return annotated_queryset.filter(converted_generic_org_type=org_to_filter_by)
-
     @classmethod
     def get_sliced_domains(cls, filter_condition):
         """Get filtered domains counts sliced by org type and election office.
-        Pass distinct=True when filtering by permissions so we do not to count multiples
-        when a domain has more that one manager.
+        Domains are counted once even when the filter joins them to more than one manager.
         """
+        return cls.get_sliced_domains_for_conditions([filter_condition])[0]
 
-        domain_informations = DomainInformation.objects.all().filter(**filter_condition).distinct()
-        domains_count = domain_informations.count()
-        federal = (
-            cls.get_filtered_domain_infos_by_org(domain_informations, DomainRequest.OrganizationChoices.FEDERAL)
-            .distinct()
-            .count()
-        )
-        interstate = cls.get_filtered_domain_infos_by_org(
-            domain_informations, DomainRequest.OrganizationChoices.INTERSTATE
-        ).count()
-        state_or_territory = (
-            cls.get_filtered_domain_infos_by_org(
-                domain_informations, DomainRequest.OrganizationChoices.STATE_OR_TERRITORY
-            )
-            .distinct()
-            .count()
-        )
-        tribal = (
-            cls.get_filtered_domain_infos_by_org(domain_informations, DomainRequest.OrganizationChoices.TRIBAL)
-            .distinct()
-            .count()
-        )
-        county = (
-            cls.get_filtered_domain_infos_by_org(domain_informations, DomainRequest.OrganizationChoices.COUNTY)
-            .distinct()
-            .count()
-        )
-        city = (
-            cls.get_filtered_domain_infos_by_org(domain_informations, DomainRequest.OrganizationChoices.CITY)
-            .distinct()
-            .count()
-        )
-        special_district = (
-            cls.get_filtered_domain_infos_by_org(
-                domain_informations, DomainRequest.OrganizationChoices.SPECIAL_DISTRICT
-            )
-            .distinct()
-            .count()
-        )
-        school_district = (
-            cls.get_filtered_domain_infos_by_org(domain_informations, DomainRequest.OrganizationChoices.SCHOOL_DISTRICT)
-            .distinct()
-            .count()
-        )
-        election_board = domain_informations.filter(is_election_board=True).distinct().count()
-
-        return [
-            domains_count,
-            federal,
-            interstate,
-            state_or_territory,
-            tribal,
-            county,
-            city,
-            special_district,
-            school_district,
-            election_board,
-        ]
+    @classmethod
+    def get_sliced_domains_for_conditions(cls, filter_conditions):
+        """Like get_sliced_domains, for several filter conditions (e.g. date cut-offs) in one query.
+        Returns one list of counts per condition."""
+        return analytics.count_sliced(DomainInformation.objects.all(), filter_conditions)
 
 
 class DomainDataType(DomainExport):
@@ -982,6 +1047,9 @@ class DomainDataType(DomainExport):
             default=F("organization_name"),
             output_field=CharField(),
         )
+        fields["security_contact_email"] = cls.get_security_contact_email_query()
+        fields["managers"] = cls.get_managers_query()
+        fields["invited_users"] = cls.get_invited_users_query()
 
         return fields
 
@@ -1005,29 +1073,6 @@ class DomainDataType(DomainExport):
             "domain__name",
         ]
 
-    @classmethod
-    def get_additional_args(cls):
-        """
-        Returns additional keyword arguments specific to DomainExport.
-
-        Returns:
-            dict: Dictionary containing public_contacts, domain_invitations, and user_domain_roles.
-        """
-        # Fetch all relevant PublicContact entries
-        public_contacts = cls.get_all_security_emails()
-
-        # Fetch all relevant Invite entries
-        domain_invitations = cls.get_all_domain_invitations()
-
-        # Fetch all relevant UserDomainRole entries
-        user_domain_roles = cls.get_all_user_domain_roles()
-
-        return {
-            "public_contacts": public_contacts,
-            "domain_invitations": domain_invitations,
-            "user_domain_roles": user_domain_roles,
-        }
-
     @classmethod
     def get_select_related(cls):
         """
@@ -1160,19 +1205,13 @@ class DomainDataFull(DomainExport):
         ]
 
     @classmethod
-    def get_additional_args(cls):
+    def get_computed_fields(cls, **kwargs):
         """
-        Returns additional keyword arguments specific to DomainExport.
-
-        Returns:
-            dict: Dictionary containing public_contacts, domain_invitations, and user_domain_roles.
+        Get a dict of computed fields.
         """
-        # Fetch all relevant PublicContact entries
-        public_contacts = cls.get_all_security_emails()
-
-        return {
-            "public_contacts": public_contacts,
-        }
+        fields = super().get_computed_fields(**kwargs)
+        fields["security_contact_email"] = cls.get_security_contact_email_query()
+        return fields
 
     @classmethod
     def get_select_related(cls):
@@ -1288,19 +1327,13 @@ class DomainDataFederal(DomainExport):
         ]
 
     @classmethod
-    def get_additional_args(cls):
+    def get_computed_fields(cls, **kwargs):
         """
-        Returns additional keyword arguments specific to DomainExport.
-
-        Returns:
-            dict: Dictionary containing public_contacts, domain_invitations, and user_domain_roles.
+        Get a dict of computed fields.
         """
-        # Fetch all relevant PublicContact entries
-        public_contacts = cls.get_all_security_emails()
-
-        return {
-            "public_contacts": public_contacts,
-        }
+        fields = super().get_computed_fields(**kwargs)
+        fields["security_contact_email"] = cls.get_security_contact_email_query()
+        return fields
 
     @classmethod
     def get_select_related(cls):
@@ -1499,24 +1532,14 @@ class DomainManaged(DomainExport):
         )
 
     @classmethod
-    def get_additional_args(cls):
+    def get_computed_fields(cls, **kwargs):
         """
-        Returns additional keyword arguments specific to DomainExport.
-
-        Returns:
-            dict: Dictionary containing public_contacts, domain_invitations, and user_domain_roles.
+        Get a dict of computed fields.
         """
-
-        # Fetch all relevant Invite entries
-        domain_invitations = cls.get_all_domain_invitations()
-
-        # Fetch all relevant UserDomainRole entries
-        user_domain_roles = cls.get_all_user_domain_roles()
-
-        return {
-            "domain_invitations": domain_invitations,
-            "user_domain_roles": user_domain_roles,
-        }
+        fields = super().get_computed_fields(**kwargs)
+        fields["managers"] = cls.get_managers_query()
+        fields["invited_users"] = cls.get_invited_users_query()
+        return fields
 
     @classmethod
     def get_related_table_fields(cls):
@@ -1534,11 +1557,9 @@ class DomainManaged(DomainExport):
         """
         start_date_formatted = format_start_date(start_date)
         end_date_formatted = format_end_date(end_date)
-        filter_managed_domains_start_date = {
-            "domain__permissions__isnull": False,
-            "domain__first_ready__lte": start_date_formatted,
-        }
-        managed_domains_sliced_at_start_date = cls.get_sliced_domains(filter_managed_domains_start_date)
+        metric = analytics.Metric.MANAGED_DOMAINS
+        sliced_counts = analytics.get_sliced_counts([metric], [start_date_formatted, end_date_formatted])
+        managed_domains_sliced_at_start_date, managed_domains_sliced_at_end_date = sliced_counts[metric]
 
         csv_writer.writerow(["MANAGED DOMAINS COUNTS AT START DATE"])
         csv_writer.writerow(
@@ -1558,12 +1579,6 @@ class DomainManaged(DomainExport):
         csv_writer.writerow(managed_domains_sliced_at_start_date)
         csv_writer.writerow([])
 
-        filter_managed_domains_end_date = {
-            "domain__permissions__isnull": False,
-            "domain__first_ready__lte": end_date_formatted,
-        }
-        managed_domains_sliced_at_end_date = cls.get_sliced_domains(filter_managed_domains_end_date)
-
         csv_writer.writerow(["MANAGED DOMAINS COUNTS AT END DATE"])
         csv_writer.writerow(
             [
@@ -1654,11 +1669,9 @@ class DomainUnmanaged(DomainExport):
         """
         start_date_formatted = format_start_date(start_date)
         end_date_formatted = format_end_date(end_date)
-        filter_unmanaged_domains_start_date = {
-            "domain__permissions__isnull": True,
-            "domain__first_ready__lte": start_date_formatted,
-        }
-        unmanaged_domains_sliced_at_start_date = cls.get_sliced_domains(filter_unmanaged_domains_start_date)
+        metric = analytics.Metric.UNMANAGED_DOMAINS
+        sliced_counts = analytics.get_sliced_counts([metric], [start_date_formatted, end_date_formatted])
+        unmanaged_domains_sliced_at_start_date, unmanaged_domains_sliced_at_end_date = sliced_counts[metric]
 
         csv_writer.writerow(["UNMANAGED DOMAINS AT START DATE"])
         csv_writer.writerow(
@@ -1678,12 +1691,6 @@ class DomainUnmanaged(DomainExport):
         csv_writer.writerow(unmanaged_domains_sliced_at_start_date)
         csv_writer.writerow([])
 
-        filter_unmanaged_domains_end_date = {
-            "domain__permissions__isnull": True,
-            "domain__first_ready__lte": end_date_formatted,
-        }
-        unmanaged_domains_sliced_at_end_date = cls.get_sliced_domains(filter_unmanaged_domains_end_date)
-
         csv_writer.writerow(["UNMANAGED DOMAINS AT END DATE"])
         csv_writer.writerow(
             [
@@ -1714,29 +1721,6 @@ class DomainRequestExport(BaseExport):
         # Return the model class that this export handles
         return DomainRequest
 
-    def get_filtered_domain_requests_by_org(domain_requests_to_filter, org_to_filter_by):
-        """Returns a list of Domain Requests that has been filtered by the given organization value"""
-        annotated_queryset = domain_requests_to_filter.annotate(
-            converted_generic_org_type=Case(
-                # Recreate the logic of the converted_generic_org_type property
-                # here in annotations
-                When(portfolio__isnull=False, then=F("portfolio__organization_type")),
-                default=F("generic_org_type"),
-                output_field=CharField(),
-            )
-        )
-        return annotated_queryset.filter(converted_generic_org_type=org_to_filter_by)
-
-        # return domain_requests_to_filter.filter(
-        #     # Filter based on the generic org value returned by converted_generic_org_type
-        #     id__in=[
-        #         domainRequest.id
-        #         for domainRequest in domain_requests_to_filter
-        #         if domainRequest.converted_generic_org_type
-        #         and domainRequest.converted_generic_org_type == org_to_filter_by
-        #     ]
-        # )
-
     @classmethod
     def get_computed_fields(cls, delimiter=", ", **kwargs):
         """
@@ -1856,60 +1840,13 @@ class DomainRequestExport(BaseExport):
     @classmethod
     def get_sliced_requests(cls, filter_condition):
         """Get filtered requests counts sliced by org type and election office."""
-        requests = DomainRequest.objects.all().filter(**filter_condition).distinct()
-        requests_count = requests.count()
-        federal = (
-            cls.get_filtered_domain_requests_by_org(requests, DomainRequest.OrganizationChoices.FEDERAL)
-            .distinct()
-            .count()
-        )
-        interstate = (
-            cls.get_filtered_domain_requests_by_org(requests, DomainRequest.OrganizationChoices.INTERSTATE)
-            .distinct()
-            .count()
-        )
-        state_or_territory = (
-            cls.get_filtered_domain_requests_by_org(requests, DomainRequest.OrganizationChoices.STATE_OR_TERRITORY)
-            .distinct()
-            .count()
-        )
-        tribal = (
-            cls.get_filtered_domain_requests_by_org(requests, DomainRequest.OrganizationChoices.TRIBAL)
-            .distinct()
-            .count()
-        )
-        county = (
-            cls.get_filtered_domain_requests_by_org(requests, DomainRequest.OrganizationChoices.COUNTY)
-            .distinct()
-            .count()
-        )
-        city = (
-            cls.get_filtered_domain_requests_by_org(requests, DomainRequest.OrganizationChoices.CITY).distinct().count()
-        )
-        special_district = (
-            cls.get_filtered_domain_requests_by_org(requests, DomainRequest.OrganizationChoices.SPECIAL_DISTRICT)
-            .distinct()
-            .count()
-        )
-        school_district = (
-            cls.get_filtered_domain_requests_by_org(requests, DomainRequest.OrganizationChoices.SCHOOL_DISTRICT)
-            .distinct()
-            .count()
-        )
-        election_board = requests.filter(is_election_board=True).distinct().count()
+        return cls.get_sliced_requests_for_conditions([filter_condition])[0]
 
-        return [
-            requests_count,
-            federal,
-            interstate,
-            state_or_territory,
-            tribal,
-            county,
-            city,
-            special_district,
-            school_district,
-            election_board,
-        ]
+    @classmethod
+    def get_sliced_requests_for_conditions(cls, filter_conditions):
+        """Like get_sliced_requests, for several filter conditions (e.g. date cut-offs) in one query.
+        Returns one list of counts per condition."""
+        return analytics.count_sliced(DomainRequest.objects.all(), filter_conditions)
 
     @classmethod
     def parse_row(cls, columns, model):
@@ -0,0 +1,223 @@
+"""Incremental generation of the current-full.csv and current-federal.csv reports.
+
+The generate_current_full_report and generate_current_federal_report commands run daily.
+Rebuilding and re-uploading both files in full each time was wasted work on days when
+few domains (or none) changed, so generate_report:
+
+1. lists every row's version in report order (the latest updated_at of the records a
+   row is rendered from, and which records those are, see DomainExport.get_row_version).
+   If the list is the one the last run rendered, nothing changed and the run stops there.
+2. otherwise renders only the rows that are new or whose version changed, and takes the
+   rest from the rows the last run rendered. Rows removed from the report drop out.
+   Rendered rows are kept in the "reports" cache alias.
+3. uploads the file with its checksum (see S3ClientHelper.upload_file), and doesn't send
+   a file that comes out the same as the uploaded one, e.g. when the changes didn't touch
+   an exported column.
+
+Changes to a row's own fields made with queryset.update() don't move its version. So
+rows are reused for at most CURRENT_REPORT_CACHE_TTL seconds after the last full build,
+and the daily workflow runs the commands with --force (a full rebuild) once a week.
+Rows are stored under the version of the code that renders them (see get_row_store_version),
+so a deploy that changes it starts from a full build.
+Setting CURRENT_REPORT_CACHE_TTL to 0 turns off 1 and 2.
+"""
+
+import csv
+import hashlib
+import inspect
+import logging
+import os
+import sys
+import time
+import uuid
+from functools import cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from registrar.utility.csv_export import STREAM_CHUNK_SIZE, write_header
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = "reports"
+
+
+class HashingFile:
+    """File-like object for a csv writer that passes writes on to file, keeping their sha256."""
+
+    def __init__(self, file):
+        self.file = file
+        self._sha256 = hashlib.sha256()
+
+    def write(self, value):
+        self._sha256.update(value.encode("utf-8"))
+        return self.file.write(value)
+
+    def hexdigest(self):
+        return self._sha256.hexdigest()
+
+
+def is_enabled() -> bool:
+    return settings.CURRENT_REPORT_CACHE_TTL > 0
+
+
+@cache
+def get_row_store_version(export) -> str:
+    """
+    The version of the code that renders the export's rows: a hash of the source of the
+    modules its classes are defined in (csv_export.py for the current reports) and of
+    this one. If the source can't be read, a new version every process, so rows aren't reused.
+    """
+    module_names = {cls.__module__ for cls in export.__mro__ if cls.__module__.startswith("registrar.")}
+    module_names.add(__name__)
+    sha256 = hashlib.sha256()
+    try:
+        for module_name in sorted(module_names):
+            sha256.update(inspect.getsource(sys.modules[module_name]).encode("utf-8"))
+    except (OSError, TypeError):
+        logger.warning(f"Couldn't read the source of {export.__name__}, its stored rows won't be reused", exc_info=True)
+        return uuid.uuid4().hex
+    return sha256.hexdigest()[:16]
+
+
+def get_row_versions(export):
+    """{row key: row version} for every row of the export, in report order."""
+    key = export.get_stream_key()
+    queryset = export.get_filtered_queryset().annotate(row_version=export.get_row_version())
+    versions = {}
+    for object_id, version in queryset.values_list(key, "row_version").iterator(chunk_size=STREAM_CHUNK_SIZE):
+        # Rows for the same object can repeat when the query joins; keep the first, as stream_csv and
+        # convert_queryset_to_dict do
+        versions.setdefault(object_id, version)
+    return versions
+
+
+def render_rows(export, columns, keys=None):
+    """
+    Renders the export's rows (only those with these keys, when given):
+    {row key: (row version, row)}, in report order. A row that fails to parse is None.
+    """
+    key = export.get_stream_key()
+    if keys is None:
+        batches = [None]
+    else:
+        keys = list(keys)
+        batches = [keys[start : start + STREAM_CHUNK_SIZE] for start in range(0, len(keys), STREAM_CHUNK_SIZE)]
+
+    rendered = {}
+    for batch in batches:
+        queryset = export.get_annotated_queryset().annotate(row_version=export.get_row_version())
+        if batch is not None:
+            queryset = queryset.filter(**{f"{key}__in": batch})
+        for model in queryset.iterator(chunk_size=STREAM_CHUNK_SIZE):
+            if model[key] in rendered:
+                continue
+            version = model["row_version"]
+            try:
+                rendered[model[key]] = (version, export.parse_row(columns, model))
+            except ValueError as err:
+                logger.error(f"csv_export -> Error when parsing row: {err}")
+                rendered[model[key]] = (version, None)
+    return rendered
+
+
+def update_rows(export, columns, stored_rows, file_name):
+    """
+    The export's rows, as render_rows returns them, rendering only those that are new or
+    whose version changed since stored_rows. None if no row did (and none left the report).
+    """
+    versions = get_row_versions(export)
+    if list(versions.items()) == [(object_id, version) for object_id, (version, _) in stored_rows.items()]:
+        return None
+
+    changed = {
+        object_id
+        for object_id, version in versions.items()
+        if object_id not in stored_rows or stored_rows[object_id][0] != version
+    }
+    rendered = render_rows(export, columns, changed)
+    rows = {}
+    for object_id in versions:
+        if object_id in rendered:
+            rows[object_id] = rendered[object_id]
+        elif object_id not in changed:
+            rows[object_id] = stored_rows[object_id]
+        # else the row left the report between the two queries
+    logger.info(f"{file_name}: {len(rendered)} of {len(rows)} rows rendered, the rest reused")
+    return rows
+
+
+def generate_report(export, s3_client, file_path, file_name, check_path=True, force=False, compress=False):
+    """
+    Writes the export's CSV to file_path and uploads it as file_name, as described above.
+    force rebuilds it in full, compress uploads it gzipped.
+
+    Returns False when nothing changed since the last run and the run was skipped, True otherwise.
+    """
+    store_key = f"rows:{get_row_store_version(export)}:{file_name}"
+    columns = export.get_columns()
+    store = _reusable_store(store_key, columns) if is_enabled() and not force else None
+    if store:
+        built_at = store["built_at"]
+        rows = update_rows(export, columns, store["rows"], file_name)
+        if rows is None:
+            logger.info(f"No changes since {file_name} was last generated, skipped")
+            return False
+    else:
+        built_at = time.time()
+        rows = render_rows(export, columns)
+
+    # Generate a file locally for upload
+    with open(file_path, "w") as file:
+        hashing_file = HashingFile(file)
+        writer = csv.writer(hashing_file)
+        export.write_csv_before(writer)
+        write_header(writer, columns)
+        for _, row in rows.values():
+            if row is not None:
+                writer.writerow(row)
+
+    if check_path and not os.path.exists(file_path):
+        raise FileNotFoundError(f"Could not find newly created file at '{file_path}'")
+
+    # Upload this generated file for our S3 instance, unless the same file is already there
+    checksum = hashing_file.hexdigest()
+    if not force and s3_client.is_unchanged(file_name, checksum, compress):
+        logger.info(f"{file_name} came out the same as the uploaded one, upload skipped")
+    else:
+        s3_client.upload_file(file_path, file_name, checksum=checksum, compress=compress)
+
+    if is_enabled():
+        _save(store_key, {"built_at": built_at, "columns": columns, "rows": rows})
+    return True
+
+
+def _reusable_store(store_key, columns):
+    """What the last run stored, if its rows can be reused: same columns, and rows are
+    only reused for CURRENT_REPORT_CACHE_TTL after the full build they started from."""
+    store = _load(store_key)
+    if store and store["columns"] == columns and time.time() - store["built_at"] < settings.CURRENT_REPORT_CACHE_TTL:
+        return store
+    return None
+
+
+def _load(store_key):
+    try:
+        # a savepoint, so a failed cache query doesn't break a surrounding transaction
+        with transaction.atomic():
+            return caches[CACHE_ALIAS].get(store_key)
+    except Exception:
+        # the store only saves work; without it the report is rebuilt in full
+        logger.warning(f"Couldn't load the stored rows of {store_key}", exc_info=True)
+        return None
+
+
+def _save(store_key, store):
+    # expire with the full build, instead of CURRENT_REPORT_CACHE_TTL after each run
+    timeout = max(int(store["built_at"] + settings.CURRENT_REPORT_CACHE_TTL - time.time()), 1)
+    try:
+        with transaction.atomic():
+            caches[CACHE_ALIAS].set(store_key, store, timeout=timeout)
+    except Exception:
+        logger.warning(f"Couldn't store the rows of {store_key}", exc_info=True)
@@ -1,6 +1,9 @@
 """Utilities for accessing an AWS S3 bucket"""
 
 from enum import IntEnum
+import gzip
+import shutil
+import tempfile
 import boto3
 from botocore.exceptions import ClientError
 from django.conf import settings
@@ -21,6 +24,10 @@ class S3ClientErrorCodes(IntEnum):
     GET_FILE_ERROR = 4
 
 
+# Object metadata key holding the sha256 of an uploaded file's (uncompressed) content
+CHECKSUM_METADATA_KEY = "sha256"
+
+
 class S3ClientError(RuntimeError):
     """
     Custom exception class for handling errors related to interactions with the S3 storage service via boto3.client.
@@ -88,7 +95,7 @@ class S3ClientHelper:
 
         return settings.AWS_S3_BUCKET_NAME
 
-    def upload_file(self, file_path, file_name):
+    def upload_file(self, file_path, file_name, checksum=None, compress=False):
         """
         Uploads a file to the S3 bucket.
 
@@ -98,6 +105,10 @@ class S3ClientHelper:
         Args:
             file_path (str): The path of the file to upload.
             file_name (str): The name to give to the file in the S3 bucket.
+            checksum (str, optional): The sha256 hex digest of the file's content, kept in the object's
+                metadata. Check is_unchanged first to avoid sending a file that is already there.
+            compress (bool, optional): If True, the file is gzipped for the upload and stored with a
+                gzip Content-Encoding. get_file decompresses it again. Defaults to False.
 
         Returns:
             dict: The response from the boto3 client's upload_file method.
@@ -106,12 +117,43 @@ class S3ClientHelper:
             S3ClientError: If the file cannot be uploaded to the S3 bucket.
         """
 
+        extra_args = {}
+        if checksum:
+            extra_args["Metadata"] = {CHECKSUM_METADATA_KEY: checksum}
+        if compress:
+            extra_args["ContentEncoding"] = "gzip"
+        upload_kwargs = {"ExtraArgs": extra_args} if extra_args else {}
+
         try:
-            response = self.boto_client.upload_file(file_path, self.get_bucket_name(), file_name)
+            if compress:
+                with tempfile.NamedTemporaryFile(suffix=".gz") as compressed:
+                    # mtime=0 keeps the compressed bytes the same for the same content
+                    with open(file_path, "rb") as source, gzip.GzipFile(fileobj=compressed, mode="wb", mtime=0) as gz:
+                        shutil.copyfileobj(source, gz)
+                    compressed.flush()
+                    response = self.boto_client.upload_file(
+                        compressed.name, self.get_bucket_name(), file_name, **upload_kwargs
+                    )
+            else:
+                response = self.boto_client.upload_file(file_path, self.get_bucket_name(), file_name, **upload_kwargs)
         except Exception as exc:
             raise S3ClientError(code=S3ClientErrorCodes.UPLOAD_FILE_ERROR) from exc
         return response
 
+    def is_unchanged(self, file_name, checksum, compress=False):
+        """
+        Returns True if the object file_name in the S3 bucket was uploaded by upload_file
+        with this checksum and compress option. A missing or unreadable object counts as changed.
+        """
+
+        try:
+            response = self.boto_client.head_object(Bucket=self.get_bucket_name(), Key=file_name)
+        except Exception:
+            return False
+        return response.get("Metadata", {}).get(CHECKSUM_METADATA_KEY) == checksum and response.get(
+            "ContentEncoding"
+        ) == ("gzip" if compress else None)
+
     def get_file(self, file_name, decode_to_utf=False):
         """
         Retrieves a file from the S3 bucket and returns its content.
@@ -143,6 +185,9 @@ class S3ClientHelper:
             raise S3ClientError(code=S3ClientErrorCodes.GET_FILE_ERROR) from exc
 
         file_content = response["Body"].read()
+        # Files uploaded with compress=True
+        if response.get("ContentEncoding") == "gzip":
+            file_content = gzip.decompress(file_content)
         if decode_to_utf:
             return file_content.decode("utf-8")
         else:
@@ -22,6 +22,7 @@ from .user_profile import UserProfileView, FinishProfileSetupView
 from .admin_login import admin_login
 from .health import *
 from .version_info import *
+from .metrics import epp_metrics
 from .index import *
 from .portfolios import *
 from .transfer_user import TransferUserView
@@ -54,6 +54,7 @@ from registrar.utility.errors import (
     EnrollmentNotAllowedError,
 )
 from registrar.models.utility.contact_error import ContactError
+from registrar.models.utility import domain_deletion, registry_snapshot
 from registrar.utility.waffle import flag_is_active_for_user
 from registrar.utility.db_helpers import get_portfolio_from_session
 from registrar.views.utility.invitation_helper import (
@@ -113,8 +114,11 @@ class DomainBaseView(PermissionRequiredMixin, DetailView):
 
     def get(self, request, *args, **kwargs):
         self._get_domain(request)
-        context = self.get_context_data(object=self.object)
-        return self.render_to_response(context)
+        # render registry data from the domain's snapshot rather than wait on the registry.
+        # The template reads registry data too, so render inside the block.
+        with registry_snapshot.serving_snapshots():
+            context = self.get_context_data(object=self.object)
+            return self.render_to_response(context).render()
 
     def get_portfolio(self):
         return get_portfolio_from_session(self.request.session)
@@ -487,6 +491,7 @@ class DomainView(DomainBaseView):
             user=self.request.user, portfolio=get_portfolio_from_session(self.request.session)
         ).first()
 
+        context["deletion_job"] = domain_deletion.unfinished_job(self.object)
         if self.object.state != self.object.State.DELETED:
             security_email = self.object.get_security_email()
             if security_email is None or security_email in default_emails:
@@ -654,14 +659,11 @@ class DomainDeleteView(DomainFormBaseView):
             # DNS_NEEDED state will delete domain
             elif domain.state == Domain.State.DNS_NEEDED:
                 try:
-                    domain_name = domain.name
-                    has_port = domain.domain_info.portfolio
-                    domain.delete_with_no_dns()
-                    messages.success(request, f"{domain_name} has been deleted successfully")
-                    if has_port:
-                        return redirect(reverse("domains"))
-                    else:
-                        return redirect(reverse("home") + "?legacy_home=1")
+                    domain.check_no_active_nameservers()
+                    # the registry steps run outside this request; the domain page shows their progress
+                    domain_deletion.enqueue(domain, requested_by=request.user)
+                    messages.success(request, f"The deletion of {domain.name} has started.")
+                    return redirect(reverse("domain", kwargs={"domain_pk": domain.pk}))
                 except Exception:
                     messages.error(request, f"Failed to delete {domain.name}. Please try again.")
                     return self.render_to_response(self.get_context_data(form=form))
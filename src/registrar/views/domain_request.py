@@ -11,6 +11,7 @@ from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import DeleteView, DetailView, TemplateView
 from django.utils.dateparse import parse_datetime
+from api.views import prefetch_domain_availability
 from registrar.decorators import (
     HAS_DOMAIN_REQUESTS_VIEW_ALL,
     HAS_PORTFOLIO_DOMAIN_REQUESTS_EDIT,
@@ -778,6 +779,12 @@ class DotgovDomain(DomainRequestWizard):
         context["requires_feb_questions"] = self.requires_feb_questions()
         return context
 
+    def _candidate_domains(self, forms_list: list) -> list:
+        """The raw requested and alternative domain values, as submitted."""
+        candidates = [forms_list[0]["requested_domain"].value()]
+        candidates += [form["alternative_domain"].value() for form in forms_list[1].forms]
+        return candidates
+
     def is_valid(self, forms_list: list) -> bool:
         """
         Expected order of forms_list:
@@ -785,7 +792,14 @@ class DotgovDomain(DomainRequestWizard):
           1: AlternativeDomainFormSet
           2: ExecutiveNamingRequirementsYesNoForm
           3: ExecutiveNamingRequirementsDetailsForm
+
+        The requested and alternative domains are checked against the registry
+        in one round trip before the forms validate them individually.
         """
+        with prefetch_domain_availability(self._candidate_domains(forms_list)):
+            return self._is_valid(forms_list)
+
+    def _is_valid(self, forms_list: list) -> bool:
         logger.debug("Validating dotgov domain form")
         # If FEB questions aren't required, validate only non-FEB forms
         if not self.requires_feb_questions():
@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.http import HttpResponse
+
+from epplibwrapper.utility import metrics
+from registrar.decorators import grant_access, IS_STAFF
+
+try:
+    from epplibwrapper import CLIENT
+except ImportError:
+    CLIENT = None
+
+
+# Prometheus scrape target for EPP latency and pool metrics. Internal: staff only.
+# Values are per worker process (see epplibwrapper/utility/metrics.py).
+@grant_access(IS_STAFF)
+@transaction.non_atomic_requests
+def epp_metrics(request):
+    text = CLIENT.render_metrics() if CLIENT is not None else metrics.render()
+    return HttpResponse(text, content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,6 +1,6 @@
 """Admin-related views."""
 
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.views import View
 from django.shortcuts import render
 from django.contrib import admin
@@ -11,7 +11,7 @@ from registrar.utility.db_helpers import get_portfolio_from_session
 from .. import models
 import datetime
 from django.utils import timezone
-from registrar.utility import csv_export
+from registrar.utility import analytics, csv_export
 import logging
 
 logger = logging.getLogger(__name__)
@@ -45,80 +45,10 @@ class AnalyticsView(View):
         start_date_formatted = csv_export.format_start_date(start_date)
         end_date_formatted = csv_export.format_end_date(end_date)
 
-        filter_managed_domains_start_date = {
-            "domain__permissions__isnull": False,
-            "domain__first_ready__lte": start_date_formatted,
-        }
-        filter_managed_domains_end_date = {
-            "domain__permissions__isnull": False,
-            "domain__first_ready__lte": end_date_formatted,
-        }
-        managed_domains_sliced_at_start_date = csv_export.DomainExport.get_sliced_domains(
-            filter_managed_domains_start_date
-        )
-        managed_domains_sliced_at_end_date = csv_export.DomainExport.get_sliced_domains(filter_managed_domains_end_date)
-
-        filter_unmanaged_domains_start_date = {
-            "domain__permissions__isnull": True,
-            "domain__first_ready__lte": start_date_formatted,
-        }
-        filter_unmanaged_domains_end_date = {
-            "domain__permissions__isnull": True,
-            "domain__first_ready__lte": end_date_formatted,
-        }
-        unmanaged_domains_sliced_at_start_date = csv_export.DomainExport.get_sliced_domains(
-            filter_unmanaged_domains_start_date
-        )
-        unmanaged_domains_sliced_at_end_date = csv_export.DomainExport.get_sliced_domains(
-            filter_unmanaged_domains_end_date
-        )
-
-        filter_ready_domains_start_date = {
-            "domain__state__in": [models.Domain.State.READY],
-            "domain__first_ready__lte": start_date_formatted,
-        }
-        filter_ready_domains_end_date = {
-            "domain__state__in": [models.Domain.State.READY],
-            "domain__first_ready__lte": end_date_formatted,
-        }
-        ready_domains_sliced_at_start_date = csv_export.DomainExport.get_sliced_domains(filter_ready_domains_start_date)
-        ready_domains_sliced_at_end_date = csv_export.DomainExport.get_sliced_domains(filter_ready_domains_end_date)
-
-        filter_deleted_domains_start_date = {
-            "domain__state__in": [models.Domain.State.DELETED],
-            "domain__deleted__lte": start_date_formatted,
-        }
-        filter_deleted_domains_end_date = {
-            "domain__state__in": [models.Domain.State.DELETED],
-            "domain__deleted__lte": end_date_formatted,
-        }
-        deleted_domains_sliced_at_start_date = csv_export.DomainExport.get_sliced_domains(
-            filter_deleted_domains_start_date
-        )
-        deleted_domains_sliced_at_end_date = csv_export.DomainExport.get_sliced_domains(filter_deleted_domains_end_date)
-
-        filter_requests_start_date = {
-            "created_at__lte": start_date_formatted,
-        }
-        filter_requests_end_date = {
-            "created_at__lte": end_date_formatted,
-        }
-        requests_sliced_at_start_date = csv_export.DomainRequestExport.get_sliced_requests(filter_requests_start_date)
-        requests_sliced_at_end_date = csv_export.DomainRequestExport.get_sliced_requests(filter_requests_end_date)
-
-        filter_submitted_requests_start_date = {
-            "status": models.DomainRequest.DomainRequestStatus.SUBMITTED,
-            "last_submitted_date__lte": start_date_formatted,
-        }
-        filter_submitted_requests_end_date = {
-            "status": models.DomainRequest.DomainRequestStatus.SUBMITTED,
-            "last_submitted_date__lte": end_date_formatted,
-        }
-        submitted_requests_sliced_at_start_date = csv_export.DomainRequestExport.get_sliced_requests(
-            filter_submitted_requests_start_date
-        )
-        submitted_requests_sliced_at_end_date = csv_export.DomainRequestExport.get_sliced_requests(
-            filter_submitted_requests_end_date
+        # Managed, unmanaged, ready and deleted domains and (submitted) requests at the start and end dates,
+        # from the daily snapshots where there are some
+        sliced_counts = analytics.get_sliced_counts(
+            models.AnalyticsSnapshot.Metric.values, [start_date_formatted, end_date_formatted]
         )
 
         query_fed_domains_no_port = Q(portfolio__isnull=True) & Q(
@@ -157,29 +87,9 @@ class AnalyticsView(View):
                 "last_30_days_applications": last_30_days_applications.count(),
                 "last_30_days_approved_applications": last_30_days_approved_applications.count(),
                 "average_application_approval_time_last_30_days": avg_approval_time_display,
-                "managed_domains": {
-                    "start_date_count": managed_domains_sliced_at_start_date,
-                    "end_date_count": managed_domains_sliced_at_end_date,
-                },
-                "unmanaged_domains": {
-                    "start_date_count": unmanaged_domains_sliced_at_start_date,
-                    "end_date_count": unmanaged_domains_sliced_at_end_date,
-                },
-                "ready_domains": {
-                    "start_date_count": ready_domains_sliced_at_start_date,
-                    "end_date_count": ready_domains_sliced_at_end_date,
-                },
-                "deleted_domains": {
-                    "start_date_count": deleted_domains_sliced_at_start_date,
-                    "end_date_count": deleted_domains_sliced_at_end_date,
-                },
-                "requests": {
-                    "start_date_count": requests_sliced_at_start_date,
-                    "end_date_count": requests_sliced_at_end_date,
-                },
-                "submitted_requests": {
-                    "start_date_count": submitted_requests_sliced_at_start_date,
-                    "end_date_count": submitted_requests_sliced_at_end_date,
+                **{
+                    metric: {"start_date_count": start_date_count, "end_date_count": end_date_count}
+                    for metric, (start_date_count, end_date_count) in sliced_counts.items()
                 },
                 "start_date": start_date,
                 "end_date": end_date,
@@ -233,9 +143,8 @@ class ExportMembersPortfolio(View):
         if portfolio:
             portfolio_display = str(portfolio).lower().replace(" ", "-")
 
-        response = HttpResponse(content_type="text/csv")
+        response = StreamingHttpResponse(csv_export.MemberExport.stream_csv(request=request), content_type="text/csv")
         response["Content-Disposition"] = f'attachment; filename="members-for-{portfolio_display}.csv"'
-        csv_export.MemberExport.export_data_to_csv(response, request=request)
         return response
 
 
@@ -243,9 +152,8 @@ class ExportMembersPortfolio(View):
 class ExportDataFull(View):
     def get(self, request, *args, **kwargs):
         # Smaller export based on 1
-        response = HttpResponse(content_type="text/csv")
+        response = StreamingHttpResponse(csv_export.DomainDataFull.stream_csv(), content_type="text/csv")
         response["Content-Disposition"] = 'attachment; filename="current-full.csv"'
-        csv_export.DomainDataFull.export_data_to_csv(response)
         return response
 
 
@@ -265,9 +173,8 @@ class ExportDomainRequestDataFull(View):
 
     def get(self, request, *args, **kwargs):
         """Returns a content disposition response for current-full-domain-request.csv"""
-        response = HttpResponse(content_type="text/csv")
+        response = StreamingHttpResponse(csv_export.DomainRequestDataFull.stream_csv(), content_type="text/csv")
         response["Content-Disposition"] = 'attachment; filename="current-full-domain-request.csv"'
-        csv_export.DomainRequestDataFull.export_data_to_csv(response)
         return response
 
 
@@ -3,6 +3,13 @@
 set -o errexit
 set -o pipefail
 
+# Broker mode: one process owns the logged-in EPP sessions and the workers talk to it over
+# EPP_BROKER_SOCKET (see epplibwrapper/broker.py). Restart it if it ever exits; workers
+# retry briefly while it comes back.
+if [ -n "$EPP_BROKER_SOCKET" ]; then
+  (while true; do python manage.py run_epp_broker || true; sleep 1; done) &
+fi
+
 # Make sure that django's `collectstatic` has been run locally before pushing up to any environment,
 # so that the styles and static assets to show up correctly on any environment.
 